@@ -0,0 +1,224 @@
+"""Suíte de benchmarks do banco, da grid e das exportações.
+
+    python -m benchmarks.executar --linhas 100000 --saida resultados.json
+    python -m benchmarks.executar --banco /tmp/bench.db --comparar base.json
+
+Gera um banco sintético (ou usa --banco), mede cada operação várias vezes e grava
+um JSON com mínimo/mediana/média/máximo em ms. Com --comparar, mostra a razão
+contra um resultado anterior e sai com código 1 se algo ficou mais lento que a
+tolerância. A grid roda com a plataforma Qt "offscreen" (sem display).
+"""
+import os
+import tempfile
+
+# Antes de importar utils: não tocar no config.json do usuário e não abrir janelas
+os.environ.setdefault("TIMESHEET_CONFIG", os.path.join(tempfile.gettempdir(), "timesheet_benchmark_config.json"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.gerar_banco import gerar_banco
+from utils.autocompletar import construir_indice_atividades
+from utils.cache_dias import CacheDias
+from utils.db import (
+    buscar_registros, definir_banco, dia_para_iso, fechar_conexoes, listar_registros, listar_registros_intervalo, obter_conexao,
+)
+from utils.overlaps import listar_overlaps_intervalo
+from utils.tempo import calcular_tempo_total
+
+
+def medir(funcao, repeticoes=5, aquecimento=1):
+    """Executa funcao() e devolve estatísticas do tempo de cada repetição em ms."""
+    for _ in range(aquecimento):
+        funcao()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return {
+        "repeticoes": repeticoes,
+        "min_ms": round(min(tempos), 3),
+        "mediana_ms": round(statistics.median(tempos), 3),
+        "media_ms": round(statistics.fmean(tempos), 3),
+        "max_ms": round(max(tempos), 3),
+    }
+
+
+def _periodos():
+    """Dia mais recente, últimos ~30 dias e últimos ~365 dias presentes no banco (dd/mm/yy)."""
+    conn = obter_conexao()
+    dia, dia_iso = conn.execute("SELECT dia, dia_iso FROM registros ORDER BY dia_iso DESC LIMIT 1").fetchone()
+
+    def dia_antes(dias):
+        linha = conn.execute("SELECT dia FROM registros WHERE dia_iso >= date(?, ?) ORDER BY dia_iso LIMIT 1",
+                             (dia_iso, f"-{dias} days")).fetchone()
+        return linha[0]
+
+    return dia, (dia_antes(30), dia), (dia_antes(365), dia)
+
+
+# 🔹 Grupos de benchmarks (cada um devolve {nome: estatísticas})
+
+def benchmarks_banco(repeticoes):
+    dia, mes, ano = _periodos()
+    registros_ano = listar_registros_intervalo(*ano)
+    cache = CacheDias()
+    cache.ler(dia)
+    indice = construir_indice_atividades()
+    return {
+        "listar_registros[dia]": medir(lambda: listar_registros(dia), repeticoes * 10),
+        "cache_dias.ler[dia]": medir(lambda: cache.ler(dia), repeticoes * 10),
+        "listar_registros_intervalo[mes]": medir(lambda: listar_registros_intervalo(*mes), repeticoes),
+        "listar_registros_intervalo[ano]": medir(lambda: listar_registros_intervalo(*ano), repeticoes),
+        "calcular_tempo_total[ano]": medir(lambda: calcular_tempo_total(registros_ano), repeticoes),
+        "listar_overlaps_intervalo[ano]": medir(lambda: listar_overlaps_intervalo(*ano), repeticoes),
+        "buscar_registros[2 palavras]": medir(lambda: buscar_registros("reunião plan"), repeticoes),
+        "construir_indice_atividades": medir(construir_indice_atividades, repeticoes),
+        "autocompletar.sugerir[1 letra]": medir(lambda: indice.sugerir("r"), repeticoes * 100),
+        "autocompletar.sugerir[prefixo]": medir(lambda: indice.sugerir("reunião pl"), repeticoes * 100),
+    }
+
+
+def benchmarks_grid(repeticoes):
+    from PyQt6.QtCore import QDate
+    from PyQt6.QtWidgets import QApplication
+
+    import main as aplicativo
+    from utils.funcoes import exibir_registros_do_dia, verificar_overlaps
+
+    dia, _, _ = _periodos()
+    aplicativo.app = QApplication.instance() or QApplication([])
+    janela = aplicativo.TimesheetApp()
+    janela.data_filtro.setDate(QDate.fromString(dia_para_iso(dia), "yyyy-MM-dd"))
+    try:
+        return {
+            # carregar_grid só enfileira a consulta: mede-se a consulta + a exibição que ela dispara
+            "carregar_grid[dia]": medir(lambda: exibir_registros_do_dia(janela, dia, listar_registros(dia)),
+                                        repeticoes * 10),
+            "verificar_overlaps[dia]": medir(lambda: verificar_overlaps(janela), repeticoes * 10),
+        }
+    finally:
+        janela.executor_bd.encerrar()
+        if getattr(janela, "timer_backup", None):
+            janela.timer_backup.stop()
+        janela.deleteLater()
+
+
+def benchmarks_exportacao(repeticoes):
+    from utils.exportacao import exportar_colunar, exportar_excel, exportar_pdf
+
+    _, mes, ano = _periodos()
+    resultados = {}
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, funcao, arquivo, periodo in (
+            ("exportar_excel[ano]", exportar_excel, "bench.xlsx", ano),
+            ("exportar_pdf[mes]", exportar_pdf, "bench.pdf", mes),
+            ("exportar_colunar[ano, parquet]", exportar_colunar, "bench.parquet", ano),
+            ("exportar_colunar[ano, csv]", exportar_colunar, "bench.csv", ano),
+        ):
+            destino = os.path.join(pasta, arquivo)
+            try:
+                resultados[nome] = medir(lambda: funcao(destino, *periodo), max(1, repeticoes // 2), aquecimento=0)
+            except ImportError as e:
+                resultados[nome] = {"pulado": f"dependência ausente: {e.name}"}
+    return resultados
+
+
+GRUPOS = {"banco": benchmarks_banco, "grid": benchmarks_grid, "exportacao": benchmarks_exportacao}
+
+
+# 🔹 Resultado / comparação
+
+def _commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def comparar(atual, base, tolerancia):
+    """Imprime a razão mediana atual/base por benchmark; devolve os nomes acima da tolerância."""
+    regressoes = []
+    print(f"{'benchmark':<36}{'base ms':>12}{'atual ms':>12}{'razão':>9}", file=sys.stderr)
+    for nome, estatisticas in atual["resultados"].items():
+        anterior = base.get("resultados", {}).get(nome, {})
+        if "mediana_ms" not in estatisticas or "mediana_ms" not in anterior:
+            continue
+        razao = estatisticas["mediana_ms"] / anterior["mediana_ms"] if anterior["mediana_ms"] else float("inf")
+        marca = " ⚠️" if razao > tolerancia else ""
+        print(f"{nome:<36}{anterior['mediana_ms']:>12.3f}{estatisticas['mediana_ms']:>12.3f}{razao:>9.2f}{marca}", file=sys.stderr)
+        if razao > tolerancia:
+            regressoes.append(nome)
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.executar", description=__doc__.splitlines()[0])
+    parser.add_argument("--banco", help="banco existente (padrão: gera um sintético temporário)")
+    parser.add_argument("--linhas", type=int, default=100000, help="linhas do banco sintético (padrão: 100000)")
+    parser.add_argument("--anos", type=float, default=5, help="anos cobertos pelo banco sintético (padrão: 5)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--grupos", nargs="+", choices=list(GRUPOS), default=list(GRUPOS))
+    parser.add_argument("--saida", help="arquivo JSON de resultados (padrão: stdout)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerancia", type=float, default=1.25, help="razão máxima aceita na comparação (padrão: 1.25)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = args.banco
+        if not caminho:
+            caminho = os.path.join(pasta, "bench.db")
+            inicio = time.perf_counter()
+            gerar_banco(caminho, args.linhas, args.anos)
+            print(f"Banco sintético com {args.linhas} linhas gerado em {time.perf_counter() - inicio:.1f} s",
+                  file=sys.stderr)
+        definir_banco(caminho)
+
+        linhas = obter_conexao().execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+        resultado = {
+            "meta": {
+                "data": datetime.now().isoformat(timespec="seconds"),
+                "commit": _commit_atual(),
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "plataforma": platform.platform(),
+                "linhas": linhas,
+                "repeticoes": args.repeticoes,
+            },
+            "resultados": {},
+        }
+        for grupo in args.grupos:
+            try:
+                resultado["resultados"].update(GRUPOS[grupo](args.repeticoes))
+            except ImportError as e:
+                print(f"⚠️ Grupo '{grupo}' pulado: dependência ausente ({e.name})", file=sys.stderr)
+        fechar_conexoes()
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            f.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(resultado, json.load(f), args.tolerancia)
+        if regressoes:
+            print(f"❌ Mais lento que {args.tolerancia}x: {', '.join(regressoes)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""Gera bancos sintéticos realistas para benchmarks.
+
+    python -m benchmarks.gerar_banco /tmp/bench.db --linhas 100000 --anos 5
+
+Os registros ficam espalhados pelos dias úteis de `anos` anos até hoje, em
+sequência ao longo do dia, com uma fração de overlaps e algumas atividades longas.
+"""
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+from utils.db import criar_tabela, dia_para_iso, fechar_conexoes, obter_conexao
+
+INICIO_EXPEDIENTE = 6 * 60   # 06:00
+FIM_EXPEDIENTE = 22 * 60     # 22:00
+TAMANHO_LOTE = 10000
+
+PALAVRAS = (
+    "reunião planejamento revisão código deploy suporte cliente chamado análise requisitos "
+    "documentação testes integração homologação produção relatório financeiro sprint daily "
+    "retrospectiva treinamento migração banco correção bug melhoria performance infraestrutura "
+    "orçamento proposta contrato auditoria backlog refinamento entrevista onboarding"
+).split()
+
+
+def _dias_uteis(anos):
+    fim = date.today()
+    dia = fim - timedelta(days=int(365.25 * anos))
+    dias = []
+    while dia <= fim:
+        if dia.weekday() < 5:
+            dias.append(dia)
+        dia += timedelta(days=1)
+    return dias
+
+
+def _atividade(rng, taxa_longas):
+    if rng.random() < taxa_longas:
+        return " ".join(rng.choices(PALAVRAS, k=rng.randint(40, 80))).capitalize()
+    # Vocabulário repetitivo, como no uso real (mesmas atividades dia após dia)
+    return " ".join(rng.choices(PALAVRAS[:12], k=rng.randint(1, 4))).capitalize()
+
+
+def _minutos_para_horario(minutos):
+    return f"{minutos // 60:02}:{minutos % 60:02}"
+
+
+def _gerar_linhas(linhas, anos, rng, taxa_overlap, taxa_longas):
+    dias = _dias_uteis(anos)
+    if linhas > len(dias) * (FIM_EXPEDIENTE - INICIO_EXPEDIENTE):
+        raise ValueError("linhas demais para o período; aumente --anos")
+
+    # Distribui as linhas de forma uniforme (com a sobra nos primeiros dias)
+    por_dia, sobra = divmod(linhas, len(dias))
+    for indice, dia in enumerate(dias):
+        quantidade = por_dia + (1 if indice < sobra else 0)
+        if not quantidade:
+            continue
+        texto_dia = dia.strftime("%d/%m/%y")
+        iso = dia_para_iso(texto_dia)
+        slot = (FIM_EXPEDIENTE - INICIO_EXPEDIENTE) // quantidade
+        for j in range(quantidade):
+            inicio = INICIO_EXPEDIENTE + j * slot
+            fim = inicio + rng.randint(max(1, slot // 2), slot)
+            if rng.random() < taxa_overlap:
+                fim = min(fim + rng.randint(1, max(1, slot)), 23 * 60 + 59)
+            hi, hf = _minutos_para_horario(inicio), _minutos_para_horario(fim)
+            lancado = 1 if rng.random() < 0.7 else 0
+            yield texto_dia, iso, hi, hf, inicio, fim, _atividade(rng, taxa_longas), lancado
+
+
+def gerar_banco(caminho, linhas, anos=5, seed=42, taxa_overlap=0.05, taxa_longas=0.02):
+    """Cria (ou sobrescreve) o banco em `caminho` com `linhas` registros sintéticos."""
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(caminho + sufixo):
+            os.remove(caminho + sufixo)
+
+    criar_tabela(caminho)
+    conn = obter_conexao(caminho)
+    rng = random.Random(seed)
+    sql = """
+        INSERT INTO registros (dia, dia_iso, hora_inicio, hora_fim, inicio_min, fim_min, atividade, lancado)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    with conn:
+        lote = []
+        for linha in _gerar_linhas(linhas, anos, rng, taxa_overlap, taxa_longas):
+            lote.append(linha)
+            if len(lote) >= TAMANHO_LOTE:
+                conn.executemany(sql, lote)
+                lote = []
+        if lote:
+            conn.executemany(sql, lote)
+    conn.execute("ANALYZE")
+    fechar_conexoes()
+    return caminho
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.gerar_banco", description=__doc__.splitlines()[0])
+    parser.add_argument("caminho")
+    parser.add_argument("--linhas", type=int, default=100000)
+    parser.add_argument("--anos", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--taxa-overlap", type=float, default=0.05)
+    parser.add_argument("--taxa-longas", type=float, default=0.02, help="fração de atividades com texto longo")
+    args = parser.parse_args(argv)
+    gerar_banco(args.caminho, args.linhas, args.anos, args.seed, args.taxa_overlap, args.taxa_longas)
+    print(f"✅ {args.linhas} registro(s) gerado(s) em {args.caminho}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,27 @@
-
+from utils import perfil_inicio  # primeiro import: marca o início da medição
 from utils.config import carregar_caminho_bd, salvar_caminho_bd
 from PyQt6.QtWidgets import QFileDialog
 import sys
 import os
 from PyQt6.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QTableWidget, 
-    QHeaderView, QHBoxLayout, QDateEdit, QTimeEdit, QLineEdit, QSizePolicy, QMessageBox, QFrame, QMainWindow
+    QApplication, QWidget, QVBoxLayout, QPushButton, QLabel, QTableView, 
+    QHeaderView, QHBoxLayout, QDateEdit, QTimeEdit, QLineEdit, QSizePolicy, QMessageBox, QFrame, QMainWindow, QCheckBox,
+    QListWidget
 )
-from PyQt6.QtCore import QTimer, QDate, QSize
+from PyQt6.QtCore import QTimer, QDate, QSize, Qt
 from PyQt6.QtGui import QFont, QIcon
 from utils.funcoes import (
     aplicar_tema_escuro, carregar_grid, adicionar_registro,
-    iniciar_cronometro, parar_cronometro, atualizar_tempo, atualizar_registro, exportar_para_excel, exportar_para_pdf, mostrar_sobre, fazer_backup_banco, resource_path
+    iniciar_cronometro, parar_cronometro, atualizar_tempo, atualizar_registro, gravar_edicoes_pendentes, excluir_registro, exportar_para_excel, exportar_para_pdf, exportar_para_analise, verificar_overlaps_periodo, cancelar_tarefa, mostrar_sobre, fazer_backup_banco, importar_registros,
+    buscar_atividades, ao_rolar_resultados, abrir_resultado_busca, ATRASO_BUSCA_MS, abrir_visao_periodo,
+    configurar_notificacoes, encerrar_notificacoes, configurar_executor_banco, configurar_autocompletar, configurar_backup_automatico, backup_ao_fechar, configurar_manutencao_automatica, cancelar_manutencao, manutencao_ao_fechar, resource_path
 )
+from utils.db import fechar_conexoes
+from utils.modelo_grid import RegistrosTableModel, BotaoExcluirDelegate, LancadoDelegate, COL_ACOES, COL_LANCADO
+from utils.exportacao import pre_carregar_dependencias
+from utils.db import criar_tabela
+
+perfil_inicio.marcar("imports")
 
 class TimesheetApp(QMainWindow):
     
@@ -25,6 +34,17 @@ class TimesheetApp(QMainWindow):
         )
 
         if reply == QMessageBox.StandardButton.Yes:
+            cancelar_tarefa(self)
+            if self.tarefa_atual is not None:
+                self.tarefa_atual.wait()
+            cancelar_manutencao(self)  # a fila do banco só esvazia depois dela
+            gravar_edicoes_pendentes(self)
+            self.executor_bd.encerrar()
+            encerrar_notificacoes(self)
+            self.hide()
+            manutencao_ao_fechar(self)  # antes do backup: a cópia já sai compactada
+            backup_ao_fechar(self)
+            fechar_conexoes()
             event.accept()
         else:
             event.ignore()
@@ -102,16 +122,54 @@ class TimesheetApp(QMainWindow):
         configurar_botao(btn_hoje)
         calendario_layout.addWidget(btn_hoje)
 
+        # Busca de atividades em todas as datas
+        self.busca_input = QLineEdit()
+        self.busca_input.setPlaceholderText("🔎 Buscar atividade...")
+        self.busca_input.setClearButtonEnabled(True)
+        calendario_layout.addWidget(self.busca_input)
+
+        # Indicador de consulta em andamento (o banco roda fora da thread da interface)
+        self.carregando_label = QLabel("")
+        calendario_layout.addWidget(self.carregando_label)
+
         #  Adiciona o layout no layout principal
         self.layout.addLayout(calendario_layout)
 
-        # Grid de Registros
-        self.grid = QTableWidget()
-        self.grid.setColumnCount(5)
-        self.grid.setHorizontalHeaderLabels(["Hora Inicial", "Hora Final", "Duração", "Atividade", "Ações"])
+        # Resultados da busca (ocultos enquanto a busca está vazia); clique leva ao dia
+        self.resultados_busca = QListWidget()
+        self.resultados_busca.setMaximumHeight(160)
+        self.resultados_busca.hide()
+        self.resultados_busca.itemClicked.connect(lambda item: abrir_resultado_busca(self, item))
+        self.resultados_busca.verticalScrollBar().valueChanged.connect(lambda valor: ao_rolar_resultados(self, valor))
+        self.layout.addWidget(self.resultados_busca)
+        self.busca_ids = None
+        self.busca_posicao = 0
+        self.busca_esgotada = True
+        self.busca_em_andamento = False
+        self.busca_texto = ""
+        self.registro_a_selecionar = None
+
+        self.timer_busca = QTimer(self)
+        self.timer_busca.setSingleShot(True)
+        self.timer_busca.timeout.connect(lambda: buscar_atividades(self))
+        self.busca_input.textChanged.connect(lambda _: self.timer_busca.start(ATRASO_BUSCA_MS))
+        self.busca_input.returnPressed.connect(lambda: buscar_atividades(self))
+
+        # Grid de Registros (model/view: os registros ficam no model, os delegates pintam Ações e Lançado)
+        self.grid_model = RegistrosTableModel(self)
+        self.grid = QTableView()
+        self.grid.setModel(self.grid_model)
         self.grid.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+
+        self.excluir_delegate = BotaoExcluirDelegate(self.grid)
+        self.excluir_delegate.excluirClicado.connect(lambda id_registro: excluir_registro(self, id_registro))
+        self.grid.setItemDelegateForColumn(COL_ACOES, self.excluir_delegate)
+
+        self.lancado_delegate = LancadoDelegate(self.grid)
+        self.grid.setItemDelegateForColumn(COL_LANCADO, self.lancado_delegate)
         
         # Ativa ordenação das colunas        
+        self.grid.horizontalHeader().setSortIndicator(0, Qt.SortOrder.AscendingOrder)
         self.grid.setSortingEnabled(True)
 
         
@@ -123,7 +181,12 @@ class TimesheetApp(QMainWindow):
         self.grid.setColumnWidth(4, 100)    # Acoes
         self.grid.setColumnWidth(5, 50)     # Checkbox 
         
-        self.grid.itemChanged.connect(lambda item: atualizar_registro(self, item.row(), item.column()))  # 🔹 Monitorar edições    
+        # 🔹 Monitorar edições: ficam na fila e são gravadas juntas após INTERVALO_GRAVACAO_MS
+        self.edicoes_pendentes = {}
+        self.timer_edicoes = QTimer(self)
+        self.timer_edicoes.setSingleShot(True)
+        self.timer_edicoes.timeout.connect(lambda: gravar_edicoes_pendentes(self))
+        self.grid_model.registroEditado.connect(lambda id_registro, campo, valor: atualizar_registro(self, id_registro, campo, valor))
         self.layout.addWidget(self.grid)
 
         # Formulário para Adicionar Registros Manualmente
@@ -158,11 +221,20 @@ class TimesheetApp(QMainWindow):
 
         
         
-        # Label para status da exportação
+        # Label para status da exportação (o link "Cancelar" interrompe a tarefa em andamento)
         self.status_label = QLabel("")
+        self.status_label.setTextInteractionFlags(Qt.TextInteractionFlag.LinksAccessibleByMouse)
+        self.status_label.linkActivated.connect(lambda _: cancelar_tarefa(self))
+        self.tarefa_atual = None
+        self.visao_periodo = None
         self.layout.addWidget(self.status_label)
 
+        perfil_inicio.marcar("janela (widgets)")
+        configurar_executor_banco(self)
+        configurar_notificacoes(self)
         carregar_grid(self)  # Carregar registros ao iniciar a aplicação
+        configurar_autocompletar(self)  # índice das atividades vem depois, na mesma fila do banco
+        perfil_inicio.marcar("carga da grid")
 
         # Layout para os campos de data
         export_layout = QHBoxLayout()
@@ -178,6 +250,9 @@ class TimesheetApp(QMainWindow):
         export_layout.addWidget(QLabel("Até:"))
         export_layout.addWidget(self.data_ate_filtro)
 
+        self.excel_por_mes_checkbox = QCheckBox("Excel: uma aba por mês")
+        export_layout.addWidget(self.excel_por_mes_checkbox)
+
         self.layout.addLayout(export_layout)  #  Adiciona os filtros abaixo da GRID
 
         # Layout horizontal para botões de exportação
@@ -191,7 +266,20 @@ class TimesheetApp(QMainWindow):
         self.pdf_button.clicked.connect(lambda: exportar_para_pdf(self))
         export_buttons_layout.addWidget(self.pdf_button)
 
-        # Adiciona os dois botões no layout principal
+        self.analise_button = QPushButton("📊 Exportar para Análise")
+        self.analise_button.setToolTip("Parquet, Arrow ou CSV com datas, horários, duração e lançado tipados")
+        self.analise_button.clicked.connect(lambda: exportar_para_analise(self))
+        export_buttons_layout.addWidget(self.analise_button)
+
+        self.periodo_button = QPushButton("📆 Ver Período")
+        self.periodo_button.clicked.connect(lambda: abrir_visao_periodo(self))
+        export_buttons_layout.addWidget(self.periodo_button)
+
+        self.overlaps_button = QPushButton("🔍 Verificar Overlaps")
+        self.overlaps_button.clicked.connect(lambda: verificar_overlaps_periodo(self))
+        export_buttons_layout.addWidget(self.overlaps_button)
+
+        # Adiciona os botões no layout principal
         self.layout.addLayout(export_buttons_layout)
 
 
@@ -202,12 +290,19 @@ class TimesheetApp(QMainWindow):
         self.backup_button.clicked.connect(lambda: fazer_backup_banco(self))
         rodape_layout.addWidget(self.backup_button)
 
+        self.importar_button = QPushButton("📥 Importar")
+        self.importar_button.clicked.connect(lambda: importar_registros(self))
+        rodape_layout.addWidget(self.importar_button)
+
         self.sobre_button = QPushButton("ℹ️ Sobre")
         self.sobre_button.clicked.connect(lambda: mostrar_sobre(self))
         rodape_layout.addWidget(self.sobre_button)
 
         self.layout.addLayout(rodape_layout)
 
+        configurar_backup_automatico(self)
+        configurar_manutencao_automatica(self)
+
         container = QWidget()
         container.setLayout(self.layout)
         self.setCentralWidget(container)        
@@ -242,22 +337,39 @@ def verificar_banco_dados():
     return None
 
 
+def mostrar_perfil_inicio():
+    perfil_inicio.marcar("primeira renderização")
+    relatorio = perfil_inicio.relatorio()
+    if sys.stderr:
+        print(relatorio, file=sys.stderr)
+    else:
+        # Executável --windowed não tem console
+        QMessageBox.information(None, "Perfil de inicialização", relatorio)
+
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     
     icone_path = resource_path('assets/TS.ico')
     app.setWindowIcon(QIcon(icone_path))
+    perfil_inicio.marcar("QApplication")
 
     try:
         caminho_bd = verificar_banco_dados()
         if not caminho_bd:
             sys.exit()
 
-        from utils.db import criar_tabela
         criar_tabela(caminho_bd)
+        perfil_inicio.marcar("banco (abrir + schema)")
 
         window = TimesheetApp()
+        perfil_inicio.marcar("janela (restante)")
         window.show()
+
+        if perfil_inicio.ATIVO:
+            QTimer.singleShot(0, mostrar_perfil_inicio)
+        # reportlab/openpyxl só são carregados depois que a janela aparece
+        QTimer.singleShot(0, pre_carregar_dependencias)
         sys.exit(app.exec())
     except Exception as e:
         # Evita qualquer crash feio no PyQt
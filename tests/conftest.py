@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# Nunca ler/gravar o config.json do usuário durante os testes
+os.environ.setdefault("TIMESHEET_CONFIG", os.path.join(tempfile.mkdtemp(prefix="timesheet-testes-"), "config.json"))
+
+from utils import db  # noqa: E402
+
+
+@pytest.fixture
+def banco(tmp_path):
+    """Banco novo, já migrado, ativo durante o teste."""
+    caminho = str(tmp_path / "timesheet.db")
+    db.criar_tabela(caminho)
+    yield caminho
+    db.fechar_conexoes()
@@ -0,0 +1,31 @@
+import pytest
+
+from utils import db
+
+ANOS = range(2010, 2020)  # mais arquivos que MAX_ARQUIVOS_ANEXADOS
+
+
+@pytest.fixture
+def banco_arquivado(banco):
+    db.inserir_registros_em_lote([(f"10/03/{ano % 100:02}", "08:00", "09:00", f"reunião {ano}", 0) for ano in ANOS])
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "reunião atual", 0)])
+    for ano in ANOS:
+        db.arquivar_ano(ano)
+    return banco
+
+
+def test_importacao_com_mais_arquivos_que_o_limite(banco_arquivado):
+    # Uma leitura antiga deixa anexado um conjunto diferente do que a importação usa
+    db.listar_registros_intervalo("01/01/10", "31/12/13")
+    repetidos = [(f"10/03/{ano % 100:02}", "08:00", "09:00", f"reunião {ano}", 0) for ano in ANOS[-db.MAX_ARQUIVOS_ANEXADOS:]]
+    _, inseridos = db.inserir_registros_em_lote(repetidos)
+    assert inseridos == 0
+
+
+def test_busca_e_autocompletar_leem_os_arquivos(banco_arquivado):
+    ids = db.buscar_ids("reunião")
+    assert sorted(r[4] for r in db.listar_registros_por_ids(ids)) == sorted(
+        [f"reunião {ano}" for ano in ANOS] + ["reunião atual"])
+    estatisticas = {atividade: (quantidade, ultimo) for atividade, quantidade, ultimo in db.listar_estatisticas_atividades()}
+    assert estatisticas["reunião 2012"] == (1, "2012-03-10")
+    assert len(estatisticas) == len(ANOS) + 1
@@ -0,0 +1,11 @@
+from datetime import date
+
+from utils.autocompletar import IndiceAtividades
+
+
+def test_dia_nulo_ou_malformado_nao_impede_o_indice():
+    indice = IndiceAtividades([("Reunião", 3, None), ("Relatório", 1, "2025-13-99"), ("Revisão", 2, "2025-03-10")],
+                              hoje=date(2025, 3, 10))
+    assert indice.sugerir("re") == ["Revisão", "Reunião", "Relatório"]
+    indice.registrar_uso("Relatório", "xx/yy")
+    assert "Relatório" in indice.sugerir("rel")
@@ -0,0 +1,22 @@
+from utils import db
+
+
+def test_paginas_nao_repetem_nem_pulam_com_gravacoes_no_meio(banco):
+    db.inserir_registros_em_lote([("10/03/25", f"{h:02}:00", f"{h:02}:30", f"reunião {'planejamento ' * (i % 5)}{i}", 0)
+                                  for i, h in enumerate(list(range(24)) * 5)])
+    ids = db.buscar_ids("reunião")
+    assert len(ids) == 120
+
+    vistos = []
+    for inicio in range(0, len(ids), 50):
+        # Gravações entre as páginas mudam as estatísticas do bm25
+        db.inserir_registro("08:00", "09:00", "reunião reunião reunião", "11/03/25")
+        vistos += [r[0] for r in db.listar_registros_por_ids(ids[inicio:inicio + 50])]
+    assert vistos == ids
+
+
+def test_registro_excluido_some_da_pagina(banco):
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "reunião", 0), ("10/03/25", "09:00", "10:00", "reunião", 0)])
+    ids = db.buscar_ids("reun")
+    db.excluir_registro(ids[0])
+    assert [r[0] for r in db.listar_registros_por_ids(ids)] == ids[1:]
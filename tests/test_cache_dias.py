@@ -0,0 +1,33 @@
+import sqlite3
+
+from utils import db
+from utils.cache_dias import CacheDias
+
+
+def test_gravacao_de_outro_processo_descarta_o_cache(banco):
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "A", 0)])
+    cache = CacheDias()
+    assert [r[4] for r in cache.ler("10/03/25")] == ["A"]
+
+    # Outra instância (ou versão antiga do app) grava no mesmo arquivo, sem notificar
+    externa = sqlite3.connect(banco)
+    with externa:
+        externa.execute("INSERT INTO registros (dia, hora_inicio, hora_fim, atividade, lancado) "
+                        "VALUES ('10/03/25', '09:00', '10:00', 'B', 0)")
+    externa.close()
+
+    assert [r[4] for r in cache.ler("10/03/25")] == ["A", "B"]
+
+
+def test_gravacao_propria_invalida_so_o_dia(banco):
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "A", 0), ("11/03/25", "08:00", "09:00", "C", 0)])
+    cache = CacheDias()
+    db.assinar_mudancas(cache.ao_mudar)
+    try:
+        cache.ler("10/03/25")
+        cache.ler("11/03/25")
+        db.inserir_registro("09:00", "10:00", "B", "10/03/25")
+        assert not cache.contem("10/03/25") and cache.contem("11/03/25")
+        assert [r[4] for r in cache.ler("10/03/25")] == ["A", "B"]
+    finally:
+        db.cancelar_assinatura(cache.ao_mudar)
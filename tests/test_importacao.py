@@ -0,0 +1,30 @@
+import io
+import json
+
+import pytest
+
+from utils.importacao import _elementos_array_json
+
+ELEMENTOS = [
+    {"dia": "10/03/25", "hora_inicio": "08:00", "hora_fim": "09:00", "atividade": "reunião [planejamento], \"Q1\""},
+    {"dia": "10/03/25", "hora_inicio": "09:00", "hora_fim": "10:30", "atividade": "ç" * 40, "lancado": True},
+    {"dia": "11/03/25", "hora_inicio": "08:00", "hora_fim": "08:15", "atividade": "x", "lancado": None},
+    12345,
+]
+
+
+@pytest.mark.parametrize("tamanho_bloco", [1, 3, 7, 64, 1 << 16])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_array_json_lido_por_partes(tamanho_bloco, indent):
+    texto = json.dumps(ELEMENTOS, ensure_ascii=False, indent=indent)
+    assert list(_elementos_array_json(io.StringIO(texto), tamanho_bloco)) == ELEMENTOS
+
+
+@pytest.mark.parametrize("texto", ['[{"a": 1}, {"b": ', '[{"a": 1}', '[{"a": 1}, oops]'])
+def test_array_json_malformado(texto):
+    with pytest.raises(ValueError):
+        list(_elementos_array_json(io.StringIO(texto), 4))
+
+
+def test_array_json_vazio():
+    assert list(_elementos_array_json(io.StringIO(" [ ] "), 2)) == []
@@ -0,0 +1,25 @@
+import pytest
+
+from utils import db
+from utils.manutencao import ManutencaoCancelada, fazer_manutencao
+
+
+def test_manutencao_rapida(banco):
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "A", 0)])
+    resultado = fazer_manutencao(banco, rapida=True)
+    assert resultado.integridade == ["ok"]
+    assert db.obter_conexao().execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+
+
+def test_cancelamento_interrompe_comando_longo(banco):
+    db.inserir_registros_em_lote([(f"{d:02}/03/25", "08:00", "09:00", f"atividade {i}", 0)
+                                  for d in range(1, 29) for i in range(200)])
+    consultas = []
+
+    def cancelado():
+        consultas.append(1)
+        return True
+
+    with pytest.raises(ManutencaoCancelada):
+        fazer_manutencao(banco, cancelado=cancelado)
+    assert consultas  # consultado já durante o integrity_check, pelo progress handler
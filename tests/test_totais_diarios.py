@@ -0,0 +1,46 @@
+import sqlite3
+
+import pytest
+
+from utils import db
+from utils.tempo import horario_para_minutos
+
+
+def _totais(conn):
+    return conn.execute("SELECT * FROM daily_totals ORDER BY dia_iso").fetchall()
+
+
+@pytest.mark.parametrize("texto", [
+    "08:00", "8:05", "0:0", "23:59", "24:00", "12:60", "25:99",
+    "08:00:00", "8:00x", " 8:00", "+8:00", "08:", ":30", "0800", "", None,
+])
+def test_sql_minutos_igual_ao_python(texto):
+    conn = sqlite3.connect(":memory:")
+    sql = conn.execute(f"SELECT {db._sql_minutos('x')} FROM (SELECT ? AS x)", (texto,)).fetchone()[0]
+    assert sql == horario_para_minutos(texto)
+
+
+def test_totais_incrementais_iguais_a_reconstrucao_apos_horario_invalido(banco):
+    db.inserir_registros_em_lote([("10/03/25", "08:00", "09:00", "A", 0), ("10/03/25", "10:00", "11:00", "B", 1)])
+    conn = db.obter_conexao()
+    id_a = conn.execute("SELECT id FROM registros WHERE atividade = 'A'").fetchone()[0]
+
+    db.atualizar_campos_registros({id_a: {"hora_inicio": "08:00:00"}})
+
+    assert conn.execute("SELECT inicio_min FROM registros WHERE id = ?", (id_a,)).fetchone()[0] is None
+    incrementais = _totais(conn)
+    db.reconstruir_totais_diarios()
+    assert _totais(conn) == incrementais == [("2025-03-10", 60, 2, 60, 0)]
+
+
+def test_trigger_preenche_minutos_de_quem_nao_grava(banco):
+    # Versões antigas do app só gravam os textos dos horários
+    conn = db.obter_conexao()
+    with conn:
+        conn.execute("INSERT INTO registros (dia, hora_inicio, hora_fim, atividade, lancado) "
+                     "VALUES ('10/03/25', '08:00', '09:30', 'A', 0)")
+        conn.execute("UPDATE registros SET hora_fim = '10:00'")
+    assert conn.execute("SELECT inicio_min, fim_min FROM registros").fetchone() == (480, 600)
+    incrementais = _totais(conn)
+    db.reconstruir_totais_diarios()
+    assert _totais(conn) == incrementais == [("2025-03-10", 120, 1, 0, 120)]
@@ -0,0 +1,7 @@
+"""Ponto de entrada da linha de comando: python -m timesheet <comando> (ver utils/cli.py)."""
+import sys
+
+from utils.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Índice de prefixos das atividades já lançadas, para o autocompletar (sem dependência de Qt).
+
+As atividades distintas ficam num array ordenado pela chave (texto em casefold);
+bisect acha a faixa de um prefixo e a faixa é ranqueada por frequência ponderada
+pela recência. Prefixos de faixa grande (uma ou duas letras) guardam o top-N já
+pronto, mantido a cada lançamento — a consulta nunca varre milhares de atividades.
+"""
+import heapq
+from bisect import bisect_left
+from datetime import date
+
+from utils.db import dia_para_iso, listar_estatisticas_atividades
+
+LIMITE_SUGESTOES = 10
+LIMITE_VARREDURA = 256   # faixas maiores que isso usam (e memorizam) o top-N do prefixo
+MEIA_VIDA_DIAS = 30      # uso de 30 dias atrás vale metade de um uso de hoje
+_FIM_PREFIXO = "\U0010ffff"
+
+
+def _dia_ordinal(dia_iso):
+    """Ordinal do dia; 0 (sem último uso conhecido) para dia_iso NULL ou malformado (dados antigos)."""
+    try:
+        return date.fromisoformat(dia_iso).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def _dia_ordinal_de(dia):
+    try:
+        return _dia_ordinal(dia_para_iso(dia))
+    except (AttributeError, ValueError):
+        return 0
+
+
+class IndiceAtividades:
+    """Atividades distintas com (contagem, último dia) e consulta por prefixo."""
+
+    def __init__(self, estatisticas=(), hoje=None):
+        """estatisticas: (atividade, quantidade de lançamentos, último dia ISO)."""
+        self._hoje = (hoje or date.today()).toordinal()
+        self._estatisticas = {}  # texto → [contagem, último dia (ordinal)]
+        for texto, contagem, ultimo_iso in estatisticas:
+            texto = texto.strip()
+            item = self._estatisticas.setdefault(texto, [0, 0])
+            item[0] += contagem
+            item[1] = max(item[1], _dia_ordinal(ultimo_iso))
+
+        pares = sorted((texto.casefold(), texto) for texto in self._estatisticas)
+        self._chaves = [chave for chave, _ in pares]
+        self._textos = [texto for _, texto in pares]
+
+        # 🔹 Top-N pronto para os prefixos curtos de faixa grande (os mais digitados)
+        self._top = {}
+        for prefixo in {chave[:n] for chave in self._chaves for n in (1, 2)}:
+            inicio, fim = self._faixa(prefixo)
+            if fim - inicio > LIMITE_VARREDURA:
+                self._top[prefixo] = self._melhores(self._textos[inicio:fim])
+
+    def __len__(self):
+        return len(self._textos)
+
+    def _pontuacao(self, texto):
+        contagem, ultimo = self._estatisticas[texto]
+        return contagem / (1 + max(0, self._hoje - ultimo) / MEIA_VIDA_DIAS)
+
+    def _faixa(self, prefixo):
+        return bisect_left(self._chaves, prefixo), bisect_left(self._chaves, prefixo + _FIM_PREFIXO)
+
+    def _melhores(self, textos, limite=LIMITE_SUGESTOES):
+        return heapq.nlargest(limite, textos, key=self._pontuacao)
+
+    def _prefixos_memorizados(self, chave):
+        return [chave[:n] for n in range(1, len(chave) + 1) if chave[:n] in self._top]
+
+    # 🔹 Consulta
+    def sugerir(self, texto, limite=LIMITE_SUGESTOES):
+        """Atividades que começam com `texto` (sem diferenciar maiúsculas), as mais usadas primeiro."""
+        prefixo = texto.lstrip().casefold()
+        if not prefixo:
+            return []
+        top = self._top.get(prefixo)
+        if top is None:
+            inicio, fim = self._faixa(prefixo)
+            if fim - inicio <= LIMITE_VARREDURA:
+                return self._melhores(self._textos[inicio:fim], limite)
+            top = self._top[prefixo] = self._melhores(self._textos[inicio:fim])
+        return top[:limite]
+
+    # 🔹 Atualização incremental
+    def registrar_uso(self, texto, dia=None):
+        """Soma um lançamento de `texto` (dia dd/mm/yy; padrão: hoje)."""
+        texto = texto.strip()
+        if not texto:
+            return
+        chave = texto.casefold()
+        item = self._estatisticas.get(texto)
+        if item is None:
+            item = self._estatisticas[texto] = [0, 0]
+            posicao = bisect_left(self._chaves, chave)
+            self._chaves.insert(posicao, chave)
+            self._textos.insert(posicao, texto)
+        item[0] += 1
+        item[1] = max(item[1], _dia_ordinal_de(dia) if dia else self._hoje)
+
+        # A pontuação só subiu: basta reposicionar o texto nos top-N que o incluem
+        for prefixo in self._prefixos_memorizados(chave):
+            top = self._top[prefixo]
+            if texto not in top:
+                top.append(texto)
+            top.sort(key=self._pontuacao, reverse=True)
+            del top[LIMITE_SUGESTOES:]
+
+    def remover_uso(self, texto):
+        """Desconta um lançamento de `texto` (exclusão); some do índice ao chegar a zero."""
+        texto = texto.strip()
+        item = self._estatisticas.get(texto)
+        if item is None:
+            return
+        item[0] -= 1
+        chave = texto.casefold()
+        if item[0] <= 0:
+            del self._estatisticas[texto]
+            posicao = bisect_left(self._chaves, chave)
+            while self._textos[posicao] != texto:
+                posicao += 1
+            del self._chaves[posicao]
+            del self._textos[posicao]
+
+        # A pontuação caiu: os top-N que o incluem são refeitos na próxima consulta
+        for prefixo in self._prefixos_memorizados(chave):
+            if texto in self._top[prefixo]:
+                del self._top[prefixo]
+
+
+def construir_indice_atividades():
+    """Lê as atividades do banco e monta o índice (chamar fora da thread da interface)."""
+    return IndiceAtividades(listar_estatisticas_atividades())
@@ -0,0 +1,94 @@
+"""Backups consistentes do banco com a API de backup do SQLite (sem dependência de Qt)."""
+import glob
+import gzip
+import os
+import shutil
+import sqlite3
+from datetime import datetime
+
+from utils.db import conectar
+from utils.instrumentacao import medido
+
+PAGINAS_POR_PASSO = 256
+PREFIXO_AUTOMATICO = "timesheet_"
+
+
+class BackupCancelado(Exception):
+    pass
+
+
+class BackupInvalido(Exception):
+    pass
+
+
+def verificar_integridade(caminho):
+    """Roda PRAGMA integrity_check no arquivo; levanta BackupInvalido se não vier 'ok'."""
+    conn = sqlite3.connect(caminho)
+    try:
+        resultado = [linha[0] for linha in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    if resultado != ["ok"]:
+        raise BackupInvalido("Falha na verificação de integridade do backup:\n" + "\n".join(resultado[:10]))
+
+
+@medido()
+def fazer_backup(destino, origem=None, compactar=None, progresso=None, cancelado=None):
+    """Copia o banco para destino página a página, sem bloquear gravações de outras conexões.
+
+    A cópia (inclusive o conteúdo ainda no WAL) é verificada com integrity_check
+    antes de ocupar o lugar do destino. Com compactar=True (padrão para destinos
+    .gz) o arquivo final é gravado com gzip. Retorna o caminho gravado.
+    """
+    if compactar is None:
+        compactar = destino.endswith(".gz")
+    temporario = destino + ".tmp"
+
+    def ao_copiar(status, restantes, total):
+        if cancelado and cancelado():
+            raise BackupCancelado()
+        if progresso:
+            progresso(total - restantes, total)
+
+    origem_conn = conectar(origem)
+    destino_conn = sqlite3.connect(temporario)
+    try:
+        origem_conn.backup(destino_conn, pages=PAGINAS_POR_PASSO, progress=ao_copiar)
+        destino_conn.execute("PRAGMA journal_mode = DELETE")
+        destino_conn.close()
+        verificar_integridade(temporario)
+
+        if compactar:
+            with open(temporario, "rb") as entrada, gzip.open(destino, "wb") as saida:
+                shutil.copyfileobj(entrada, saida)
+            os.remove(temporario)
+        else:
+            os.replace(temporario, destino)
+    except BaseException:
+        destino_conn.close()
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+    finally:
+        origem_conn.close()
+    return destino
+
+
+@medido()
+def fazer_backup_automatico(pasta, manter=10, progresso=None, cancelado=None):
+    """Backup compactado com data/hora no nome, mantendo só os `manter` mais recentes na pasta."""
+    os.makedirs(pasta, exist_ok=True)
+    nome = f"{PREFIXO_AUTOMATICO}{datetime.now():%Y%m%d_%H%M%S}.db.gz"
+    destino = fazer_backup(os.path.join(pasta, nome), compactar=True, progresso=progresso, cancelado=cancelado)
+    rotacionar_backups(pasta, manter)
+    return destino
+
+
+def rotacionar_backups(pasta, manter):
+    """Apaga os backups automáticos mais antigos além dos `manter` mais recentes."""
+    backups = sorted(glob.glob(os.path.join(pasta, f"{PREFIXO_AUTOMATICO}*.db.gz")))
+    for antigo in backups[:-manter] if manter > 0 else []:
+        try:
+            os.remove(antigo)
+        except OSError:
+            pass
@@ -0,0 +1,122 @@
+"""Cache LRU dos registros por dia, para a navegação entre datas (sem dependência de Qt).
+
+Cada dia fica guardado em colunas (DiaEmCache) em vez de uma tupla por linha: o
+texto do dia aparece uma vez só, os horários "HH:MM" são internados (no máximo
+1440 strings distintas para o app inteiro) e ids/lançado viram arrays compactos.
+
+A invalidação vem das notificações do banco (assinar_mudancas): cada gravação
+deste processo descarta só os dias que ela tocou. Gravações de fora (outra
+instância ou versão antiga do app no mesmo arquivo compartilhado) não notificam:
+antes de servir um dia, ler() confere PRAGMA data_version e, se mudou, descarta
+o cache inteiro. ler()/preaquecer() rodam sempre na thread do banco (executor),
+cuja conexão faz as gravações do app; contem() pode ser chamado da thread da
+interface — o acesso é protegido por um lock.
+"""
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from utils.db import LOTE, listar_registros, versao_dados
+
+CAPACIDADE_PADRAO = 60  # dias
+
+
+class DiaEmCache:
+    """Registros de um dia em colunas; registros() remonta as linhas do SELECT."""
+
+    __slots__ = ("dia", "ids", "horas_inicio", "horas_fim", "atividades", "lancados")
+
+    def __init__(self, dia, registros):
+        self.dia = dia
+        self.ids = array("q", (r[0] for r in registros))
+        self.horas_inicio = tuple(sys.intern(r[2]) for r in registros)
+        self.horas_fim = tuple(sys.intern(r[3]) for r in registros)
+        self.atividades = tuple(r[4] for r in registros)
+        self.lancados = bytes(1 if r[5] else 0 for r in registros)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def registros(self):
+        dia = self.dia
+        return [(id_registro, dia, hora_inicio, hora_fim, atividade, lancado)
+                for id_registro, hora_inicio, hora_fim, atividade, lancado
+                in zip(self.ids, self.horas_inicio, self.horas_fim, self.atividades, self.lancados)]
+
+
+class CacheDias:
+    """LRU limitado de DiaEmCache por dia (dd/mm/yy)."""
+
+    def __init__(self, capacidade=CAPACIDADE_PADRAO):
+        self.capacidade = capacidade
+        self._dias = OrderedDict()
+        self._lock = threading.Lock()
+        # Sobe a cada invalidação: uma leitura que cruzou uma gravação não é guardada
+        self._geracao = 0
+        self._versao_dados = None
+
+    def obter(self, dia):
+        """Linhas do dia se estiverem no cache (marcando-o como recente); senão None."""
+        with self._lock:
+            item = self._dias.get(dia)
+            if item is None:
+                return None
+            self._dias.move_to_end(dia)
+        return item.registros()
+
+    def contem(self, dia):
+        with self._lock:
+            return dia in self._dias
+
+    def _validar(self):
+        """Descarta tudo se outra conexão gravou no banco desde a última consulta."""
+        versao = versao_dados()
+        with self._lock:
+            if versao != self._versao_dados:
+                self._versao_dados = versao
+                self._geracao += 1
+                self._dias.clear()
+
+    def ler(self, dia):
+        """Linhas do dia, do cache ou do banco (guardando o resultado). Chamar na thread do banco."""
+        self._validar()
+        return self._ler(dia)
+
+    def _ler(self, dia):
+        registros = self.obter(dia)
+        if registros is not None:
+            return registros
+        with self._lock:
+            geracao = self._geracao
+        registros = listar_registros(dia)
+        item = DiaEmCache(dia, registros)
+        with self._lock:
+            if geracao == self._geracao:
+                self._dias[dia] = item
+                self._dias.move_to_end(dia)
+                while len(self._dias) > self.capacidade:
+                    self._dias.popitem(last=False)
+        return registros
+
+    def preaquecer(self, dia):
+        """Como ler(), mas sem devolver as linhas (pré-carga dos dias vizinhos)."""
+        self._validar()
+        if not self.contem(dia):
+            self._ler(dia)
+
+    def invalidar(self, dias):
+        with self._lock:
+            self._geracao += 1
+            for dia in dias:
+                self._dias.pop(dia, None)
+
+    def ao_mudar(self, mudancas):
+        """Ouvinte de assinar_mudancas: descarta os dias tocados pela transação."""
+        dias = set()
+        for mudanca in mudancas:
+            if mudanca.tipo == LOTE:
+                dias.update(mudanca.campos["dias"])
+            else:
+                dias.add(mudanca.registro[1])
+        self.invalidar(dias)
@@ -0,0 +1,242 @@
+"""Linha de comando sem interface gráfica (python -m timesheet) — não importa PyQt6."""
+import argparse
+import sys
+from datetime import date, datetime
+
+from utils.config import carregar_caminho_bd, carregar_config_backup
+from utils.db import (
+    arquivar_ano, buscar_registros, caminho_arquivo_anual, criar_tabela, fechar_conexoes, inserir_registro,
+    listar_arquivos_anuais, listar_registros_intervalo, reconstruir_totais_diarios, resumo_totais,
+)
+from utils.tempo import calcular_duracao, formatar_minutos
+
+FORMATOS_DATA = ("%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d")
+
+
+def _data(valor):
+    """Aceita dd/mm/yy, dd/mm/yyyy, yyyy-mm-dd ou 'hoje' e devolve dd/mm/yy (formato do banco)."""
+    if valor == "hoje":
+        return date.today().strftime("%d/%m/%y")
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(valor, formato).strftime("%d/%m/%y")
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"data inválida: {valor!r} (use dd/mm/yy, dd/mm/yyyy ou yyyy-mm-dd)")
+
+
+def _horario(valor):
+    try:
+        return datetime.strptime(valor, "%H:%M").strftime("%H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"horário inválido: {valor!r} (use HH:MM)")
+
+
+def _mostrar_progresso(feitos, total):
+    if sys.stderr:
+        if not total:  # total desconhecido (leitura em streaming): só a contagem
+            print(f"\r{feitos} linha(s)", end="", file=sys.stderr, flush=True)
+            return
+        percentual = int(feitos * 100 / total)
+        print(f"\r{percentual:3d}% ({feitos}/{total})", end="", file=sys.stderr, flush=True)
+
+
+def _fim_progresso():
+    if sys.stderr:
+        print(file=sys.stderr)
+
+
+# 🔹 Comandos
+
+def cmd_add(args):
+    inserir_registro(args.inicio, args.fim, args.atividade, args.dia)
+    print(f"✅ Registro adicionado em {args.dia}: {args.inicio}–{args.fim} {args.atividade}")
+
+
+def cmd_list(args):
+    for _, dia, hi, hf, atividade, lancado in listar_registros_intervalo(args.de, args.ate):
+        print(f"{dia}  {hi}  {hf}  {calcular_duracao(hi, hf):>8}  {'✔' if lancado else ' '}  {atividade}")
+
+
+def cmd_search(args):
+    for _, dia, hi, hf, atividade, lancado in buscar_registros(args.texto, args.limite):
+        print(f"{dia}  {hi}  {hf}  {calcular_duracao(hi, hf):>8}  {'✔' if lancado else ' '}  {atividade}")
+
+
+def cmd_report(args):
+    print(f"{'Período':<12}{'Total':>10}{'Registros':>11}{'Lançado':>10}{'Não lançado':>13}")
+    soma = [0, 0, 0, 0]
+    for periodo, total, qtd, lancados, nao_lancados in resumo_totais(args.de, args.ate, args.por):
+        print(f"{periodo:<12}{formatar_minutos(total):>10}{qtd:>11}{formatar_minutos(lancados):>10}"
+              f"{formatar_minutos(nao_lancados):>13}")
+        soma = [a + b for a, b in zip(soma, (total, qtd, lancados, nao_lancados))]
+    print(f"{'Total':<12}{formatar_minutos(soma[0]):>10}{soma[1]:>11}{formatar_minutos(soma[2]):>10}"
+          f"{formatar_minutos(soma[3]):>13}")
+
+
+def cmd_export_xlsx(args):
+    from utils.exportacao import exportar_excel
+    total = exportar_excel(args.arquivo, args.de, args.ate, args.por_mes, progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(f"✅ {total} registro(s) exportado(s) para {args.arquivo}" if total else
+          "⚠️ Nenhum registro encontrado no período selecionado.")
+
+
+def cmd_export_pdf(args):
+    from utils.exportacao import exportar_pdf
+    total = exportar_pdf(args.arquivo, args.de, args.ate, progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(f"✅ {total} registro(s) exportado(s) para {args.arquivo}" if total else
+          "⚠️ Nenhum registro encontrado no período selecionado.")
+
+
+def cmd_export_data(args):
+    from utils.exportacao import exportar_colunar
+    total = exportar_colunar(args.arquivo, args.de, args.ate, args.formato, progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(f"✅ {total} registro(s) exportado(s) para {args.arquivo}" if total else
+          "⚠️ Nenhum registro encontrado no período selecionado.")
+
+
+def cmd_backup(args):
+    from utils.backup import fazer_backup, fazer_backup_automatico
+    if args.destino:
+        destino = fazer_backup(args.destino, progresso=_mostrar_progresso)
+    else:
+        config = carregar_config_backup()
+        pasta = args.pasta or config["pasta"]
+        if not pasta:
+            raise SystemExit("❌ Informe o destino, --pasta ou configure backup_automatico.pasta no config.json.")
+        destino = fazer_backup_automatico(pasta, args.manter or int(config["manter"]), progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(f"✅ Backup criado e verificado: {destino}")
+
+
+def cmd_import(args):
+    from utils.importacao import importar_arquivo, resumo_importacao
+    resultado = importar_arquivo(args.arquivo, progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(resumo_importacao(resultado, max_detalhes=args.detalhes))
+
+
+def cmd_rebuild_totals(args):
+    reconstruir_totais_diarios()
+    print("✅ Totais diários reconstruídos.")
+
+
+def cmd_maintenance(args):
+    from utils.manutencao import fazer_manutencao, resumo_manutencao
+    resultado = fazer_manutencao(converter=not args.sem_vacuum_completo, progresso=_mostrar_progresso)
+    _fim_progresso()
+    print(resumo_manutencao(resultado))
+    antes, depois = resultado.antes, resultado.depois
+    print(f"   páginas {antes.paginas} → {depois.paginas}, arquivo {antes.tamanho_bytes} → {depois.tamanho_bytes} bytes")
+    if resultado.integridade != ["ok"]:
+        raise SystemExit(1)
+
+
+def cmd_archive(args):
+    if args.ano is None:
+        arquivos = listar_arquivos_anuais()
+        if not arquivos:
+            print("Nenhum ano arquivado.")
+        for ano, caminho in sorted(arquivos.items()):
+            print(f"{ano}  {caminho}")
+        return
+    movidos = arquivar_ano(args.ano)
+    print(f"✅ {movidos} registro(s) de {args.ano} movido(s) para {caminho_arquivo_anual(args.ano)}")
+
+
+# 🔹 Argumentos
+
+def _adicionar_periodo(parser):
+    parser.add_argument("--de", type=_data, default=_data("hoje"), help="data inicial (padrão: hoje)")
+    parser.add_argument("--ate", type=_data, default=_data("hoje"), help="data final (padrão: hoje)")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(prog="python -m timesheet", description="Timesheet Tracker sem interface gráfica.")
+    parser.add_argument("--banco", help="caminho do banco SQLite (padrão: o do config.json)")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("add", help="adiciona um registro")
+    p.add_argument("inicio", type=_horario, help="hora inicial HH:MM")
+    p.add_argument("fim", type=_horario, help="hora final HH:MM")
+    p.add_argument("atividade")
+    p.add_argument("--dia", type=_data, default=_data("hoje"), help="dia do registro (padrão: hoje)")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("list", help="lista os registros do período")
+    _adicionar_periodo(p)
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("search", help="busca registros pela atividade, em todas as datas")
+    p.add_argument("texto")
+    p.add_argument("--limite", type=int, default=20, help="máximo de resultados (padrão: 20)")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("report", help="resumo de horas do período")
+    _adicionar_periodo(p)
+    p.add_argument("--por", choices=["dia", "semana", "mes", "ano"], default="dia", help="agrupamento (padrão: dia)")
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser("export-xlsx", help="exporta o período para Excel")
+    p.add_argument("arquivo")
+    _adicionar_periodo(p)
+    p.add_argument("--por-mes", action="store_true", help="uma aba por mês")
+    p.set_defaults(func=cmd_export_xlsx)
+
+    p = sub.add_parser("export-pdf", help="exporta o período para PDF")
+    p.add_argument("arquivo")
+    _adicionar_periodo(p)
+    p.set_defaults(func=cmd_export_pdf)
+
+    p = sub.add_parser("export-data", help="exporta o período em Parquet, Arrow IPC ou CSV (tipado, para análise)")
+    p.add_argument("arquivo", help="destino .parquet, .arrow ou .csv")
+    _adicionar_periodo(p)
+    p.add_argument("--formato", choices=["parquet", "arrow", "csv"], help="padrão: pela extensão do arquivo")
+    p.set_defaults(func=cmd_export_data)
+
+    p = sub.add_parser("backup", help="backup verificado do banco")
+    p.add_argument("destino", nargs="?", help="arquivo de destino (.db ou .db.gz); sem ele, backup automático na pasta")
+    p.add_argument("--pasta", help="pasta do backup automático (padrão: backup_automatico.pasta do config.json)")
+    p.add_argument("--manter", type=int, help="quantos backups automáticos manter")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("import", help="importa registros de CSV, XLSX ou JSON numa única transação")
+    p.add_argument("arquivo")
+    p.add_argument("--detalhes", type=int, default=20, help="máximo de linhas inválidas/overlaps listados (padrão: 20)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("rebuild-totals", help="reconstrói a tabela de totais diários")
+    p.set_defaults(func=cmd_rebuild_totals)
+
+    p = sub.add_parser("maintenance", help="integridade, vacuum incremental e estatísticas do banco")
+    p.add_argument("--sem-vacuum-completo", action="store_true",
+                   help="não converte bancos antigos para vacuum incremental (evita reescrever o arquivo)")
+    p.set_defaults(func=cmd_maintenance)
+
+    p = sub.add_parser("archive", help="move um ano encerrado para um arquivo anual (sem ANO: lista os arquivos)")
+    p.add_argument("ano", type=int, nargs="?")
+    p.set_defaults(func=cmd_archive)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+
+    caminho = args.banco or carregar_caminho_bd()
+    if not caminho:
+        print("❌ Banco de dados não configurado. Use --banco ou configure caminho_banco no config.json.", file=sys.stderr)
+        return 2
+
+    try:
+        criar_tabela(caminho)
+        args.func(args)
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        fechar_conexoes()
+    return 0
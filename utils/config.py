@@ -1,17 +1,88 @@
 import os
+import sys
 import json
+import copy
+import shutil
+import tempfile
+import threading
 
-CONFIG_PATH = "config.json"
+NOME_ARQUIVO_CONFIG = "config.json"
+
+
+def _pasta_config_usuario():
+    """Pasta de configuração do usuário (AppData, Application Support ou XDG)."""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "Timesheet")
+    if sys.platform == "darwin":
+        return os.path.expanduser("~/Library/Application Support/Timesheet")
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "timesheet")
+
+
+def _resolver_config_path():
+    # TIMESHEET_CONFIG permite apontar para outro arquivo (ex.: testes, servidor)
+    if os.environ.get("TIMESHEET_CONFIG"):
+        return os.environ["TIMESHEET_CONFIG"]
+    caminho = os.path.join(_pasta_config_usuario(), NOME_ARQUIVO_CONFIG)
+
+    # Migra o config.json antigo (pasta de trabalho) na primeira execução
+    antigo = os.path.abspath(NOME_ARQUIVO_CONFIG)
+    if not os.path.exists(caminho) and os.path.exists(antigo):
+        try:
+            os.makedirs(os.path.dirname(caminho), exist_ok=True)
+            shutil.copy2(antigo, caminho)
+        except OSError:
+            return antigo
+    return caminho
+
+
+CONFIG_PATH = _resolver_config_path()
+
+# Cache em memória: o arquivo só é relido quando o mtime muda
+_cache = None
+_cache_mtime = None
+_lock = threading.Lock()
+
+
+def _mtime():
+    try:
+        return os.stat(CONFIG_PATH).st_mtime_ns
+    except OSError:
+        return None
 
 def carregar_config():
-    if os.path.exists(CONFIG_PATH):
-        with open(CONFIG_PATH, "r") as f:
-            return json.load(f)
-    return {}
+    global _cache, _cache_mtime
+    with _lock:
+        mtime = _mtime()
+        if _cache is None or mtime != _cache_mtime:
+            if mtime is None:
+                _cache = {}
+            else:
+                with open(CONFIG_PATH, "r") as f:
+                    _cache = json.load(f)
+            _cache_mtime = mtime
+        return copy.deepcopy(_cache)
 
 def salvar_config(config):
-    with open(CONFIG_PATH, "w") as f:
-        json.dump(config, f, indent=4)
+    """Grava de forma atômica (arquivo temporário + rename) e atualiza o cache."""
+    global _cache, _cache_mtime
+    pasta = os.path.dirname(os.path.abspath(CONFIG_PATH))
+    os.makedirs(pasta, exist_ok=True)
+    with _lock:
+        fd, temporario = tempfile.mkstemp(prefix=".config-", suffix=".tmp", dir=pasta)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(config, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporario, CONFIG_PATH)
+        except BaseException:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            raise
+        _cache = copy.deepcopy(config)
+        _cache_mtime = _mtime()
 
 # BANCO DE DADOS
 
@@ -36,3 +107,38 @@ def salvar_ultimo_diretorio_exportacao(caminho):
     config = carregar_config()
     config["ultimo_diretorio_exportacao"] = pasta
     salvar_config(config)
+
+# 🗂️ BACKUP AUTOMÁTICO
+
+def carregar_config_backup():
+    config = carregar_config()
+    backup = {"pasta": "", "intervalo_horas": 0, "ao_fechar": False, "manter": 10}
+    backup.update(config.get("backup_automatico", {}))
+    return backup
+
+# ⏱️ INSTRUMENTAÇÃO
+
+def carregar_config_instrumentacao():
+    config = carregar_config()
+    instrumentacao = {
+        "ativo": False,
+        "arquivo": os.path.join(os.path.dirname(os.path.abspath(CONFIG_PATH)), "timesheet_perf.jsonl"),
+        "intervalo_s": 60,
+        "lento_ms": 200,
+        "tamanho_max_mb": 5,
+    }
+    instrumentacao.update(config.get("instrumentacao", {}))
+    return instrumentacao
+
+# 🧹 MANUTENÇÃO DO BANCO
+
+def carregar_config_manutencao():
+    config = carregar_config()
+    manutencao = {"intervalo_horas": 24, "ociosidade_min": 5, "ao_fechar": True, "ultima_execucao": ""}
+    manutencao.update(config.get("manutencao", {}))
+    return manutencao
+
+def salvar_ultima_manutencao(momento):
+    config = carregar_config()
+    config.setdefault("manutencao", {})["ultima_execucao"] = momento
+    salvar_config(config)
@@ -1,127 +1,1034 @@
+import os
+import re
 import sqlite3
+import threading
+from collections import namedtuple
 from datetime import datetime
 
-from utils.config import carregar_caminho_bd
+from utils.config import carregar_caminho_bd, carregar_config
+from utils.instrumentacao import configurar_conexao, instrumentar_funcoes_publicas, parametros_conexao
+from utils.tempo import horario_para_minutos
 
-# 🔹 Conectar ao banco de dados
-def conectar(caminho=None):
-    if not caminho:
-        caminho = carregar_caminho_bd()
-    if not caminho:
+# 🔹 Pragmas padrão da conexão (podem ser sobrescritos em config.json → "sqlite")
+# O banco costuma ficar numa pasta de rede: journal de rollback com sync completo
+# (synchronous NORMAL só é à prova de queda de energia com WAL) e sem mmap (um erro
+# de I/O na rede viraria SIGBUS). DELETE também desfaz o WAL gravado no arquivo por
+# versões anteriores.
+PRAGMAS_PADRAO = {
+    "journal_mode": "DELETE",
+    "synchronous": "FULL",
+    "cache_size": -16000,       # KiB quando negativo (~16 MB)
+    "mmap_size": 0,
+    "busy_timeout": 5000,       # ms
+}
+# Só com "journal_mode": "WAL" no config (banco em disco local): o WAL depende de
+# memória compartilhada, que não é segura em compartilhamentos SMB/NFS
+PRAGMAS_WAL = {
+    "synchronous": "NORMAL",
+    "mmap_size": 134217728,     # 128 MB
+}
+STATEMENTS_EM_CACHE = 64
+
+# Pool de conexões: uma conexão por (caminho, thread), reaproveitada entre chamadas
+_conexoes = {}
+_lock_conexoes = threading.Lock()
+_caminho_atual = None
+
+
+def _pragmas_configurados():
+    configurados = carregar_config().get("sqlite", {})
+    pragmas = dict(PRAGMAS_PADRAO)
+    if str(configurados.get("journal_mode", "")).upper() == "WAL":
+        pragmas.update(PRAGMAS_WAL)
+    pragmas.update(configurados)
+    return pragmas
+
+
+def _aplicar_pragmas(conn, pragmas):
+    for nome, valor in pragmas.items():
+        if nome == "cached_statements":
+            continue
+        conn.execute(f"PRAGMA {nome} = {valor}")
+
+
+def _resolver_caminho(caminho=None):
+    global _caminho_atual
+    if caminho:
+        return caminho
+    if not _caminho_atual:
+        _caminho_atual = carregar_caminho_bd()
+    if not _caminho_atual:
         raise ValueError("Caminho do banco de dados não definido.")
-    return sqlite3.connect(caminho, check_same_thread=False)
+    return _caminho_atual
+
+
+# 🔹 Conectar ao banco de dados (conexão nova e independente do pool)
+def conectar(caminho=None):
+    caminho = _resolver_caminho(caminho)
+    pragmas = _pragmas_configurados()
+    conn = sqlite3.connect(
+        caminho,
+        check_same_thread=False,
+        cached_statements=int(pragmas.get("cached_statements", STATEMENTS_EM_CACHE)),
+        **parametros_conexao(),
+    )
+    configurar_conexao(conn)
+    _aplicar_pragmas(conn, pragmas)
+    return conn
+
+
+def obter_conexao(caminho=None):
+    """Retorna a conexão persistente da thread atual para o banco (abre na primeira chamada)."""
+    caminho = _resolver_caminho(caminho)
+    chave = (caminho, threading.get_ident())
+    conn = _conexoes.get(chave)
+    if conn is None:
+        conn = conectar(caminho)
+        with _lock_conexoes:
+            _conexoes[chave] = conn
+    return conn
+
+
+def definir_banco(caminho):
+    """Troca o banco ativo, fechando as conexões abertas para o anterior."""
+    global _caminho_atual
+    if caminho != _caminho_atual:
+        fechar_conexoes()
+    _caminho_atual = caminho
+
+
+def fechar_conexao_da_thread():
+    """Fecha as conexões abertas pela thread atual (fim de uma thread de trabalho)."""
+    ident = threading.get_ident()
+    with _lock_conexoes:
+        chaves = [chave for chave in _conexoes if chave[1] == ident]
+        conexoes = [_conexoes.pop(chave) for chave in chaves]
+    for conn in conexoes:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def fechar_conexoes():
+    """Fecha todas as conexões do pool (chamado no encerramento do aplicativo)."""
+    with _lock_conexoes:
+        conexoes = list(_conexoes.values())
+        _conexoes.clear()
+    for conn in conexoes:
+        try:
+            conn.commit()
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+# 🔹 Datas: o app exibe dd/mm/yy, o banco ordena/filtra por dia_iso (yyyy-mm-dd)
+def dia_para_iso(dia):
+    """Converte 'dd/mm/yy' em 'yyyy-mm-dd'."""
+    d, m, a = dia.split("/")
+    return f"20{a[-2:]}-{m}-{d}"
+
+
+def _sql_dia_iso(coluna="dia"):
+    """Mesma conversão de dia_para_iso, como expressão SQL."""
+    return f"'20' || substr({coluna}, 7, 2) || '-' || substr({coluna}, 4, 2) || '-' || substr({coluna}, 1, 2)"
+
+# 🔹 Versionamento do schema (PRAGMA user_version)
+TAMANHO_LOTE_MIGRACAO = 5000
+
+
+def _colunas(conn, tabela):
+    return {linha[1] for linha in conn.execute(f"PRAGMA table_info({tabela})")}
+
+
+def _migrar_v1(conn):
+    """Tabela base + coluna dia_iso indexada, preenchida em lotes."""
+    with conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS registros (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                dia TEXT NOT NULL,
+                hora_inicio TEXT NOT NULL,
+                hora_fim TEXT NOT NULL,
+                atividade TEXT NOT NULL,
+                lancado INTEGER DEFAULT 0,
+                dia_iso TEXT
+            )
+        ''')
+        if "dia_iso" not in _colunas(conn, "registros"):
+            conn.execute("ALTER TABLE registros ADD COLUMN dia_iso TEXT")
+
+    # Lotes curtos, cada um na sua transação, para não travar outras instâncias
+    while True:
+        with conn:
+            alterados = conn.execute(f"""
+                UPDATE registros SET dia_iso = {_sql_dia_iso()}
+                WHERE id IN (SELECT id FROM registros WHERE dia_iso IS NULL LIMIT ?)
+            """, (TAMANHO_LOTE_MIGRACAO,)).rowcount
+        if alterados < TAMANHO_LOTE_MIGRACAO:
+            break
+
+    with conn:
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_registros_dia_iso ON registros (dia_iso, hora_inicio)")
+        # Mantém dia_iso preenchido mesmo para gravações de versões antigas do app
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registros_dia_iso
+            AFTER INSERT ON registros WHEN NEW.dia_iso IS NULL
+            BEGIN
+                UPDATE registros SET dia_iso = {_sql_dia_iso("NEW.dia")} WHERE id = NEW.id;
+            END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registros_dia_iso_update
+            AFTER UPDATE OF dia ON registros
+            BEGIN
+                UPDATE registros SET dia_iso = {_sql_dia_iso("NEW.dia")} WHERE id = NEW.id;
+            END
+        """)
+
+
+def _sql_minutos(coluna):
+    """Expressão SQL: 'H:MM'/'HH:MM' → minutos desde 00:00; NULL no resto (como horario_para_minutos)."""
+    dois_pontos = f"instr({coluna}, ':')"
+    texto_horas = f"substr({coluna}, 1, {dois_pontos} - 1)"
+    texto_minutos = f"substr({coluna}, {dois_pontos} + 1)"
+    horas, minutos = f"CAST({texto_horas} AS INTEGER)", f"CAST({texto_minutos} AS INTEGER)"
+    return (f"CASE WHEN {dois_pontos} BETWEEN 2 AND 3 AND length({texto_minutos}) BETWEEN 1 AND 2 "
+            f"AND {texto_horas} NOT GLOB '*[^0-9]*' AND {texto_minutos} NOT GLOB '*[^0-9]*' "
+            f"AND {horas} <= 23 AND {minutos} <= 59 "
+            f"THEN {horas} * 60 + {minutos} END")
+
+
+def _sql_duracao(prefixo=""):
+    """Duração em minutos de um registro (0 quando algum horário é inválido)."""
+    return f"COALESCE(({_sql_minutos(prefixo + 'hora_fim')}) - ({_sql_minutos(prefixo + 'hora_inicio')}), 0)"
+
+
+def _sql_duracao_minutos(prefixo=""):
+    """Duração pelas colunas inteiras inicio_min/fim_min (schema v3+)."""
+    return f"COALESCE({prefixo}fim_min - {prefixo}inicio_min, 0)"
+
+
+def _sql_somar_no_dia(registro, sinal, duracao):
+    """UPDATE que soma (sinal=+1) ou subtrai (sinal=-1) um registro (NEW/OLD) do seu dia."""
+    return f"""
+        UPDATE daily_totals SET
+            total_minutos = total_minutos + ({sinal}) * {duracao},
+            qtd_registros = qtd_registros + ({sinal}),
+            minutos_lancados = minutos_lancados + ({sinal}) * (CASE WHEN {registro}.lancado THEN {duracao} ELSE 0 END),
+            minutos_nao_lancados = minutos_nao_lancados + ({sinal}) * (CASE WHEN {registro}.lancado THEN 0 ELSE {duracao} END)
+        WHERE dia_iso = {registro}.dia_iso;
+    """
+
+
+def _criar_triggers_totais(conn, duracao_de, colunas_update):
+    """Triggers que mantêm daily_totals; duracao_de('NEW'/'OLD') devolve a expressão da duração."""
+    garantir_dia = "INSERT OR IGNORE INTO daily_totals (dia_iso) SELECT NEW.dia_iso WHERE NEW.dia_iso IS NOT NULL;"
+    limpar_dia = "DELETE FROM daily_totals WHERE dia_iso = OLD.dia_iso AND qtd_registros <= 0;"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_totais_insert AFTER INSERT ON registros
+        BEGIN
+            {garantir_dia}
+            {_sql_somar_no_dia("NEW", +1, duracao_de("NEW"))}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_totais_delete AFTER DELETE ON registros
+        BEGIN
+            {_sql_somar_no_dia("OLD", -1, duracao_de("OLD"))}
+            {limpar_dia}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_totais_update
+        AFTER UPDATE OF {colunas_update} ON registros
+        BEGIN
+            {_sql_somar_no_dia("OLD", -1, duracao_de("OLD"))}
+            {limpar_dia}
+            {garantir_dia}
+            {_sql_somar_no_dia("NEW", +1, duracao_de("NEW"))}
+        END
+    """)
+
+
+def _remover_triggers_totais(conn):
+    for trigger in ("trg_totais_insert", "trg_totais_delete", "trg_totais_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+
+
+def _migrar_v2(conn):
+    """Tabela daily_totals (totais por dia) mantida por triggers em registros."""
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_totals (
+                dia_iso TEXT PRIMARY KEY,
+                total_minutos INTEGER NOT NULL DEFAULT 0,
+                qtd_registros INTEGER NOT NULL DEFAULT 0,
+                minutos_lancados INTEGER NOT NULL DEFAULT 0,
+                minutos_nao_lancados INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        """)
+        _criar_triggers_totais(conn, lambda r: _sql_duracao(f"{r}."), "dia_iso, hora_inicio, hora_fim, lancado")
+    _reconstruir_totais(conn, _sql_duracao())
+
+
+def _migrar_v3(conn):
+    """Colunas inteiras inicio_min/fim_min, sincronizadas com hora_inicio/hora_fim."""
+    with conn:
+        colunas = _colunas(conn, "registros")
+        for coluna in ("inicio_min", "fim_min"):
+            if coluna not in colunas:
+                conn.execute(f"ALTER TABLE registros ADD COLUMN {coluna} INTEGER")
+        # Os totais passam a usar as colunas novas; recriados depois do preenchimento
+        _remover_triggers_totais(conn)
+
+    # Preenche em lotes por faixa de id (horários inválidos continuam NULL)
+    maior_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM registros").fetchone()[0]
+    for inicio in range(0, maior_id, TAMANHO_LOTE_MIGRACAO):
+        with conn:
+            conn.execute(f"""
+                UPDATE registros SET inicio_min = {_sql_minutos("hora_inicio")}, fim_min = {_sql_minutos("hora_fim")}
+                WHERE id > ? AND id <= ?
+            """, (inicio, inicio + TAMANHO_LOTE_MIGRACAO))
+
+    with conn:
+        _criar_triggers_minutos(conn)
+        _criar_triggers_totais(conn, _sql_duracao_minutos_de, "dia_iso, inicio_min, fim_min, lancado")
+    _reconstruir_totais(conn, _sql_duracao_minutos())
+
+
+def _sql_duracao_minutos_de(registro):
+    return _sql_duracao_minutos(f"{registro}.")
+
+
+def _criar_triggers_minutos(conn):
+    """Triggers que recalculam inicio_min/fim_min a partir de hora_inicio/hora_fim.
+
+    Só disparam quando quem gravou não preencheu os minutos (ex.: versões antigas do
+    app): o que o Python já gravou — inclusive NULL de um horário inválido — fica.
+    """
+    desatualizado = (f"(NEW.inicio_min IS NOT ({_sql_minutos('NEW.hora_inicio')}) "
+                     f"OR NEW.fim_min IS NOT ({_sql_minutos('NEW.hora_fim')}))")
+    sincronizar = (f"UPDATE registros SET inicio_min = {_sql_minutos('NEW.hora_inicio')}, "
+                   f"fim_min = {_sql_minutos('NEW.hora_fim')} WHERE id = NEW.id;")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_registros_minutos
+        AFTER INSERT ON registros
+        WHEN NEW.inicio_min IS NULL AND NEW.fim_min IS NULL AND {desatualizado}
+        BEGIN
+            {sincronizar}
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_registros_minutos_update
+        AFTER UPDATE OF hora_inicio, hora_fim ON registros
+        WHEN NEW.inicio_min IS OLD.inicio_min AND NEW.fim_min IS OLD.fim_min AND {desatualizado}
+        BEGIN
+            {sincronizar}
+        END
+    """)
+
+
+def _migrar_v4(conn):
+    """Índice FTS5 (conteúdo externo) sobre registros.atividade, mantido por triggers.
+
+    Se o SQLite não tiver FTS5, nada é criado e a busca cai para LIKE.
+    """
+    try:
+        with conn:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS registros_fts USING fts5(
+                    atividade, content='registros', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+            """)
+    except sqlite3.OperationalError:
+        return
+
+    inserir = "INSERT INTO registros_fts (rowid, atividade) VALUES (NEW.id, NEW.atividade);"
+    remover = "INSERT INTO registros_fts (registros_fts, rowid, atividade) VALUES ('delete', OLD.id, OLD.atividade);"
+    with conn:
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_registros_fts_insert AFTER INSERT ON registros BEGIN {inserir} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_registros_fts_delete AFTER DELETE ON registros BEGIN {remover} END")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registros_fts_update AFTER UPDATE OF atividade ON registros
+            BEGIN
+                {remover}
+                {inserir}
+            END
+        """)
+        conn.execute("INSERT INTO registros_fts (registros_fts) VALUES ('rebuild')")
+
+
+def _migrar_v5(conn):
+    """Horários inválidos ('25:99', '08:00:00', '8:00x'...) passam a ter inicio_min/fim_min NULL (duração 0).
+
+    Os triggers de minutos são refeitos com o mesmo critério de horario_para_minutos
+    e deixam de sobrescrever o que o app já gravou.
+    """
+    with conn:
+        conn.execute("DROP TRIGGER IF EXISTS trg_registros_minutos")
+        conn.execute("DROP TRIGGER IF EXISTS trg_registros_minutos_update")
+        _criar_triggers_minutos(conn)
+        # Os triggers de daily_totals descontam a duração antiga das linhas corrigidas
+        conn.execute(f"""
+            UPDATE registros SET inicio_min = {_sql_minutos("hora_inicio")}, fim_min = {_sql_minutos("hora_fim")}
+            WHERE inicio_min IS NOT ({_sql_minutos("hora_inicio")}) OR fim_min IS NOT ({_sql_minutos("hora_fim")})
+        """)
+
+
+# Cada posição da lista leva o schema da versão i para a i + 1
+_MIGRACOES = [_migrar_v1, _migrar_v2, _migrar_v3, _migrar_v4, _migrar_v5]
+SCHEMA_VERSAO = len(_MIGRACOES)
+
+
+def versao_schema(conn=None):
+    conn = conn or obter_conexao()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def versao_dados(conn=None):
+    """PRAGMA data_version: muda quando outra conexão (outro processo ou thread) grava no banco."""
+    conn = conn or obter_conexao()
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+# 🔹 Criar/atualizar o schema (no-op quando já está na versão atual)
+def _aplicar_migracoes(conn):
+    versao = versao_schema(conn)
+    for nova_versao in range(versao + 1, SCHEMA_VERSAO + 1):
+        _MIGRACOES[nova_versao - 1](conn)
+        with conn:
+            conn.execute(f"PRAGMA user_version = {nova_versao}")
 
 
-# 🔹 Criar a tabela corretamente com ID automático
 def criar_tabela(caminho=None):
-    conn = conectar(caminho)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS registros (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dia TEXT NOT NULL,
-            hora_inicio TEXT NOT NULL,
-            hora_fim TEXT NOT NULL,
-            atividade TEXT NOT NULL,
-            lancado INTEGER DEFAULT 0
-        )
-    ''')
-    conn.commit()
-    conn.close()
-
-
-# 🔹 Criar um novo registro (ID gerado automaticamente)
+    if caminho:
+        definir_banco(caminho)
+    _aplicar_migracoes(obter_conexao())
+
+
+# 🗄️ Arquivos anuais: anos fechados saem do banco principal para <banco>.arquivo-AAAA.db
+# As leituras por período anexam (ATTACH) só os arquivos dos anos pedidos. Os ids são
+# únicos entre todos os arquivos (AUTOINCREMENT no principal), então edições e
+# exclusões por id encontram o registro onde ele estiver; inserções vão sempre
+# para o principal.
+MAX_ARQUIVOS_ANEXADOS = 8  # o SQLite aceita 10 bancos anexados por conexão (padrão)
+_COLUNAS_ARQUIVADAS = {
+    "registros": "id, dia, dia_iso, hora_inicio, hora_fim, inicio_min, fim_min, atividade, lancado",
+    "daily_totals": "dia_iso, total_minutos, qtd_registros, minutos_lancados, minutos_nao_lancados",
+}
+_cache_arquivos = {}  # caminho do banco → (mtime da pasta, {ano: caminho do arquivo})
+
+
+def caminho_arquivo_anual(ano, caminho=None):
+    raiz, _ = os.path.splitext(_resolver_caminho(caminho))
+    return f"{raiz}.arquivo-{ano}.db"
+
+
+def listar_arquivos_anuais(caminho=None):
+    """{ano: caminho} dos arquivos anuais do banco (a pasta só é relida quando muda)."""
+    caminho = _resolver_caminho(caminho)
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    try:
+        mtime = os.stat(pasta).st_mtime_ns
+    except OSError:
+        return {}
+    cache = _cache_arquivos.get(caminho)
+    if cache and cache[0] == mtime:
+        return cache[1]
+
+    padrao = re.compile(re.escape(os.path.basename(os.path.splitext(caminho)[0])) + r"\.arquivo-(\d{4})\.db")
+    arquivos = {}
+    for nome in os.listdir(pasta):
+        encontrado = padrao.fullmatch(nome)
+        if encontrado:
+            arquivos[int(encontrado.group(1))] = os.path.join(pasta, nome)
+    _cache_arquivos[caminho] = (mtime, arquivos)
+    return arquivos
+
+
+def _anexar_arquivo(conn, ano, caminho_arquivo, manter=()):
+    """Anexa o arquivo do ano à conexão (se ainda não estiver) e devolve o nome do esquema.
+
+    No limite de anexados, desanexa os outros arquivos — menos os de `manter`, que
+    quem chama ainda vai usar.
+    """
+    esquema = f"arquivo_{ano}"
+    anexados = [linha[1] for linha in conn.execute("PRAGMA database_list")]
+    if esquema not in anexados:
+        arquivos = [nome for nome in anexados if nome.startswith("arquivo_")]
+        if len(arquivos) >= MAX_ARQUIVOS_ANEXADOS:
+            for nome in arquivos:
+                if nome not in manter:
+                    conn.execute(f"DETACH DATABASE {nome}")
+        conn.execute(f"ATTACH DATABASE ? AS {esquema}", (caminho_arquivo,))
+    return esquema
+
+
+def _segmentos(conn, de_iso, ate_iso):
+    """Divide [de_iso, ate_iso] em trechos (de, ate, esquemas), em ordem de data.
+
+    Anos sem arquivo ficam num trecho só do principal; um ano arquivado lê o arquivo
+    e, se o principal recebeu lançamentos daquele ano depois, os dois. Gerador: cada
+    arquivo só é anexado quando o trecho dele é pedido.
+    """
+    arquivos = listar_arquivos_anuais()
+    inicio = de_iso
+    for ano in sorted(a for a in arquivos if int(de_iso[:4]) <= a <= int(ate_iso[:4])):
+        if inicio < f"{ano}-01-01":
+            yield inicio, f"{ano - 1}-12-31", ("main",)
+        de, ate = max(inicio, f"{ano}-01-01"), min(ate_iso, f"{ano}-12-31")
+        esquemas = (_anexar_arquivo(conn, ano, arquivos[ano]),)
+        if conn.execute("SELECT 1 FROM main.registros WHERE dia_iso BETWEEN ? AND ? LIMIT 1", (de, ate)).fetchone():
+            esquemas += ("main",)
+        yield de, ate, esquemas
+        inicio = f"{ano + 1}-01-01"
+    if inicio <= ate_iso:
+        yield inicio, ate_iso, ("main",)
+
+
+def _fonte(esquemas, tabela="registros"):
+    """Tabela de um esquema, ou a união (UNION ALL) da mesma tabela em vários, para o FROM."""
+    if len(esquemas) == 1:
+        return f"{esquemas[0]}.{tabela}"
+    colunas = _COLUNAS_ARQUIVADAS[tabela]
+    return "(" + " UNION ALL ".join(f"SELECT {colunas} FROM {esquema}.{tabela}" for esquema in esquemas) + ")"
+
+
+def _esquemas_todos(conn):
+    """main e cada arquivo anual, do mais novo para o mais antigo (anexado quando chega a vez dele)."""
+    yield "main"
+    for ano, caminho_arquivo in sorted(listar_arquivos_anuais().items(), reverse=True):
+        yield _anexar_arquivo(conn, ano, caminho_arquivo)
+
+
+def _esquema_do_registro(conn, id_registro):
+    """Esquema (main ou arquivo_AAAA) que guarda o registro; main se não estiver em nenhum."""
+    if conn.execute("SELECT 1 FROM main.registros WHERE id = ?", (id_registro,)).fetchone():
+        return "main"
+    for ano, caminho_arquivo in sorted(listar_arquivos_anuais().items(), reverse=True):
+        esquema = _anexar_arquivo(conn, ano, caminho_arquivo)
+        if conn.execute(f"SELECT 1 FROM {esquema}.registros WHERE id = ?", (id_registro,)).fetchone():
+            return esquema
+    return "main"
+
+
+def arquivar_ano(ano):
+    """Move os registros de um ano já encerrado para o arquivo anual (criado se preciso).
+
+    Cópia e exclusão são transações separadas: se algo falhar no meio, rodar de novo
+    completa o serviço (a cópia ignora ids já arquivados). Retorna quantos registros
+    saíram do banco principal.
+    """
+    if ano >= datetime.now().year:
+        raise ValueError(f"Só anos encerrados podem ser arquivados ({ano} ainda está em curso).")
+    caminho_arquivo = caminho_arquivo_anual(ano)
+    novo = conectar(caminho_arquivo)
+    try:
+        _aplicar_migracoes(novo)
+    finally:
+        novo.close()
+    _cache_arquivos.pop(_resolver_caminho(), None)
+
+    conn = obter_conexao()
+    esquema = _anexar_arquivo(conn, ano, caminho_arquivo)
+    colunas = _COLUNAS_ARQUIVADAS["registros"]
+    periodo = (f"{ano}-01-01", f"{ano}-12-31")
+    with conn:
+        conn.execute(f"""
+            INSERT OR IGNORE INTO {esquema}.registros ({colunas})
+            SELECT {colunas} FROM main.registros WHERE dia_iso BETWEEN ? AND ?
+        """, periodo)
+    with conn:
+        return conn.execute(f"""
+            DELETE FROM main.registros
+            WHERE dia_iso BETWEEN ? AND ?
+              AND id IN (SELECT id FROM {esquema}.registros WHERE dia_iso BETWEEN ? AND ?)
+        """, periodo + periodo).rowcount
+
+
+# 🔹 Notificações de mudança: as funções de gravação publicam, quem exibe dados assina
+MudancaRegistro = namedtuple("MudancaRegistro", ["tipo", "id", "registro", "campos"])
+INSERIDO, ATUALIZADO, EXCLUIDO, LOTE = "inserido", "atualizado", "excluido", "lote"
+
+_ouvintes = []
+
+
+def assinar_mudancas(ouvinte):
+    """ouvinte(lista de MudancaRegistro) é chamado após cada transação confirmada, na thread que gravou.
+
+    registro é a linha (id, dia, hora_inicio, hora_fim, atividade, lancado) depois da
+    mudança (antes, para exclusões); campos traz o que mudou (e, quando a atividade muda,
+    o texto antigo em "atividade_anterior"). Gravações em lote publicam
+    uma única MudancaRegistro(LOTE, None, None, {"dias": [...]}).
+    """
+    _ouvintes.append(ouvinte)
+
+
+def cancelar_assinatura(ouvinte):
+    if ouvinte in _ouvintes:
+        _ouvintes.remove(ouvinte)
+
+
+def _publicar(mudancas):
+    if mudancas:
+        for ouvinte in list(_ouvintes):
+            ouvinte(mudancas)
+
+
+_SELECT_REGISTRO = "SELECT id, dia, hora_inicio, hora_fim, atividade, lancado FROM {}.registros WHERE id = ?"
+
+
+# 🔹 Criar um novo registro (ID gerado automaticamente); retorna a linha gravada
 def inserir_registro(hora_inicio, hora_fim, atividade, dia=None):
     if not dia:
         dia = datetime.now().strftime("%d/%m/%y")
-    conn = conectar()
-    cursor = conn.cursor()
-    cursor.execute('''
-        INSERT INTO registros (dia, hora_inicio, hora_fim, atividade)
-        VALUES (?, ?, ?, ?)
-    ''', (dia, hora_inicio, hora_fim, atividade))
-    conn.commit()
-    conn.close()
+    conn = obter_conexao()
+    with conn:
+        id_registro = conn.execute('''
+            INSERT INTO registros (dia, dia_iso, hora_inicio, hora_fim, inicio_min, fim_min, atividade)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (dia, dia_para_iso(dia), hora_inicio, hora_fim,
+              horario_para_minutos(hora_inicio), horario_para_minutos(hora_fim), atividade)).lastrowid
+        registro = conn.execute(_SELECT_REGISTRO.format("main"), (id_registro,)).fetchone()
+    _publicar([MudancaRegistro(INSERIDO, id_registro, registro,
+                               {"dia": dia, "hora_inicio": hora_inicio, "hora_fim": hora_fim, "atividade": atividade})])
+    return registro
 
 def listar_registros(dia=None):
-    conn = conectar()
-    cursor = conn.cursor()
-    if dia:
-        cursor.execute("""
-            SELECT id, dia, hora_inicio, hora_fim, atividade, lancado
-            FROM registros
-            WHERE dia = ?
-            ORDER BY hora_inicio
-        """, (dia,))
-    else:
-        cursor.execute("""
+    if not dia:
+        return listar_registros_intervalo(None, None)
+    conn = obter_conexao()
+    dia_iso = dia_para_iso(dia)
+    registros = []
+    for _, _, esquemas in _segmentos(conn, dia_iso, dia_iso):
+        registros += conn.execute(f"""
             SELECT id, dia, hora_inicio, hora_fim, atividade, lancado
-            FROM registros
+            FROM {_fonte(esquemas)}
+            WHERE dia_iso = ?
             ORDER BY hora_inicio
-        """)
-    
-    registros = cursor.fetchall()
-    conn.close()
+        """, (dia_iso,)).fetchall()
     return registros
 
-# 🔹 Atualizar um registro existente
+# 🔹 Atualizar um registro existente; retorna a linha gravada
 def atualizar_registro(id_registro, hora_inicio, hora_fim, atividade):
-    conn = conectar()
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE registros
-        SET hora_inicio = ?, hora_fim = ?, atividade = ?
-        WHERE id = ?
-    ''', (hora_inicio, hora_fim, atividade, id_registro))
-    conn.commit()
-    conn.close()
-
-# 🔹 Excluir um registro pelo ID
+    conn = obter_conexao()
+    esquema = _esquema_do_registro(conn, id_registro)
+    with conn:
+        anterior = conn.execute(f"SELECT atividade FROM {esquema}.registros WHERE id = ?", (id_registro,)).fetchone()
+        conn.execute(f'''
+            UPDATE {esquema}.registros
+            SET hora_inicio = ?, hora_fim = ?, inicio_min = ?, fim_min = ?, atividade = ?
+            WHERE id = ?
+        ''', (hora_inicio, hora_fim, horario_para_minutos(hora_inicio), horario_para_minutos(hora_fim),
+              atividade, id_registro))
+        registro = conn.execute(_SELECT_REGISTRO.format(esquema), (id_registro,)).fetchone()
+    if registro:
+        _publicar([MudancaRegistro(ATUALIZADO, id_registro, registro,
+                                   {"hora_inicio": hora_inicio, "hora_fim": hora_fim, "atividade": atividade,
+                                    "atividade_anterior": anterior[0]})])
+    return registro
+
+# 🔹 Excluir um registro pelo ID; retorna a linha excluída (None se não existia)
 def excluir_registro(id_registro):
-    conn = conectar()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM registros WHERE id = ?", (id_registro,))
-    conn.commit()
-    conn.close()
-    
-   
-def atualizar_registro_no_bd(id_registro, campo, novo_valor):
-    """Atualiza um campo específico de um registro no banco de dados."""
-    conexao = conectar()
-    cursor = conexao.cursor()
-
-    query = f"UPDATE registros SET {campo} = ? WHERE id = ?"
-    cursor.execute(query, (novo_valor, id_registro))
-
-    conexao.commit()
-    conexao.close()
-    
-def listar_registros_intervalo(data_de, data_ate):
-    # Converter dd/MM/yy → yy-MM-dd para comparação correta
-    def converter(data_str):
-        dia, mes, ano = data_str.split("/")
-        return f"{ano}-{mes}-{dia}"
+    conn = obter_conexao()
+    esquema = _esquema_do_registro(conn, id_registro)
+    with conn:
+        registro = conn.execute(_SELECT_REGISTRO.format(esquema), (id_registro,)).fetchone()
+        conn.execute(f"DELETE FROM {esquema}.registros WHERE id = ?", (id_registro,))
+    if registro:
+        _publicar([MudancaRegistro(EXCLUIDO, id_registro, registro, {})])
+    return registro
+
+
+# Campos editáveis individualmente (evita interpolar nomes arbitrários na query)
+CAMPOS_EDITAVEIS = ("hora_inicio", "hora_fim", "atividade", "lancado")
+# Coluna inteira mantida junto com cada horário em texto
+COLUNA_MINUTOS = {"hora_inicio": "inicio_min", "hora_fim": "fim_min"}
 
-    data_de_sql = converter(data_de)
-    data_ate_sql = converter(data_ate)
 
-    conn = conectar()
-    cursor = conn.cursor()
+def _com_minutos(campos):
+    """Acrescenta inicio_min/fim_min às alterações que mexem nos horários."""
+    campos = dict(campos)
+    for campo, coluna in COLUNA_MINUTOS.items():
+        if campo in campos:
+            campos[coluna] = horario_para_minutos(campos[campo])
+    return campos
 
-    query = """
-    SELECT id, dia, hora_inicio, hora_fim, atividade, lancado
-    FROM registros 
-    WHERE substr(dia, 7, 2) || '-' || substr(dia, 4, 2) || '-' || substr(dia, 1, 2)
-          BETWEEN ? AND ?
-    ORDER BY substr(dia, 7, 2) || '-' || substr(dia, 4, 2) || '-' || substr(dia, 1, 2),
-             hora_inicio
+
+def atualizar_campos_registros(alteracoes):
+    """Aplica {id: {campo: valor}} numa única transação — um UPDATE por registro.
+
+    Retorna as linhas gravadas.
     """
+    conn = obter_conexao()
+    # ATTACH não pode acontecer dentro da transação: localiza os registros antes
+    esquemas = {id_registro: _esquema_do_registro(conn, id_registro) for id_registro in alteracoes}
+    mudancas = []
+    with conn:
+        for id_registro, campos in alteracoes.items():
+            invalidos = set(campos) - set(CAMPOS_EDITAVEIS)
+            if invalidos:
+                raise ValueError(f"Campo inválido: {', '.join(sorted(invalidos))}")
+            campos_bd = _com_minutos(campos)
+            atribuicoes = ", ".join(f"{campo} = ?" for campo in campos_bd)
+            esquema = esquemas[id_registro]
+            campos_evento = dict(campos)
+            if "atividade" in campos:
+                anterior = conn.execute(f"SELECT atividade FROM {esquema}.registros WHERE id = ?",
+                                        (id_registro,)).fetchone()
+                campos_evento["atividade_anterior"] = anterior[0] if anterior else None
+            conn.execute(f"UPDATE {esquema}.registros SET {atribuicoes} WHERE id = ?",
+                         (*campos_bd.values(), id_registro))
+            registro = conn.execute(_SELECT_REGISTRO.format(esquema), (id_registro,)).fetchone()
+            if registro:
+                mudancas.append(MudancaRegistro(ATUALIZADO, id_registro, registro, campos_evento))
+    _publicar(mudancas)
+    return [m.registro for m in mudancas]
+
+def _periodo_iso(data_de, data_ate):
+    """(de, ate) em yyyy-mm-dd; None deixa o período aberto daquele lado."""
+    return (dia_para_iso(data_de) if data_de else "0000-01-01",
+            dia_para_iso(data_ate) if data_ate else "9999-12-31")
 
-    cursor.execute(query, (data_de_sql, data_ate_sql))
-    registros = cursor.fetchall()
 
-    conn.close()
+def listar_registros_intervalo(data_de, data_ate):
+    """Registros entre duas datas dd/mm/yy (inclusive), usando o índice (dia_iso, hora_inicio).
+
+    Anos arquivados são lidos dos arquivos anuais, na mesma ordem.
+    """
+    conn = obter_conexao()
+    registros = []
+    for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)):
+        registros += conn.execute(f"""
+            SELECT id, dia, hora_inicio, hora_fim, atividade, lancado
+            FROM {_fonte(esquemas)}
+            WHERE dia_iso BETWEEN ? AND ?
+            ORDER BY dia_iso, hora_inicio
+        """, (de, ate)).fetchall()
     return registros
 
 
+def iterar_registros_intervalo(data_de, data_ate, tamanho_lote=1000):
+    """Como listar_registros_intervalo, mas lendo do cursor em lotes (memória constante)."""
+    conn = obter_conexao()
+    for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)):
+        cursor = conn.execute(f"""
+            SELECT id, dia, hora_inicio, hora_fim, atividade, lancado
+            FROM {_fonte(esquemas)}
+            WHERE dia_iso BETWEEN ? AND ?
+            ORDER BY dia_iso, hora_inicio
+        """, (de, ate))
+        try:
+            while True:
+                lote = cursor.fetchmany(tamanho_lote)
+                if not lote:
+                    break
+                yield from lote
+        finally:
+            cursor.close()
+
+
+def listar_pagina_intervalo(data_ate, apos, limite=200):
+    """Próximos `limite` registros depois da chave apos=(dia_iso, hora_inicio, id), até data_ate.
+
+    Paginação por chave sobre o índice (dia_iso, hora_inicio): o custo não depende de
+    quantas páginas já foram lidas. Para começar num dia, use apos=(dia_iso, "", 0).
+    Devolve (id, dia, hora_inicio, hora_fim, atividade, lancado, dia_iso).
+    """
+    conn = obter_conexao()
+    linhas = []
+    # Cada trecho fica nos seus limites: o principal pode ter linhas de um ano arquivado
+    for de, ate, esquemas in _segmentos(conn, max(apos[0], "0000-01-01"), dia_para_iso(data_ate)):
+        linhas += conn.execute(f"""
+            SELECT id, dia, hora_inicio, hora_fim, atividade, lancado, dia_iso
+            FROM {_fonte(esquemas)}
+            WHERE (dia_iso, hora_inicio, id) > (?, ?, ?) AND dia_iso BETWEEN ? AND ?
+            ORDER BY dia_iso, hora_inicio, id
+            LIMIT ?
+        """, (*apos, max(de, apos[0]), ate, limite - len(linhas))).fetchall()
+        if len(linhas) >= limite:
+            break
+    return linhas
+
+
+def contar_registros_intervalo(data_de, data_ate):
+    conn = obter_conexao()
+    return sum(conn.execute(f"SELECT COUNT(*) FROM {_fonte(esquemas)} WHERE dia_iso BETWEEN ? AND ?",
+                            (de, ate)).fetchone()[0]
+               for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)))
+
+
+# 🔹 Totais por dia (tabela daily_totals, mantida por triggers)
+def _reconstruir_totais(conn, duracao):
+    with conn:
+        conn.execute("DELETE FROM daily_totals")
+        conn.execute(f"""
+            INSERT INTO daily_totals (dia_iso, total_minutos, qtd_registros, minutos_lancados, minutos_nao_lancados)
+            SELECT dia_iso,
+                   SUM({duracao}),
+                   COUNT(*),
+                   SUM(CASE WHEN lancado THEN {duracao} ELSE 0 END),
+                   SUM(CASE WHEN lancado THEN 0 ELSE {duracao} END)
+            FROM registros
+            WHERE dia_iso IS NOT NULL
+            GROUP BY dia_iso
+        """)
+
+
+def reconstruir_totais_diarios(conn=None):
+    """Recalcula daily_totals a partir de registros (bancos antigos ou após reparos)."""
+    _reconstruir_totais(conn or obter_conexao(), _sql_duracao_minutos())
+
+
+def listar_totais_intervalo(data_de, data_ate):
+    """(dia_iso, total_minutos, qtd_registros, minutos_lancados, minutos_nao_lancados) por dia."""
+    conn = obter_conexao()
+    totais = []
+    # GROUP BY soma o mesmo dia vindo do arquivo anual e do principal
+    for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)):
+        totais += conn.execute(f"""
+            SELECT dia_iso, SUM(total_minutos), SUM(qtd_registros), SUM(minutos_lancados), SUM(minutos_nao_lancados)
+            FROM {_fonte(esquemas, "daily_totals")}
+            WHERE dia_iso BETWEEN ? AND ?
+            GROUP BY dia_iso
+            ORDER BY dia_iso
+        """, (de, ate)).fetchall()
+    return totais
+
+
+# Chave de agrupamento de resumo_totais (sobre dia_iso 'yyyy-mm-dd')
+_AGRUPAMENTOS = {
+    "dia": "dia_iso",
+    "semana": "strftime('%Y-W%W', dia_iso)",
+    "mes": "substr(dia_iso, 1, 7)",
+    "ano": "substr(dia_iso, 1, 4)",
+}
+
+def resumo_totais(data_de, data_ate, agrupamento="dia"):
+    """Totais do período agrupados por dia, semana, mês ou ano, sem ler a tabela registros."""
+    if agrupamento not in _AGRUPAMENTOS:
+        raise ValueError(f"Agrupamento inválido: {agrupamento}")
+    chave = _AGRUPAMENTOS[agrupamento]
+    conn = obter_conexao()
+    resumo = []
+    for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)):
+        for linha in conn.execute(f"""
+            SELECT {chave} AS periodo, SUM(total_minutos), SUM(qtd_registros),
+                   SUM(minutos_lancados), SUM(minutos_nao_lancados)
+            FROM {_fonte(esquemas, "daily_totals")}
+            WHERE dia_iso BETWEEN ? AND ?
+            GROUP BY periodo
+            ORDER BY periodo
+        """, (de, ate)):
+            # Semana que cruza a virada do ano aparece nos dois trechos vizinhos: soma
+            if resumo and resumo[-1][0] == linha[0]:
+                resumo[-1] = (linha[0], *(a + b for a, b in zip(resumo[-1][1:], linha[1:])))
+            else:
+                resumo.append(linha)
+    return resumo
+
+
+def listar_intervalos_minutos(data_de, data_ate):
+    """(id, dia, inicio_min, fim_min) do período, para cálculos sem reler os horários em texto."""
+    conn = obter_conexao()
+    intervalos = []
+    for de, ate, esquemas in _segmentos(conn, *_periodo_iso(data_de, data_ate)):
+        intervalos += conn.execute(f"""
+            SELECT id, dia, inicio_min, fim_min
+            FROM {_fonte(esquemas)}
+            WHERE dia_iso BETWEEN ? AND ?
+            ORDER BY dia_iso, inicio_min
+        """, (de, ate)).fetchall()
+    return intervalos
+
+
+# 🔹 Importação em lote
+def _sql_inserir_sem_duplicar(esquemas):
+    """INSERT de uma linha, a menos que uma idêntica já exista em algum dos esquemas."""
+    ausente = " AND ".join(f"""NOT EXISTS (
+            SELECT 1 FROM {esquema}.registros
+            WHERE dia_iso = ?2 AND hora_inicio = ?3 AND hora_fim = ?4 AND atividade = ?7
+        )""" for esquema in esquemas)
+    return f"""
+        INSERT INTO main.registros (dia, dia_iso, hora_inicio, hora_fim, inicio_min, fim_min, atividade, lancado)
+        SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8
+        WHERE {ausente}
+    """
+
+
+def inserir_registros_em_lote(registros, tamanho_lote=1000, ao_gravar_lote=None):
+    """Insere (dia, hora_inicio, hora_fim, atividade, lancado) numa única transação.
+
+    Registros idênticos (mesmo dia, horários e atividade) a um já existente — no banco,
+    no arquivo anual do ano ou mais acima no próprio lote — são ignorados; a busca usa
+    o índice (dia_iso, hora_inicio). ao_gravar_lote(inseridos) é chamado após cada
+    executemany e pode levantar uma exceção para desfazer tudo (cancelamento).
+    Retorna (maior id antes da importação, quantidade inserida).
+    """
+    conn = obter_conexao()
+    maior_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM main.registros").fetchone()[0]
+
+    # ATTACH não roda dentro de transação: os arquivos anuais são anexados antes
+    arquivos = listar_arquivos_anuais()
+    anexaveis = sorted(arquivos, reverse=True)[:MAX_ARQUIVOS_ANEXADOS]
+    esquemas_por_ano = {}
+    for ano in anexaveis:
+        em_uso = {esquemas[1] for esquemas in esquemas_por_ano.values()}
+        esquemas_por_ano[str(ano)] = ("main", _anexar_arquivo(conn, ano, arquivos[ano], manter=em_uso))
+
+    inseridos = 0
+    lotes = {}  # esquemas conferidos → linhas pendentes
+
+    def gravar(esquemas):
+        nonlocal inseridos
+        inseridos += conn.executemany(_sql_inserir_sem_duplicar(esquemas), lotes.pop(esquemas)).rowcount
+        if ao_gravar_lote:
+            ao_gravar_lote(inseridos)
+
+    with conn:
+        for dia, hora_inicio, hora_fim, atividade, lancado in registros:
+            dia_iso = dia_para_iso(dia)
+            ano = dia_iso[:4]
+            if int(ano) in arquivos and ano not in esquemas_por_ano:
+                raise ValueError(f"{dia}: o arquivo de {ano} não pôde ser anexado "
+                                 f"(limite de {MAX_ARQUIVOS_ANEXADOS} arquivos por importação).")
+            esquemas = esquemas_por_ano.get(ano, ("main",))
+            lote = lotes.setdefault(esquemas, [])
+            lote.append((dia, dia_iso, hora_inicio, hora_fim, horario_para_minutos(hora_inicio),
+                         horario_para_minutos(hora_fim), atividade, lancado))
+            if len(lote) >= tamanho_lote:
+                gravar(esquemas)
+        for esquemas in list(lotes):
+            gravar(esquemas)
+    if inseridos:
+        dias = [linha[0] for linha in conn.execute(
+            "SELECT DISTINCT dia FROM main.registros WHERE id > ?", (maior_id,))]
+        _publicar([MudancaRegistro(LOTE, None, None, {"dias": dias})])
+    return maior_id, inseridos
+
+
+def listar_intervalos_dias_com_novos(id_minimo):
+    """(id, dia, inicio_min, fim_min) de todos os dias que receberam registros com id > id_minimo.
+
+    Dias de anos arquivados trazem também as linhas do arquivo anual.
+    """
+    conn = obter_conexao()
+    de_iso, ate_iso = conn.execute(
+        "SELECT MIN(dia_iso), MAX(dia_iso) FROM main.registros WHERE id > ?", (id_minimo,)).fetchone()
+    if de_iso is None:
+        return []
+    intervalos = []
+    for de, ate, esquemas in _segmentos(conn, de_iso, ate_iso):
+        intervalos += conn.execute(f"""
+            SELECT id, dia, inicio_min, fim_min
+            FROM {_fonte(esquemas)}
+            WHERE dia_iso BETWEEN ? AND ?
+              AND dia_iso IN (SELECT DISTINCT dia_iso FROM main.registros WHERE id > ?)
+            ORDER BY dia_iso, inicio_min
+        """, (de, ate, id_minimo)).fetchall()
+    return intervalos
+
+
+
+# 🔹 Busca por texto na atividade (FTS5, com LIKE como alternativa)
+def _tem_fts(conn, esquema="main"):
+    return conn.execute(f"SELECT 1 FROM {esquema}.sqlite_master WHERE name = 'registros_fts'").fetchone() is not None
+
+
+def _consulta_fts(texto):
+    """Cada palavra digitada vira um prefixo entre aspas ('reun plan' → "reun"* "plan"*)."""
+    palavras = re.findall(r"\w+", texto)
+    return " ".join('"' + palavra.replace('"', '""') + '"*' for palavra in palavras)
+
+
+# A busca fixa o conjunto de resultados na primeira consulta (ids em ordem de relevância)
+# e as páginas seguintes leem fatias dele: o rank do bm25 é recalculado a cada consulta
+# e muda com as gravações, então paginar pelo valor do rank pularia ou repetiria linhas.
+# Registros gravados depois da busca só aparecem numa busca nova.
+LIMITE_RESULTADOS_BUSCA = 5000
+TAMANHO_LOTE_IDS = 500  # ids por IN (...), abaixo do limite de parâmetros do SQLite
+
+
+def buscar_ids(texto, limite=LIMITE_RESULTADOS_BUSCA):
+    """Ids dos registros cuja atividade casa com `texto`, dos mais relevantes para os menos.
+
+    Busca no principal e em cada arquivo anual (o bm25 é calculado dentro de cada um).
+    """
+    conn = obter_conexao()
+    consulta, texto = _consulta_fts(texto), texto.strip()
+    padrao = "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    candidatos = []  # (relevância, id)
+    for esquema in _esquemas_todos(conn):
+        if _tem_fts(conn, esquema):
+            if consulta:
+                # bm25: menor é mais relevante
+                candidatos += conn.execute(f"""
+                    SELECT rank, rowid FROM {esquema}.registros_fts
+                    WHERE registros_fts MATCH ?
+                    ORDER BY rank, rowid DESC
+                    LIMIT ?
+                """, (consulta, limite)).fetchall()
+        elif texto:
+            # Sem FTS5: todos com a mesma relevância
+            candidatos += conn.execute(f"""
+                SELECT 0, id FROM {esquema}.registros
+                WHERE atividade LIKE ? ESCAPE '\\'
+                ORDER BY id DESC
+                LIMIT ?
+            """, (padrao, limite)).fetchall()
+    # Empate → registros mais novos primeiro
+    candidatos.sort(key=lambda c: (c[0], -c[1]))
+    return [id_registro for _, id_registro in candidatos[:limite]]
+
+
+def listar_registros_por_ids(ids):
+    """Linhas (id, dia, hora_inicio, hora_fim, atividade, lancado) na ordem de `ids`; excluídos somem.
+
+    Ids que não estão no principal são procurados nos arquivos anuais.
+    """
+    conn = obter_conexao()
+    encontrados = {}
+    for esquema in _esquemas_todos(conn):
+        faltando = [id_registro for id_registro in ids if id_registro not in encontrados]
+        if not faltando:
+            break
+        for inicio in range(0, len(faltando), TAMANHO_LOTE_IDS):
+            lote = faltando[inicio:inicio + TAMANHO_LOTE_IDS]
+            for registro in conn.execute(f"""
+                SELECT id, dia, hora_inicio, hora_fim, atividade, lancado FROM {esquema}.registros
+                WHERE id IN ({", ".join("?" * len(lote))})
+            """, lote):
+                encontrados[registro[0]] = registro
+    return [encontrados[id_registro] for id_registro in ids if id_registro in encontrados]
+
+
+def buscar_registros(texto, limite=50):
+    """Os `limite` registros mais relevantes para `texto` (uma página só; a interface pagina por buscar_ids)."""
+    return listar_registros_por_ids(buscar_ids(texto, limite))
+
+
+# 🔹 Atividades distintas (índice do autocompletar)
+def listar_estatisticas_atividades():
+    """(atividade, quantidade de lançamentos, último dia ISO) de cada atividade distinta, com os arquivos anuais."""
+    conn = obter_conexao()
+    estatisticas = {}
+    for esquema in _esquemas_todos(conn):
+        for atividade, quantidade, ultimo_iso in conn.execute(f"""
+            SELECT atividade, COUNT(*), MAX(dia_iso)
+            FROM {esquema}.registros
+            WHERE TRIM(COALESCE(atividade, '')) <> ''
+            GROUP BY atividade
+        """):
+            anterior = estatisticas.get(atividade)
+            if anterior:
+                quantidade += anterior[0]
+                ultimo_iso = max(filter(None, (ultimo_iso, anterior[1])), default=None)
+            estatisticas[atividade] = (quantidade, ultimo_iso)
+    return [(atividade, quantidade, ultimo_iso) for atividade, (quantidade, ultimo_iso) in estatisticas.items()]
+
 
+# ⏱️ Com a instrumentação ligada, toda função pública acima passa a ser medida
+instrumentar_funcoes_publicas(globals())
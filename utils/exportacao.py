@@ -0,0 +1,322 @@
+"""Geração dos relatórios exportados (sem dependência de Qt — roda em thread de trabalho).
+
+reportlab e openpyxl são importados só na primeira exportação (ou por
+pre_carregar_dependencias, em segundo plano), para não pesar na abertura do app.
+pyarrow (Parquet/Arrow) é opcional e também só é importado quando usado.
+"""
+import csv
+import importlib
+import os
+import threading
+from itertools import groupby
+
+from utils.db import contar_registros_intervalo, dia_para_iso, iterar_registros_intervalo, listar_totais_intervalo
+from utils.instrumentacao import medido
+from utils.tempo import calcular_duracao, formatar_minutos, horario_para_minutos
+
+
+class ExportacaoCancelada(Exception):
+    pass
+
+
+def _verificar_cancelamento(cancelado):
+    if cancelado and cancelado():
+        raise ExportacaoCancelada()
+
+
+def pre_carregar_dependencias():
+    """Importa reportlab/openpyxl numa thread daemon, depois que a janela já apareceu."""
+    def importar():
+        for modulo in ("reportlab.platypus", "reportlab.lib.styles", "openpyxl"):
+            try:
+                importlib.import_module(modulo)
+            except ImportError:
+                pass
+    threading.Thread(target=importar, name="pre-carga-exportacao", daemon=True).start()
+
+
+# 📄 PDF
+
+def _estilo_tabela_pdf():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f2f2f2")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),                # Fonte padrão
+        ("FONTSIZE", (3, 1), (3, -1), 7),                 # Fonte menor para a coluna Atividade
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+        ("TOPPADDING", (0, 1), (-1, -1), 4),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f9f9f9")]),
+        ("WORDWRAP", (3, 1), (3, -1), True),  # Atividade
+    ])
+
+
+def _criar_doc_relatorio(nome_arquivo, total_linhas, progresso=None, cancelado=None, **kwargs):
+    from reportlab.platypus import SimpleDocTemplate
+
+    class _DocRelatorio(SimpleDocTemplate):
+        """Reporta progresso (e permite cancelar) conforme as tabelas de cada dia são desenhadas."""
+
+        _linhas_desenhadas = 0
+
+        def afterFlowable(self, flowable):
+            linhas = getattr(flowable, "linhas_relatorio", 0)
+            if not linhas:
+                return
+            _verificar_cancelamento(cancelado)
+            self._linhas_desenhadas += linhas
+            if progresso:
+                progresso(self._linhas_desenhadas, total_linhas)
+
+    return _DocRelatorio(nome_arquivo, **kwargs)
+
+
+def _flowables_por_dia(registros, totais, cancelado=None):
+    """Gera, dia a dia, os flowables do relatório a partir dos registros ordenados por data.
+
+    totais: {dia_iso: total_minutos}, vindo de daily_totals.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import Paragraph, Spacer, Table
+    from reportlab.platypus.flowables import HRFlowable
+
+    styles = getSampleStyleSheet()
+    estilo_tabela = _estilo_tabela_pdf()
+    larguras_colunas = [2.3*cm, 2.3*cm, 2.6*cm, 8.3*cm, 2*cm]
+
+    # Fonte menor e minimalista
+    normal_style = ParagraphStyle(name='NormalSmall', fontSize=9, leading=11)
+    heading_style = ParagraphStyle(name='Heading', fontSize=11, leading=14, spaceAfter=6, fontName='Helvetica-Bold')
+
+    # Título principal
+    yield Paragraph("Relatório de Atividades - Timesheet", styles["Title"])
+    yield Spacer(1, 12)
+
+    for dia, do_dia in groupby(registros, key=lambda r: r[1]):
+        _verificar_cancelamento(cancelado)
+        yield Paragraph(f"DIA: {dia}", heading_style)
+        yield Paragraph("Lançamentos:", normal_style)
+        yield Spacer(1, 4)
+
+        data = [["Hora Inicial", "Hora Final", "Duração", "Atividade", "Lançado"]]
+        for _, _, hi, hf, atividade, lancado in do_dia:
+            data.append([hi, hf, calcular_duracao(hi, hf, invalido="--"), atividade, "Sim" if lancado else "Não"])
+
+        tabela = Table(data, colWidths=larguras_colunas)
+        tabela.setStyle(estilo_tabela)
+        tabela.linhas_relatorio = len(data) - 1
+        yield tabela
+        yield Spacer(1, 6)
+
+        total_minutos = totais.get(dia_para_iso(dia), 0)
+        yield Paragraph(f"Tempo Trabalhado: {formatar_minutos(total_minutos)}", normal_style)
+        yield Spacer(1, 10)
+        yield HRFlowable(width="100%", thickness=0.5, color=colors.grey)
+        yield Spacer(1, 8)
+
+
+@medido()
+def exportar_pdf(nome_arquivo, data_de, data_ate, progresso=None, cancelado=None):
+    """Gera o PDF do período (datas dd/mm/yy) com um único doc.build.
+
+    progresso(feitos, total) é chamado a cada dia desenhado; cancelado() é consultado
+    no mesmo ponto e, se verdadeiro, interrompe com ExportacaoCancelada.
+    Retorna a quantidade de registros exportados.
+    """
+    total = contar_registros_intervalo(data_de, data_ate)
+    if not total:
+        return 0
+
+    from reportlab.lib.pagesizes import A4
+
+    doc = _criar_doc_relatorio(nome_arquivo, total, progresso, cancelado,
+                               pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
+    totais = {linha[0]: linha[1] for linha in listar_totais_intervalo(data_de, data_ate)}
+    # Os registros vêm do cursor em lotes e viram flowables numa passada só; o
+    # doc.build precisa da lista, mas nenhuma lista de linhas do período é montada
+    story = list(_flowables_por_dia(iterar_registros_intervalo(data_de, data_ate), totais, cancelado))
+    doc.build(story)
+    if progresso:
+        progresso(total, total)  # tabelas quebradas entre páginas não passam pelo afterFlowable
+    return total
+
+
+# 📤 Excel
+
+CABECALHO_EXCEL = ["Dia", "Hora Inicial", "Hora Final", "Atividade", "Lançado"]
+INTERVALO_PROGRESSO = 1000  # linhas entre atualizações de progresso
+
+
+@medido()
+def exportar_excel(nome_arquivo, data_de, data_ate, por_mes=False, progresso=None, cancelado=None):
+    """Gera o .xlsx do período lendo o banco em lotes e gravando em modo write-only.
+
+    Com por_mes=True cada mês vai para uma aba própria ("2025-03", ...).
+    Retorna a quantidade de registros exportados.
+    """
+    total = contar_registros_intervalo(data_de, data_ate)
+    if not total:
+        return 0
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    aba = None
+    mes_atual = None
+    feitos = 0
+
+    for _, dia, hi, hf, atividade, lancado in iterar_registros_intervalo(data_de, data_ate):
+        mes = f"20{dia[6:8]}-{dia[3:5]}" if por_mes else None
+        if aba is None or mes != mes_atual:
+            aba = wb.create_sheet(title=mes or "Relatório")
+            aba.append(CABECALHO_EXCEL)
+            mes_atual = mes
+
+        aba.append([dia, hi, hf, atividade, "Sim" if lancado else "Não"])
+        feitos += 1
+        if feitos % INTERVALO_PROGRESSO == 0:
+            _verificar_cancelamento(cancelado)
+            if progresso:
+                progresso(feitos, total)
+
+    wb.save(nome_arquivo)
+    if progresso:
+        progresso(feitos, total)
+    return feitos
+
+
+# 📊 Colunar (Parquet / Arrow IPC / CSV) para ferramentas de análise
+
+FORMATOS_COLUNARES = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+TAMANHO_LOTE_COLUNAR = 50000  # linhas por record batch (e por row group no Parquet)
+CABECALHO_CSV = ["id", "dia", "hora_inicio", "hora_fim", "duracao_min", "atividade", "lancado"]
+
+
+def _importar_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Exportar Parquet/Arrow requer o pacote pyarrow (pip install pyarrow).",
+                          name="pyarrow") from e
+    return pyarrow
+
+
+def _esquema_colunar(pa):
+    return pa.schema([
+        ("id", pa.int64()),
+        ("dia", pa.date32()),
+        ("hora_inicio", pa.time32("s")),
+        ("hora_fim", pa.time32("s")),
+        ("duracao", pa.duration("s")),
+        ("atividade", pa.string()),
+        ("lancado", pa.bool_()),
+    ])
+
+
+def _segundos(hora):
+    minutos = horario_para_minutos(hora)
+    return None if minutos is None else minutos * 60
+
+
+def _record_batch(pa, esquema, linhas):
+    """Converte um lote de linhas do banco num RecordBatch tipado."""
+    ids, dias, atividades, lancados = [], [], [], []
+    inicios, fins, duracoes = [], [], []
+    for id_registro, dia, hi, hf, atividade, lancado in linhas:
+        inicio, fim = _segundos(hi), _segundos(hf)
+        ids.append(id_registro)
+        dias.append(dia)
+        inicios.append(inicio)
+        fins.append(fim)
+        duracoes.append(None if inicio is None or fim is None else fim - inicio)
+        atividades.append(atividade)
+        lancados.append(bool(lancado))
+    # dd/mm/yy → date32 de uma vez só, sem criar um objeto date por linha
+    datas = pa.compute.strptime(pa.array(dias, pa.string()), format="%d/%m/%y", unit="s").cast(pa.date32())
+    return pa.record_batch([
+        pa.array(ids, pa.int64()), datas,
+        pa.array(inicios, pa.time32("s")), pa.array(fins, pa.time32("s")), pa.array(duracoes, pa.duration("s")),
+        pa.array(atividades, pa.string()), pa.array(lancados, pa.bool_()),
+    ], schema=esquema)
+
+
+def _lotes(data_de, data_ate, tamanho_lote):
+    lote = []
+    for linha in iterar_registros_intervalo(data_de, data_ate, tamanho_lote=min(tamanho_lote, 5000)):
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _exportar_csv(nome_arquivo, lotes, avancar):
+    """CSV com valores ISO (datas yyyy-mm-dd, horários HH:MM, duração em minutos, lançado true/false)."""
+    with open(nome_arquivo, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(CABECALHO_CSV)
+        for lote in lotes:
+            for id_registro, dia, hi, hf, atividade, lancado in lote:
+                inicio, fim = horario_para_minutos(hi), horario_para_minutos(hf)
+                escritor.writerow([id_registro, dia_para_iso(dia), hi, hf,
+                                   "" if inicio is None or fim is None else fim - inicio,
+                                   atividade, "true" if lancado else "false"])
+            avancar(len(lote))
+
+
+@medido()
+def exportar_colunar(nome_arquivo, data_de, data_ate, formato=None, tamanho_lote=TAMANHO_LOTE_COLUNAR,
+                     progresso=None, cancelado=None):
+    """Exporta o período em Parquet, Arrow IPC ou CSV, em lotes (memória limitada ao lote).
+
+    formato: "parquet", "arrow" ou "csv" (padrão: pela extensão do arquivo). Parquet e
+    Arrow levam tipos de verdade (date32, time32, duration, bool) e exigem pyarrow.
+    Retorna a quantidade de registros exportados.
+    """
+    formato = formato or FORMATOS_COLUNARES.get(os.path.splitext(nome_arquivo)[1].lower())
+    if formato not in FORMATOS_COLUNARES.values():
+        raise ValueError(f"Formato não suportado: {nome_arquivo} (use .parquet, .arrow ou .csv)")
+
+    total = contar_registros_intervalo(data_de, data_ate)
+    if not total:
+        return 0
+
+    feitos = 0
+
+    def avancar(linhas):
+        nonlocal feitos
+        feitos += linhas
+        if progresso:
+            progresso(feitos, total)
+        _verificar_cancelamento(cancelado)
+
+    lotes = _lotes(data_de, data_ate, tamanho_lote)
+    if formato == "csv":
+        _exportar_csv(nome_arquivo, lotes, avancar)
+        return feitos
+
+    pa = _importar_pyarrow()
+    esquema = _esquema_colunar(pa)
+    if formato == "parquet":
+        escritor = pa.parquet.ParquetWriter(nome_arquivo, esquema, compression="zstd")
+    else:
+        escritor = pa.ipc.new_file(nome_arquivo, esquema)
+    try:
+        for lote in lotes:
+            escritor.write_batch(_record_batch(pa, esquema, lote))
+            avancar(len(lote))
+    finally:
+        escritor.close()
+    return feitos
@@ -1,22 +1,27 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from PyQt6.QtGui import QPalette, QColor
-from PyQt6.QtWidgets import QPushButton, QTableWidgetItem, QFileDialog, QCheckBox, QWidget, QHBoxLayout, QMessageBox
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QListWidgetItem, QCompleter, QDialog, QVBoxLayout, QLabel, QTableView, QHeaderView
 import time
-from PyQt6.QtCore import QTime, Qt, QTimer
-from utils.db import inserir_registro, excluir_registro as excluir_do_banco, listar_registros, atualizar_registro_no_bd, listar_registros_intervalo
-import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import Paragraph, Table, TableStyle, SimpleDocTemplate, Spacer
-from reportlab.lib.units import cm
+from PyQt6.QtCore import QDate, QStringListModel, QTime, Qt, QTimer
+from utils.db import inserir_registro, excluir_registro as excluir_do_banco, atualizar_campos_registros, buscar_ids, listar_registros_por_ids, dia_para_iso, assinar_mudancas, cancelar_assinatura, EXCLUIDO, INSERIDO, LOTE
 import os
 import platform
 import subprocess
 from PyQt6 import QtGui
-from utils.config import carregar_ultimo_diretorio_exportacao, salvar_ultimo_diretorio_exportacao, carregar_caminho_bd
-import shutil
+from utils.exportacao import exportar_colunar, exportar_excel, exportar_pdf
+from utils.tarefas import ExecutorBanco, NotificadorMudancas, TarefaEmSegundoPlano
+from utils.autocompletar import construir_indice_atividades
+from utils.backup import fazer_backup, fazer_backup_automatico
+from utils.cache_dias import CacheDias
+from utils.importacao import importar_arquivo, resumo_importacao
+from utils.manutencao import ManutencaoCancelada, fazer_manutencao, resumo_manutencao
+from utils.instrumentacao import medido
+from utils.modelo_grid import RegistrosIntervaloModel
+from utils.overlaps import detectar_overlaps, listar_overlaps_intervalo
+from utils.tempo import horario_para_minutos, formatar_minutos
+from utils.config import carregar_ultimo_diretorio_exportacao, salvar_ultimo_diretorio_exportacao, carregar_caminho_bd, carregar_config_backup, carregar_config_manutencao, salvar_ultima_manutencao
 import sys
+import threading
 
 def aplicar_tema_escuro(app):
     """Aplica um tema escuro minimalista usando Fusion."""
@@ -35,101 +40,223 @@ def aplicar_tema_escuro(app):
 
     app.setPalette(palette)
 
-def calcular_tempo_total(registros):
-    """Calcula o tempo total trabalhado no dia filtrado."""
-    total_segundos = 0
-    formato = "%H:%M"
-
-    for _, _, hora_inicio, hora_fim, _, _ in registros:
-        try:
-            inicio = datetime.strptime(hora_inicio, formato)
-            fim = datetime.strptime(hora_fim, formato)
-            total_segundos += (fim - inicio).total_seconds()
-        except ValueError:
-            continue
+# 🔹 Banco fora da thread da interface: tudo passa pelo ExecutorBanco (uma fila, uma thread)
+ATRASO_INDICADOR_CARREGANDO_MS = 150
+
+def configurar_executor_banco(window):
+    window.executor_bd = ExecutorBanco(window)
+    window.timer_carregando = QTimer(window)
+    window.timer_carregando.setSingleShot(True)
+    window.timer_carregando.timeout.connect(lambda: window.carregando_label.setText("⏳ Carregando..."))
+    window.executor_bd.ocupadoAlterado.connect(lambda ocupado: mostrar_carregando(window, ocupado))
+    window.executor_bd.erroNaoTratado.connect(lambda erro: window.status_label.setText(f"❌ Erro no banco de dados: {erro}"))
+
+def mostrar_carregando(window, ocupado):
+    # Só aparece se a operação demorar (evita piscar a cada consulta rápida)
+    if ocupado:
+        window.timer_carregando.start(ATRASO_INDICADOR_CARREGANDO_MS)
+    else:
+        window.timer_carregando.stop()
+        window.carregando_label.setText("")
 
-    horas, segundos = divmod(total_segundos, 3600)
-    minutos = segundos // 60
-    return f"{int(horas)}h {int(minutos)}m"
-
-def calcular_duracao(hora_inicio, hora_fim):
-    """Calcula a duração entre Hora Inicial e Hora Final."""
-    formato = "%H:%M"
-    try:
-        inicio = datetime.strptime(hora_inicio, formato)
-        fim = datetime.strptime(hora_fim, formato)
-        duracao = fim - inicio
-        horas, segundos = divmod(duracao.total_seconds(), 3600)
-        minutos = segundos // 60
-        return f"{int(horas)}h {int(minutos)}m"
-    except ValueError:
-        return "Erro"
+# Dias antes/depois do exibido que são pré-carregados no cache (navegação ←/→)
+DIAS_VIZINHOS_PREFETCH = 2
 
 def carregar_grid(window):
-    dia_filtro = window.data_filtro.date().toString("dd/MM/yy")
-    registros = listar_registros(dia_filtro)
-
-    window.grid.setRowCount(0)
-    window.grid.setColumnCount(6)
-    window.grid.setHorizontalHeaderLabels(["Hora Inicial", "Hora Final", "Duração", "Atividade", "Ações", "Lançado"])
-
-    if registros:
-        window.grid.setRowCount(len(registros))
-        for row_idx, (id_registro, _, hora_inicio, hora_fim, atividade, lancado) in enumerate(registros):
-            # ... (hora inicial, final, duração, atividade)
-
-            for col_idx, value in enumerate([hora_inicio, hora_fim, calcular_duracao(hora_inicio, hora_fim), atividade]):
-                item = QTableWidgetItem(value)
-                
-                if col_idx == 2:
-                    item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                
-                window.grid.setItem(row_idx, col_idx, item)
-
-            # Botão de excluir
-            delete_button = QPushButton("🗑️ Excluir")
-            delete_button.clicked.connect(lambda _, id=id_registro: excluir_registro(window, id))
-            window.grid.setCellWidget(row_idx, 4, delete_button)
-
-            # Checkbox de Lançado
-            checkbox = QCheckBox()
-            checkbox.setChecked(bool(lancado))
-            checkbox.stateChanged.connect(lambda state, row=row_idx, id=id_registro: atualizar_lancado(window, row, id, state))
-            
-            checkbox = QCheckBox()
-            checkbox.setChecked(bool(lancado))
-            checkbox.stateChanged.connect(lambda state, row=row_idx, id=id_registro: atualizar_lancado(window, row, id, state))
-
-            checkbox.setStyleSheet(""" 
-                QCheckBox::indicator {
-                    width: 18px;
-                    height: 18px;
-                    border: 1px solid #aaa;
-                    background-color: #444;
-                }
-                QCheckBox::indicator:checked {
-                    background-color: #00cc66;
-                    border: 1px solid #00cc66;
-                }
-            """)
-
-            # Centralizar o checkbox com layout
-            checkbox_widget = QWidget()
-            layout = QHBoxLayout(checkbox_widget)
-            layout.addWidget(checkbox)
-            layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            layout.setContentsMargins(0, 0, 0, 0)
-            checkbox_widget.setLayout(layout)
-
-            window.grid.setCellWidget(row_idx, 5, checkbox_widget)
-            
-            verificar_overlaps(window)
+    # 🔹 Edições ainda na fila vão antes para o banco (a fila do executor mantém a ordem)
+    gravar_edicoes_pendentes(window)
 
+    # 🔹 Mesmo um dia em cache passa pelo executor: ler() confere antes se outro processo gravou
+    dia_filtro = window.data_filtro.date().toString("dd/MM/yy")
+    window.executor_bd.executar(window.cache_dias.ler, dia_filtro,
+                                ao_concluir=lambda registros: exibir_registros_do_dia(window, dia_filtro, registros))
+    preaquecer_dias_vizinhos(window)
+
+def preaquecer_dias_vizinhos(window):
+    # Enfileirados depois da consulta do dia exibido: nunca a atrasam
+    data = window.data_filtro.date()
+    for distancia in range(1, DIAS_VIZINHOS_PREFETCH + 1):
+        for vizinho in (data.addDays(distancia), data.addDays(-distancia)):
+            dia = vizinho.toString("dd/MM/yy")
+            if not window.cache_dias.contem(dia):
+                window.executor_bd.executar(window.cache_dias.preaquecer, dia)
+
+@medido()
+def exibir_registros_do_dia(window, dia, registros):
+    # Resposta de um dia que o usuário já deixou para trás (navegação rápida): descarta
+    if dia != window.data_filtro.date().toString("dd/MM/yy"):
+        return
 
+    # 🔹 Um único reset do model — nenhum widget é criado por linha
+    window.grid_model.carregar(registros)
+    verificar_overlaps(window)
 
     # 🔹 Atualizar tempo total trabalhado do dia
-    total_trabalho = calcular_tempo_total(registros)
-    window.total_trabalho_label.setText(f"Total Trabalhado: {total_trabalho}")
+    atualizar_total_trabalhado(window)
+    selecionar_registro_pendente(window)
+
+# 🔎 Busca de atividades em todas as datas (FTS5), paginada conforme a lista rola
+TAMANHO_PAGINA_BUSCA = 50
+ATRASO_BUSCA_MS = 250
+
+def buscar_atividades(window):
+    window.resultados_busca.clear()
+    window.busca_ids = None
+    window.busca_posicao = 0
+    window.busca_esgotada = False
+    window.busca_texto = window.busca_input.text()
+    if not window.busca_texto.strip():
+        window.resultados_busca.hide()
+        return
+    carregar_mais_resultados(window)
+
+def carregar_mais_resultados(window):
+    if window.busca_esgotada or window.busca_em_andamento:
+        return
+    window.busca_em_andamento = True
+    texto, ids, inicio = window.busca_texto, window.busca_ids, window.busca_posicao
+
+    def ler_pagina():
+        # A primeira página fixa o conjunto de resultados; as seguintes são fatias dele
+        todos = buscar_ids(texto) if ids is None else ids
+        return todos, listar_registros_por_ids(todos[inicio:inicio + TAMANHO_PAGINA_BUSCA])
+
+    window.executor_bd.executar(ler_pagina,
+                                ao_concluir=lambda resultado: exibir_resultados_busca(window, texto, *resultado),
+                                ao_falhar=lambda erro: setattr(window, "busca_em_andamento", False))
+
+def exibir_resultados_busca(window, texto, ids, linhas):
+    window.busca_em_andamento = False
+    if texto != window.busca_texto:
+        # O usuário mudou a busca enquanto esta página era lida
+        carregar_mais_resultados(window)
+        return
+    for id_registro, dia, hora_inicio, hora_fim, atividade, _ in linhas:
+        item = QListWidgetItem(f"{dia}   {hora_inicio}–{hora_fim}   {atividade}")
+        item.setData(Qt.ItemDataRole.UserRole, (id_registro, dia))
+        window.resultados_busca.addItem(item)
+    window.busca_ids = ids
+    window.busca_posicao += TAMANHO_PAGINA_BUSCA
+    window.busca_esgotada = window.busca_posicao >= len(ids)
+    if window.resultados_busca.count() == 0:
+        item = QListWidgetItem("Nenhum registro encontrado.")
+        item.setFlags(Qt.ItemFlag.NoItemFlags)
+        window.resultados_busca.addItem(item)
+    window.resultados_busca.show()
+
+def ao_rolar_resultados(window, valor):
+    # 🔹 Próxima página só quando a lista chega ao fim
+    if valor >= window.resultados_busca.verticalScrollBar().maximum():
+        carregar_mais_resultados(window)
+
+def abrir_resultado_busca(window, item):
+    dados = item.data(Qt.ItemDataRole.UserRole)
+    if not dados:
+        return
+    ir_para_registro(window, *dados)
+
+def ir_para_registro(window, id_registro, dia):
+    """Leva data_filtro ao dia e seleciona o registro na grid (depois que o dia carregar)."""
+    window.registro_a_selecionar = id_registro
+    data = QDate.fromString(dia_para_iso(dia), "yyyy-MM-dd")
+    if data == window.data_filtro.date():
+        selecionar_registro_pendente(window)
+    else:
+        window.data_filtro.setDate(data)  # dispara carregar_grid
+
+def selecionar_registro_pendente(window):
+    id_registro, window.registro_a_selecionar = window.registro_a_selecionar, None
+    for row, registro in enumerate(window.grid_model.registros):
+        if registro[0] == id_registro:
+            window.grid.selectRow(row)
+            window.grid.scrollTo(window.grid_model.index(row, 0))
+            break
+
+# 🔔 Mudanças publicadas pelo banco aplicadas direto no model (sem reler o dia)
+def configurar_notificacoes(window):
+    # O cache assina primeiro: quando a grid recebe a mudança, o dia já foi invalidado
+    window.cache_dias = CacheDias()
+    assinar_mudancas(window.cache_dias.ao_mudar)
+    window.notificador = NotificadorMudancas(window)
+    window.notificador.mudancas.connect(lambda mudancas: aplicar_mudancas(window, mudancas))
+    window.ouvinte_mudancas = window.notificador.mudancas.emit
+    assinar_mudancas(window.ouvinte_mudancas)
+
+def encerrar_notificacoes(window):
+    cancelar_assinatura(window.ouvinte_mudancas)
+    cancelar_assinatura(window.cache_dias.ao_mudar)
+
+def aplicar_mudancas(window, mudancas):
+    atualizar_indice_atividades(window, mudancas)
+    dia_filtro = window.data_filtro.date().toString("dd/MM/yy")
+    model = window.grid_model
+    alterou = False
+    for mudanca in mudancas:
+        if mudanca.tipo == LOTE:
+            # Importações trazem muitas linhas de uma vez: relê o dia só se ele foi afetado
+            if dia_filtro in mudanca.campos["dias"]:
+                carregar_grid(window)
+            continue
+        if mudanca.tipo == EXCLUIDO or mudanca.registro[1] != dia_filtro:
+            alterou = model.remover(mudanca.id) or alterou
+        elif mudanca.tipo == INSERIDO:
+            model.inserir(mudanca.registro)
+            alterou = True
+        else:
+            alterou = model.atualizar(mudanca.registro) or alterou
+
+    if alterou:
+        verificar_overlaps(window)
+        atualizar_total_trabalhado(window)
+    recarregar_visao_periodo(window)
+
+# ✍️ Autocompletar da atividade: índice montado em segundo plano, mantido pelas notificações
+def configurar_autocompletar(window):
+    window.indice_atividades = None
+    window.modelo_sugestoes = QStringListModel(window)
+    window.completer_atividade = QCompleter(window.modelo_sugestoes, window)
+    # O índice já filtra e ordena: o completer só exibe a lista
+    window.completer_atividade.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+    window.atividade_input.setCompleter(window.completer_atividade)
+    window.atividade_input.textEdited.connect(lambda texto: sugerir_atividades(window, texto))
+    reconstruir_indice_atividades(window)
+
+def reconstruir_indice_atividades(window):
+    window.executor_bd.executar(construir_indice_atividades,
+                                ao_concluir=lambda indice: setattr(window, "indice_atividades", indice))
+
+def sugerir_atividades(window, texto):
+    if window.indice_atividades is None:
+        return
+    sugestoes = window.indice_atividades.sugerir(texto)
+    if sugestoes == [texto]:  # já digitado por inteiro
+        sugestoes = []
+    window.modelo_sugestoes.setStringList(sugestoes)
+    if sugestoes:
+        window.completer_atividade.complete()
+    else:
+        window.completer_atividade.popup().hide()
+
+def atualizar_indice_atividades(window, mudancas):
+    indice = window.indice_atividades
+    if indice is None:
+        return
+    for mudanca in mudancas:
+        if mudanca.tipo == LOTE:
+            # Importação: mais barato remontar do que somar linha a linha
+            reconstruir_indice_atividades(window)
+            return
+        if mudanca.tipo == INSERIDO:
+            indice.registrar_uso(mudanca.registro[4], mudanca.registro[1])
+        elif mudanca.tipo == EXCLUIDO:
+            indice.remover_uso(mudanca.registro[4])
+        elif "atividade" in mudanca.campos:
+            if mudanca.campos.get("atividade_anterior") is not None:
+                indice.remover_uso(mudanca.campos["atividade_anterior"])
+            indice.registrar_uso(mudanca.campos["atividade"], mudanca.registro[1])
+
+def atualizar_total_trabalhado(window):
+    window.total_trabalho_label.setText(f"Total Trabalhado: {formatar_minutos(window.grid_model.total_minutos)}")
 
 def adicionar_registro(window):
     hora_inicio = window.hora_inicio_input.time().toString("HH:mm")
@@ -138,7 +265,7 @@ def adicionar_registro(window):
     dia_filtro = window.data_filtro.date().toString("dd/MM/yy")
 
     if atividade:
-        inserir_registro(hora_inicio, hora_fim, atividade, dia_filtro)
+        window.executor_bd.executar(inserir_registro, hora_inicio, hora_fim, atividade, dia_filtro)
 
         # Resetar campos
         window.hora_inicio_input.setTime(QTime.currentTime())
@@ -147,8 +274,7 @@ def adicionar_registro(window):
 
         # ✅ Remover a borda vermelha (volta ao normal)
         window.atividade_input.setStyleSheet("color: white;")
-
-        carregar_grid(window)
+        # A nova linha chega à grid pela notificação do banco (aplicar_mudancas)
     else:
         # ⚠️ Atividade vazia → mostra borda vermelha
         window.atividade_input.setStyleSheet("""
@@ -157,9 +283,9 @@ def adicionar_registro(window):
         """)
 
 def excluir_registro(window, id_registro):
-    """Exclui um registro do banco de dados e atualiza a grid."""
-    excluir_do_banco(id_registro)  # 🔹 Chama a função correta do banco
-    carregar_grid(window)
+    """Exclui um registro do banco de dados; a grid remove a linha ao receber a notificação."""
+    window.edicoes_pendentes.pop(id_registro, None)
+    window.executor_bd.executar(excluir_do_banco, id_registro)
     
 def iniciar_cronometro(window):
     """Inicia o cronômetro e desativa o botão de iniciar."""
@@ -193,73 +319,39 @@ def parar_cronometro(window):
         # ✅ Data real do sistema, ignorando o calendário
         dia_hoje = datetime.now().strftime("%d/%m/%y")
 
-        inserir_registro(hora_inicio, hora_fim, "Atividade registrada", dia_hoje)
-
-        # 🔄 Atualizar grid somente se o usuário estiver no dia atual
-        if window.data_filtro.date().toString("dd/MM/yy") == dia_hoje:
-            carregar_grid(window)
+        # 🔄 A grid só recebe a linha se estiver mostrando o dia atual (aplicar_mudancas)
+        window.executor_bd.executar(inserir_registro, hora_inicio, hora_fim, "Atividade registrada", dia_hoje)
 
         window.start_button.setEnabled(True)
         
-def atualizar_registro(window, row, col):
-    """Atualiza o registro no banco de dados após a edição da célula."""
-    
-    # 🔹 Verificar se a célula editada tem um valor antes de continuar
-    item_editado = window.grid.item(row, col)
-    if item_editado is None:
-        return  # Se a célula for None, não faz nada para evitar erro
-
-    novo_valor = item_editado.text().strip()
-
-    # 🔹 Buscar o ID do registro baseado no índice da linha
-    registros = listar_registros(window.data_filtro.date().toString("dd/MM/yy"))
-    if row >= len(registros):
-        return  # Evita erro se o índice estiver fora do intervalo
-
-    id_registro = registros[row][0]  # Obter o ID do registro correto
-
-    # 🔹 Determinar qual campo foi atualizado
-    campos = ["hora_inicio", "hora_fim", None, "atividade"]  # Índice 2 (Duração) não pode ser editado
-    campo_atualizado = campos[col]
-
-    if campo_atualizado:
-        atualizar_registro_no_bd(id_registro, campo_atualizado, novo_valor)
-
-    # 🔹 Atualizar a duração na linha editada se as horas forem alteradas
-    if col in [0, 1]:  # Se a edição foi na Hora Inicial ou Hora Final
-        hora_inicio_item = window.grid.item(row, 0)
-        hora_fim_item = window.grid.item(row, 1)
-
-        if hora_inicio_item and hora_fim_item:  # Verifica se as células não estão vazias
-            hora_inicio = hora_inicio_item.text().strip()
-            hora_fim = hora_fim_item.text().strip()
-
-            # 🔹 Desconectar temporariamente itemChanged para evitar loop infinito
-            window.grid.itemChanged.disconnect()
-
-            duracao = calcular_duracao(hora_inicio, hora_fim)
-            window.grid.setItem(row, 2, QTableWidgetItem(duracao))
-
-            # 🔹 Recalcular o tempo total trabalhado sem recursão
-            total_trabalho = calcular_tempo_total(listar_registros(window.data_filtro.date().toString("dd/MM/yy")))
-            window.total_trabalho_label.setText(f"Total Trabalhado: {total_trabalho}")
-
-            verificar_overlaps(window)
-            
-            # 🔹 Reconectar itemChanged após a atualização
-            window.grid.itemChanged.connect(lambda item: atualizar_registro(window, item.row(), item.column()))
+# Intervalo para juntar edições da mesma linha num único UPDATE
+INTERVALO_GRAVACAO_MS = 500
+
+def atualizar_registro(window, id_registro, campo, novo_valor):
+    """Enfileira a edição feita na grid; gravar_edicoes_pendentes grava tudo de uma vez."""
+    window.edicoes_pendentes.setdefault(id_registro, {})[campo] = novo_valor
+    window.timer_edicoes.start(INTERVALO_GRAVACAO_MS)
+
+    # 🔹 Horários alterados: total já foi ajustado pelo model, só falta exibir e checar overlaps
+    if campo in ("hora_inicio", "hora_fim"):
+        atualizar_total_trabalhado(window)
+        verificar_overlaps(window)
+
+@medido()
+def gravar_edicoes_pendentes(window):
+    """Grava as edições enfileiradas (uma transação, um UPDATE por registro)."""
+    window.timer_edicoes.stop()
+    if not window.edicoes_pendentes:
+        return
+    pendentes, window.edicoes_pendentes = window.edicoes_pendentes, {}
+    # O dia da grid sai do cache já agora, não só quando o UPDATE rodar na fila
+    window.cache_dias.invalidar({registro[1] for registro in window.grid_model.registros})
+    window.executor_bd.executar(atualizar_campos_registros, pendentes)
 
+@medido()
 def exportar_para_excel(window):
     data_de = window.data_de_filtro.date().toString("dd/MM/yy")
     data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
-    registros = listar_registros_intervalo(data_de, data_ate)
-
-    if not registros:
-        window.status_label.setText("⚠️ Nenhum registro encontrado no período selecionado.")
-        return
-
-    df = pd.DataFrame(registros, columns=["ID", "Dia", "Hora Inicial", "Hora Final", "Atividade", "Lançado"])
-    df["Lançado"] = df["Lançado"].apply(lambda x: "Sim" if x else "Não")
 
     hoje = datetime.now().strftime("%d-%m-%Y")
     nome_sugerido = f"{hoje}_Timesheet.xlsx"
@@ -275,50 +367,30 @@ def exportar_para_excel(window):
     # 📂 Salva novo diretório escolhido
     salvar_ultimo_diretorio_exportacao(nome_arquivo)
 
-    try:
-        df.drop(columns=["ID"]).to_excel(nome_arquivo, index=False, sheet_name="Relatório")
+    def ao_concluir(total):
+        if not total:
+            window.status_label.setText("⚠️ Nenhum registro encontrado no período selecionado.")
+            return
         window.status_label.setText(f"✅ Excel gerado com sucesso: {nome_arquivo}")
         QTimer.singleShot(5000, lambda: window.status_label.setText(""))
 
-
         # Abrir automaticamente após exportar
-        if platform.system() == "Windows":
-            os.startfile(nome_arquivo)
-        elif platform.system() == "Darwin":
-            subprocess.call(["open", nome_arquivo])
-        else:
-            subprocess.call(["xdg-open", nome_arquivo])
-    except Exception as e:
+        abrir_arquivo(nome_arquivo)
+
+    def ao_falhar(erro):
         window.status_label.setText("❌ Erro ao gerar o Excel.")
         QTimer.singleShot(5000, lambda: window.status_label.setText(""))
 
+    tarefa = TarefaEmSegundoPlano(exportar_excel, nome_arquivo, data_de, data_ate,
+                                  window.excel_por_mes_checkbox.isChecked(), parent=window)
+    executar_em_segundo_plano(window, tarefa, "Gerando Excel", ao_concluir, ao_falhar, arquivo_parcial=nome_arquivo)
+
         
-def atualizar_lancado(window, row, id_registro, state):
-    """Atualiza o campo 'lancado' no banco e ajusta o estilo visual."""
-    valor = 1 if state == 2 else 0  # Qt.Checked == 2
-    atualizar_registro_no_bd(id_registro, "lancado", valor)
-
-    # Estiliza apenas a célula do checkbox (coluna 5)
-    cell_widget = window.grid.cellWidget(row, 5)
-    if cell_widget:
-        if valor:
-            cell_widget.setStyleSheet("background-color: rgba(0, 255, 0, 50); border-radius: 4px;")
-        else:
-            cell_widget.setStyleSheet("background-color: transparent;")
-  
  # Exportação para PDF           
+@medido()
 def exportar_para_pdf(window):
     data_de = window.data_de_filtro.date().toString("dd/MM/yy")
     data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
-    registros = listar_registros_intervalo(data_de, data_ate)
-
-    if not registros:
-        window.status_label.setText("⚠️ Nenhum registro encontrado no período selecionado.")
-        return
-
-    df = pd.DataFrame(registros, columns=["ID", "Dia", "Hora Inicial", "Hora Final", "Atividade", "Lançado"])
-    df.drop(columns=["ID"], inplace=True)
-    df["Lançado"] = df["Lançado"].apply(lambda x: "Sim" if x else "Não")
 
     hoje = datetime.now().strftime("%d-%m-%Y")
     nome_sugerido = f"{hoje}_Timesheet.pdf"
@@ -334,157 +406,202 @@ def exportar_para_pdf(window):
     # 📂 Salva novo diretório escolhido
     salvar_ultimo_diretorio_exportacao(nome_arquivo)
 
-    doc = SimpleDocTemplate(nome_arquivo, pagesize=A4, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=30)
-    story = []
-    styles = getSampleStyleSheet()
+    def ao_concluir(total):
+        if not total:
+            window.status_label.setText("⚠️ Nenhum registro encontrado no período selecionado.")
+            return
+        window.status_label.setText(f"✅ PDF gerado com sucesso: {nome_arquivo}")
+        QTimer.singleShot(5000, lambda: window.status_label.setText(""))
+        abrir_arquivo(nome_arquivo)
 
-    # Fonte menor e minimalista
-    normal_style = ParagraphStyle(name='NormalSmall', fontSize=9, leading=11)
-    heading_style = ParagraphStyle(name='Heading', fontSize=11, leading=14, spaceAfter=6, fontName='Helvetica-Bold')
+    def ao_falhar(erro):
+        window.status_label.setText("")
+        QMessageBox.critical(window, "Erro ao salvar PDF",
+            f"❌ Não foi possível salvar o arquivo.\n\nMotivo: {erro}\n\n"
+            "Verifique se o arquivo está aberto em outro programa e tente novamente.")
 
-    # Título principal
-    story.append(Paragraph("Relatório de Atividades - Timesheet", styles["Title"]))
-    story.append(Spacer(1, 12))
+    tarefa = TarefaEmSegundoPlano(exportar_pdf, nome_arquivo, data_de, data_ate, parent=window)
+    executar_em_segundo_plano(window, tarefa, "Gerando PDF", ao_concluir, ao_falhar, arquivo_parcial=nome_arquivo)
 
-    for dia, grupo in df.groupby("Dia"):
-        story.append(Paragraph(f"DIA: {dia}", heading_style))
-        story.append(Paragraph("Lançamentos:", normal_style))
-        story.append(Spacer(1, 4))
 
-        data = [["Hora Inicial", "Hora Final", "Duração", "Atividade", "Lançado"]]
+# 📊 Exportação para ferramentas de análise (Parquet / Arrow IPC / CSV, com tipos)
+@medido()
+def exportar_para_analise(window):
+    data_de = window.data_de_filtro.date().toString("dd/MM/yy")
+    data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
 
-        total_segundos = 0
-        for _, row in grupo.iterrows():
-            hi, hf = row["Hora Inicial"], row["Hora Final"]
-            try:
-                h_ini = datetime.strptime(hi, "%H:%M")
-                h_fim = datetime.strptime(hf, "%H:%M")
-                duracao = h_fim - h_ini
-                segundos = duracao.total_seconds()
-                total_segundos += segundos
-                horas = int(segundos // 3600)
-                minutos = int((segundos % 3600) // 60)
-                dur = f"{horas}h {minutos}m"
-            except:
-                dur = "--"
-
-            data.append([hi, hf, dur, row["Atividade"], row["Lançado"]])
-
-        # Colunas otimizadas
-        tabela = Table(data, colWidths=[2.3*cm, 2.3*cm, 2.6*cm, 8.3*cm, 2*cm])
-        tabela.setStyle(TableStyle([
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#f2f2f2")),
-            ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),                # Fonte padrão
-            ("FONTSIZE", (3, 1), (3, -1), 7),                 # Fonte menor para a coluna Atividade
-            ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-            ("TOPPADDING", (0, 1), (-1, -1), 4),
-            ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f9f9f9")]),
-            ("WORDWRAP", (3, 1), (3, -1), True),  # Atividade
-        ]))
-
-        story.append(tabela)
-        story.append(Spacer(1, 6))
-
-        total_horas = int(total_segundos // 3600)
-        total_minutos = int((total_segundos % 3600) // 60)
-        story.append(Paragraph(f"Tempo Trabalhado: {total_horas}h {total_minutos}m", normal_style))
-        story.append(Spacer(1, 10))
-        story.append(Paragraph("<hr width='100%'/>", styles["Normal"]))
-        story.append(Spacer(1, 8))
-        
-        try:
-            doc.build(story)
-            window.status_label.setText(f"✅ PDF gerado com sucesso: {nome_arquivo}")
-            QTimer.singleShot(5000, lambda: window.status_label.setText(""))
+    hoje = datetime.now().strftime("%d-%m-%Y")
+    ultimo_dir = carregar_ultimo_diretorio_exportacao()
+    nome_arquivo, _ = QFileDialog.getSaveFileName(window, "Exportar para Análise",
+        os.path.join(ultimo_dir, f"{hoje}_Timesheet.parquet"),
+        "Parquet (*.parquet);;Arrow IPC (*.arrow);;CSV (*.csv)")
 
-            # Tenta abrir automaticamente, mas sem alertar se der erro
-            try:
-                if platform.system() == "Windows":
-                    os.startfile(nome_arquivo)
-                elif platform.system() == "Darwin":
-                    subprocess.call(["open", nome_arquivo])
-                else:
-                    subprocess.call(["xdg-open", nome_arquivo])
-            except:
-                pass  # Não exibe erro secundário
-        except Exception as e:
-            QMessageBox.critical(window, "Erro ao salvar PDF",
-                f"❌ Não foi possível salvar o arquivo.\n\nMotivo: {str(e)}\n\n"
-                "Verifique se o arquivo está aberto em outro programa e tente novamente.")
+    if not nome_arquivo:
+        return
 
+    salvar_ultimo_diretorio_exportacao(nome_arquivo)
 
-        
-# Funcoes para detectar overlaps
-def horario_para_minutos(hora_str):
-    try:
-        h, m = map(int, hora_str.split(":"))
-        return h * 60 + m
-    except:
-        return None
+    def ao_concluir(total):
+        if not total:
+            window.status_label.setText("⚠️ Nenhum registro encontrado no período selecionado.")
+            return
+        window.status_label.setText(f"✅ {total} registro(s) exportado(s): {nome_arquivo}")
+        QTimer.singleShot(5000, lambda: window.status_label.setText(""))
 
-from PyQt6 import QtGui
-from PyQt6.QtWidgets import QCheckBox
+    def ao_falhar(erro):
+        window.status_label.setText("")
+        QMessageBox.critical(window, "Erro ao exportar", f"❌ Não foi possível exportar.\n\nMotivo: {erro}")
+
+    tarefa = TarefaEmSegundoPlano(exportar_colunar, nome_arquivo, data_de, data_ate, parent=window)
+    executar_em_segundo_plano(window, tarefa, "Exportando para análise", ao_concluir, ao_falhar, arquivo_parcial=nome_arquivo)
+
+
+# Tarefas em segundo plano (exportações) com progresso e cancelamento no status_label
+def executar_em_segundo_plano(window, tarefa, descricao, ao_concluir, ao_falhar, arquivo_parcial=None):
+    if getattr(window, "tarefa_atual", None) is not None:
+        window.status_label.setText("⏳ Aguarde o término da operação em andamento.")
+        return
+
+    def mostrar_progresso(feitos, total):
+        if not total:  # total desconhecido: só a contagem
+            window.status_label.setText(f"⏳ {descricao}... {feitos} — <a href='cancelar'>Cancelar</a>")
+            return
+        percentual = int(feitos * 100 / total)
+        window.status_label.setText(f"⏳ {descricao}... {percentual}% ({feitos}/{total}) — <a href='cancelar'>Cancelar</a>")
+
+    def finalizar():
+        window.tarefa_atual = None
+        tarefa.deleteLater()
+
+    def cancelada():
+        # Remove o arquivo incompleto
+        if arquivo_parcial and os.path.exists(arquivo_parcial):
+            try:
+                os.remove(arquivo_parcial)
+            except OSError:
+                pass
+        window.status_label.setText(f"⛔ {descricao}: cancelado.")
+        QTimer.singleShot(5000, lambda: window.status_label.setText(""))
 
-def horario_para_minutos(hora_str):
+    window.status_label.setStyleSheet("")
+    window.status_label.setText(f"⏳ {descricao}... — <a href='cancelar'>Cancelar</a>")
+    tarefa.progresso.connect(mostrar_progresso)
+    tarefa.concluida.connect(ao_concluir)
+    tarefa.falhou.connect(ao_falhar)
+    tarefa.cancelada.connect(cancelada)
+    tarefa.finished.connect(finalizar)
+    window.tarefa_atual = tarefa
+    tarefa.start()
+
+def cancelar_tarefa(window):
+    if getattr(window, "tarefa_atual", None) is not None:
+        window.tarefa_atual.cancelar()
+
+def abrir_arquivo(nome_arquivo):
+    """Tenta abrir o arquivo exportado, sem alertar se der erro."""
     try:
-        h, m = map(int, hora_str.split(":"))
-        return h * 60 + m
+        if platform.system() == "Windows":
+            os.startfile(nome_arquivo)
+        elif platform.system() == "Darwin":
+            subprocess.call(["open", nome_arquivo])
+        else:
+            subprocess.call(["xdg-open", nome_arquivo])
     except:
-        return None
+        pass  # Não exibe erro secundário
 
+        
+# Funcoes para detectar overlaps
+@medido()
 def verificar_overlaps(window):
-    registros = []
-    tem_overlap = False  
-
-    # 🔁 Coleta os horários da grid
-    for i in range(window.grid.rowCount()):
-        hi_item = window.grid.item(i, 0)
-        hf_item = window.grid.item(i, 1)
-
-        if hi_item and hf_item:
-            inicio = horario_para_minutos(hi_item.text())
-            fim = horario_para_minutos(hf_item.text())
-
-            if inicio is not None and fim is not None and fim > inicio:
-                registros.append((inicio, fim, i))
-
-    # 🔁 Resetar cores de Hora Inicial e Hora Final (colunas 0 e 1)
-    for i in range(window.grid.rowCount()):
-        for col in [0, 1]:
-            item = window.grid.item(i, col)
-            if item:
-                checkbox_widget = window.grid.cellWidget(i, 5)
-                if isinstance(checkbox_widget, QCheckBox) and checkbox_widget.isChecked():
-                    cor = QtGui.QColor("red")
-                else:
-                    cor = QtGui.QColor("white")
-                item.setForeground(QtGui.QBrush(cor))
-
-    # 🔍 Verificar conflitos de horário e pintar de vermelho se houver
-    for i, (ini1, fim1, row1) in enumerate(registros):
-        for j, (ini2, fim2, row2) in enumerate(registros):
-            if i != j and ini1 < fim2 and ini2 < fim1:
-                tem_overlap = True  # ✅ Marcar que há conflito
-                for col in [0, 1]:  # Hora Inicial e Final
-                    item1 = window.grid.item(row1, col)
-                    item2 = window.grid.item(row2, col)
-                    if item1:
-                        item1.setForeground(QtGui.QBrush(QtGui.QColor("red")))
-                    if item2:
-                        item2.setForeground(QtGui.QBrush(QtGui.QColor("red")))
+    """Roda a detecção uma vez sobre as linhas do model e pinta as linhas em conflito."""
+    registros = window.grid_model.registros
+    intervalos = ((horario_para_minutos(r[2]), horario_para_minutos(r[3]), row) for row, r in enumerate(registros))
+    window.grupos_overlap = detectar_overlaps(intervalos)
+
+    # 🔴 Linhas em conflito são pintadas de vermelho pelo model
+    window.grid_model.marcar_overlaps(row for grupo in window.grupos_overlap for row in grupo.chaves)
 
     # ✅ Exibir ou limpar mensagem no status_label
-    if tem_overlap:
+    if window.grupos_overlap:
         window.status_label.setStyleSheet("color: red;")
         window.status_label.setText("⚠️ Overlap detectado entre horários.")
     else:
         window.status_label.setText("")
 
+@medido()
+def verificar_overlaps_periodo(window):
+    """Lista os overlaps de todo o período De/Até (útil antes de exportar)."""
+    data_de = window.data_de_filtro.date().toString("dd/MM/yy")
+    data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
+    window.executor_bd.executar(listar_overlaps_intervalo, data_de, data_ate,
+                                ao_concluir=lambda grupos: mostrar_overlaps_periodo(window, grupos))
+
+def mostrar_overlaps_periodo(window, grupos):
+    if not grupos:
+        QMessageBox.information(window, "Overlaps", "✅ Nenhum overlap no período selecionado.")
+        return
+
+    linhas = [f"{g.dia}  {g.inicio // 60:02}:{g.inicio % 60:02}–{g.fim // 60:02}:{g.fim % 60:02}  "
+              f"({len(g.chaves)} lançamentos)" for g in grupos]
+    QMessageBox.warning(window, "Overlaps",
+        f"⚠️ {len(grupos)} overlap(s) no período:\n\n" + "\n".join(linhas[:50])
+        + ("\n..." if len(linhas) > 50 else ""))
+
+
+# 📆 Visão do período De/Até (somente leitura, lida sob demanda conforme a rolagem)
+def abrir_visao_periodo(window):
+    if getattr(window, "visao_periodo", None) is None:
+        dialogo = QDialog(window)
+        dialogo.setWindowTitle("Registros do Período")
+        dialogo.resize(900, 500)
+        layout = QVBoxLayout(dialogo)
+
+        dialogo.resumo_label = QLabel("")
+        layout.addWidget(dialogo.resumo_label)
+
+        dialogo.modelo = RegistrosIntervaloModel(dialogo, window.executor_bd)
+        dialogo.modelo.carregado.connect(lambda: atualizar_resumo_periodo(window))
+        tabela = QTableView()
+        tabela.setModel(dialogo.modelo)
+        tabela.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        tabela.verticalHeader().setDefaultSectionSize(24)
+        tabela.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        tabela.horizontalHeader().setStretchLastSection(False)
+        for coluna, largura in enumerate((80, 80, 80, 80, 420, 60)):
+            tabela.setColumnWidth(coluna, largura)
+        # Duplo clique leva a grid principal ao dia do registro
+        def ao_clicar_duas_vezes(index):
+            dados = index.data(Qt.ItemDataRole.UserRole)
+            if dados:
+                ir_para_registro(window, *dados)
+        tabela.doubleClicked.connect(ao_clicar_duas_vezes)
+        layout.addWidget(tabela)
+
+        # Acompanha mudanças em De/Até enquanto estiver aberta
+        window.data_de_filtro.dateChanged.connect(lambda: recarregar_visao_periodo(window))
+        window.data_ate_filtro.dateChanged.connect(lambda: recarregar_visao_periodo(window))
+        window.visao_periodo = dialogo
+
+    window.visao_periodo.show()
+    window.visao_periodo.raise_()
+    recarregar_visao_periodo(window)
+
+def recarregar_visao_periodo(window):
+    dialogo = getattr(window, "visao_periodo", None)
+    if dialogo is None or not dialogo.isVisible():
+        return
+    gravar_edicoes_pendentes(window)
+    data_de = window.data_de_filtro.date().toString("dd/MM/yy")
+    data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
+    dialogo.resumo_label.setText(f"{data_de} até {data_ate} — ⏳ carregando...")
+    dialogo.modelo.carregar(data_de, data_ate)
+
+def atualizar_resumo_periodo(window):
+    dialogo = window.visao_periodo
+    data_de = window.data_de_filtro.date().toString("dd/MM/yy")
+    data_ate = window.data_ate_filtro.date().toString("dd/MM/yy")
+    dialogo.resumo_label.setText(f"{data_de} até {data_ate} — {dialogo.modelo.rowCount()} registro(s) — "
+                                 f"Total: {formatar_minutos(dialogo.modelo.total_minutos)}")
 
 def mostrar_sobre(self):
     QMessageBox.information(
@@ -497,6 +614,7 @@ def mostrar_sobre(self):
         "© 2025 Luiz Lima. Todos os direitos reservados."
     )
 
+@medido()
 def fazer_backup_banco(window):
     caminho_origem = carregar_caminho_bd()
     if not caminho_origem or not os.path.exists(caminho_origem):
@@ -505,16 +623,167 @@ def fazer_backup_banco(window):
 
     sugestao_nome = "backup_timesheet.db"
     destino, _ = QFileDialog.getSaveFileName(window, "Salvar Backup do Banco",
-        sugestao_nome, "SQLite Database (*.db)")
+        sugestao_nome, "SQLite Database (*.db);;Backup compactado (*.db.gz)")
 
     if not destino:
         return
 
-    try:
-        shutil.copy2(caminho_origem, destino)
-        QMessageBox.information(window, "Backup", f"✅ Backup criado com sucesso:\n{destino}")
-    except Exception as e:
-        QMessageBox.critical(window, "Erro", f"❌ Erro ao criar backup:\n{str(e)}")
+    def ao_concluir(_):
+        window.status_label.setText("")
+        QMessageBox.information(window, "Backup", f"✅ Backup criado e verificado com sucesso:\n{destino}")
+
+    def ao_falhar(erro):
+        window.status_label.setText("")
+        QMessageBox.critical(window, "Erro", f"❌ Erro ao criar backup:\n{erro}")
+
+    tarefa = TarefaEmSegundoPlano(fazer_backup, destino, parent=window)
+    executar_em_segundo_plano(window, tarefa, "Criando backup", ao_concluir, ao_falhar)
+
+@medido()
+def importar_registros(window):
+    """Importa CSV/XLSX/JSON em segundo plano, numa única transação, e resume o resultado."""
+    ultimo_dir = carregar_ultimo_diretorio_exportacao()
+    caminho, _ = QFileDialog.getOpenFileName(window, "Importar Registros", ultimo_dir,
+        "Planilhas e dados (*.csv *.xlsx *.json *.jsonl);;Todos os arquivos (*)")
+
+    if not caminho:
+        return
+
+    # 🔹 Edições ainda na fila vão para o banco antes da importação
+    gravar_edicoes_pendentes(window)
+
+    def ao_concluir(resultado):
+        window.status_label.setText(f"✅ {resultado.inseridos} registro(s) importado(s).")
+        QTimer.singleShot(5000, lambda: window.status_label.setText(""))
+        if resultado.overlaps or resultado.invalidos:
+            QMessageBox.warning(window, "Importação", resumo_importacao(resultado))
+        else:
+            QMessageBox.information(window, "Importação", resumo_importacao(resultado))
+
+    def ao_falhar(erro):
+        window.status_label.setText("")
+        QMessageBox.critical(window, "Erro", f"❌ Erro ao importar:\n{erro}")
+
+    tarefa = TarefaEmSegundoPlano(importar_arquivo, caminho, parent=window)
+    executar_em_segundo_plano(window, tarefa, "Importando", ao_concluir, ao_falhar)
+
+def configurar_backup_automatico(window):
+    """Agenda o backup automático a cada N horas, conforme config.json → "backup_automatico"."""
+    config = carregar_config_backup()
+    window.tarefa_backup = None
+    if not config["pasta"] or not config["intervalo_horas"]:
+        return
+    window.timer_backup = QTimer(window)
+    window.timer_backup.timeout.connect(lambda: executar_backup_automatico(window))
+    window.timer_backup.start(int(float(config["intervalo_horas"]) * 3600 * 1000))
+
+def executar_backup_automatico(window):
+    """Backup automático silencioso em segundo plano (só avisa no status_label se falhar)."""
+    config = carregar_config_backup()
+    if window.tarefa_backup is not None or not config["pasta"]:
+        return
+
+    def ao_falhar(erro):
+        window.status_label.setText(f"❌ Backup automático falhou: {erro}")
+        QTimer.singleShot(10000, lambda: window.status_label.setText(""))
+
+    def finalizar():
+        window.tarefa_backup.deleteLater()
+        window.tarefa_backup = None
+
+    window.tarefa_backup = TarefaEmSegundoPlano(fazer_backup_automatico, config["pasta"], int(config["manter"]), parent=window)
+    window.tarefa_backup.falhou.connect(ao_falhar)
+    window.tarefa_backup.finished.connect(finalizar)
+    window.tarefa_backup.start()
+
+# 🧹 Manutenção do banco quando o app fica ocioso (e no fechamento), conforme config.json → "manutencao"
+def configurar_manutencao_automatica(window):
+    config = carregar_config_manutencao()
+    window.manutencao_cancelada = None  # threading.Event da manutenção em andamento
+    window.timer_ocioso = QTimer(window)
+    window.timer_ocioso.setSingleShot(True)
+    window.timer_ocioso.setInterval(int(float(config["ociosidade_min"]) * 60 * 1000))
+    window.timer_ocioso.timeout.connect(lambda: executar_manutencao_automatica(window))
+    # Cada consulta ou gravação do app recomeça a contagem de ociosidade
+    window.executor_bd.ocupadoAlterado.connect(lambda _: window.timer_ocioso.start())
+    window.timer_ocioso.start()
+
+def manutencao_pendente(config):
+    if not float(config["intervalo_horas"]):  # 0 desliga
+        return False
+    if not config["ultima_execucao"]:
+        return True
+    decorrido = datetime.now() - datetime.fromisoformat(config["ultima_execucao"])
+    return decorrido >= timedelta(hours=float(config["intervalo_horas"]))
+
+def executar_manutencao_automatica(window):
+    """quick_check, vacuum incremental e estatísticas pela fila do banco; o resultado vai ao status_label.
+
+    Roda no ExecutorBanco: as gravações do app esperam na fila em vez de esbarrar no
+    lock. Qualquer pedido novo na fila (o usuário voltou) interrompe a manutenção,
+    que fica para a próxima pausa.
+    """
+    config = carregar_config_manutencao()
+    if window.manutencao_cancelada is not None or not manutencao_pendente(config):
+        return
+    if window.tarefa_atual is not None:  # exportação/importação em andamento: fica para a próxima pausa
+        window.timer_ocioso.start()
+        return
+
+    cancelada = window.manutencao_cancelada = threading.Event()
+    executor = window.executor_bd
+
+    def manter():
+        try:
+            return fazer_manutencao(rapida=True, cancelado=lambda: cancelada.is_set() or executor.pendentes > 1)
+        except ManutencaoCancelada:
+            return None
+
+    def ao_concluir(resultado):
+        window.manutencao_cancelada = None
+        if resultado is None:
+            return
+        salvar_ultima_manutencao(datetime.now().isoformat(timespec="seconds"))
+        if resultado.integridade != ["ok"]:
+            QMessageBox.warning(window, "Manutenção do banco", resumo_manutencao(resultado)
+                + "\n\nFaça um backup e verifique o arquivo do banco de dados.")
+            return
+        window.status_label.setStyleSheet("")
+        window.status_label.setText(resumo_manutencao(resultado))
+        QTimer.singleShot(10000, lambda: verificar_overlaps(window))  # devolve o aviso de overlap, se houver
+
+    def ao_falhar(erro):
+        window.manutencao_cancelada = None
+        window.status_label.setText(f"❌ Manutenção do banco falhou: {erro}")
+        QTimer.singleShot(10000, lambda: window.status_label.setText(""))
+
+    executor.executar(manter, ao_concluir=ao_concluir, ao_falhar=ao_falhar)
+
+def cancelar_manutencao(window):
+    """Interrompe a manutenção automática em andamento (antes de esvaziar a fila no fechamento)."""
+    if getattr(window, "manutencao_cancelada", None) is not None:
+        window.manutencao_cancelada.set()
+
+def manutencao_ao_fechar(window):
+    """Manutenção no encerramento, se pendente (a janela já foi escondida); aqui pode haver um VACUUM completo."""
+    config = carregar_config_manutencao()
+    if config["ao_fechar"] and manutencao_pendente(config):
+        try:
+            fazer_manutencao(converter=True)
+            salvar_ultima_manutencao(datetime.now().isoformat(timespec="seconds"))
+        except Exception as e:
+            QMessageBox.critical(None, "Erro", f"❌ Erro na manutenção do banco:\n{str(e)}")
+
+def backup_ao_fechar(window):
+    """Backup automático no encerramento, se habilitado (a janela já foi escondida)."""
+    if window.tarefa_backup is not None:
+        window.tarefa_backup.wait()
+    config = carregar_config_backup()
+    if config["ao_fechar"] and config["pasta"]:
+        try:
+            fazer_backup_automatico(config["pasta"], int(config["manter"]))
+        except Exception as e:
+            QMessageBox.critical(None, "Erro", f"❌ Erro no backup automático:\n{str(e)}")
         
 
 def resource_path(relative_path):
@@ -0,0 +1,227 @@
+"""Importação em lote de registros a partir de CSV, XLSX ou JSON (sem dependência de Qt)."""
+import csv
+import json
+import os
+import unicodedata
+from collections import namedtuple
+from datetime import date, datetime, time
+from itertools import groupby
+
+from utils.db import inserir_registros_em_lote, listar_intervalos_dias_com_novos
+from utils.instrumentacao import medido
+from utils.overlaps import detectar_overlaps
+
+ResultadoImportacao = namedtuple("ResultadoImportacao", ["lidos", "inseridos", "duplicados", "invalidos", "overlaps"])
+
+# Cabeçalhos aceitos (sem acento, minúsculos) → campo interno; inclui os das exportações
+ALIASES_COLUNAS = {
+    "dia": "dia", "data": "dia", "date": "dia",
+    "hora inicial": "hora_inicio", "hora_inicio": "hora_inicio", "inicio": "hora_inicio", "start": "hora_inicio",
+    "hora final": "hora_fim", "hora_fim": "hora_fim", "fim": "hora_fim", "end": "hora_fim",
+    "atividade": "atividade", "descricao": "atividade", "activity": "atividade", "description": "atividade",
+    "lancado": "lancado", "launched": "lancado",
+}
+FORMATOS_DATA = ("%d/%m/%y", "%d/%m/%Y", "%Y-%m-%d", "%Y-%m-%dT%H:%M:%S")
+VERDADEIROS = {"1", "sim", "s", "true", "yes", "y", "x"}
+TAMANHO_LOTE = 1000
+TAMANHO_BLOCO_JSON = 1 << 16  # caracteres lidos por vez de um array JSON
+
+
+class ImportacaoCancelada(Exception):
+    pass
+
+
+def _normalizar_chave(chave):
+    chave = unicodedata.normalize("NFKD", str(chave or "")).encode("ascii", "ignore").decode()
+    return chave.strip().lower()
+
+
+def _mapear(linha):
+    return {ALIASES_COLUNAS[c]: v for c, v in ((_normalizar_chave(k), v) for k, v in linha.items()) if c in ALIASES_COLUNAS}
+
+
+# 🔹 Leitores (geradores de dicts, um por linha)
+
+def ler_csv(caminho):
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        amostra = f.read(4096)
+        f.seek(0)
+        try:
+            dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+        except csv.Error:
+            dialeto = csv.excel
+        yield from csv.DictReader(f, dialect=dialeto)
+
+
+def ler_xlsx(caminho):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        for aba in wb.worksheets:
+            linhas = aba.iter_rows(values_only=True)
+            cabecalho = next(linhas, None)
+            if not cabecalho:
+                continue
+            for valores in linhas:
+                if any(v is not None for v in valores):
+                    yield dict(zip(cabecalho, valores))
+    finally:
+        wb.close()
+
+
+def _elementos_array_json(f, tamanho_bloco=TAMANHO_BLOCO_JSON):
+    """Elementos de um array JSON, decodificados um a um: o arquivo nunca fica inteiro na memória."""
+    decodificador = json.JSONDecoder()
+    buffer = f.read(tamanho_bloco)
+    pos, esgotado = buffer.index("[") + 1, False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        fim = None
+        if pos < len(buffer):
+            try:
+                valor, fim = decodificador.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if esgotado:
+                    raise
+        elif esgotado:
+            raise ValueError("array JSON sem ']' no fim do arquivo")
+        # Elemento cortado no fim do bloco (ou que pode continuar): lê mais e tenta de novo
+        if fim is None or (fim == len(buffer) and not esgotado):
+            mais = f.read(tamanho_bloco)
+            esgotado = not mais
+            buffer, pos = buffer[pos:] + mais, 0
+            continue
+        yield valor
+        pos = fim
+
+
+def ler_json(caminho):
+    """Aceita um array JSON de objetos ou JSON Lines (um objeto por linha); os dois são lidos em streaming."""
+    with open(caminho, encoding="utf-8-sig") as f:
+        inicio = f.read(1)
+        while inicio and inicio.isspace():
+            inicio = f.read(1)
+        f.seek(0)
+        if inicio == "[":
+            yield from _elementos_array_json(f)
+            return
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+LEITORES = {".csv": ler_csv, ".xlsx": ler_xlsx, ".json": ler_json, ".jsonl": ler_json}
+
+
+# 🔹 Validação / normalização
+
+def _normalizar_dia(valor):
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        return valor.strftime("%d/%m/%y")
+    texto = str(valor or "").strip()
+    for formato in FORMATOS_DATA:
+        try:
+            return datetime.strptime(texto, formato).strftime("%d/%m/%y")
+        except ValueError:
+            continue
+    raise ValueError(f"data inválida: {texto!r}")
+
+
+def _normalizar_horario(valor):
+    if isinstance(valor, datetime):
+        valor = valor.time()
+    if isinstance(valor, time):
+        return valor.strftime("%H:%M")
+    texto = str(valor or "").strip()
+    partes = texto.split(":")
+    if len(partes) in (2, 3) and all(p.isdigit() for p in partes):
+        h, m = int(partes[0]), int(partes[1])
+        if 0 <= h <= 23 and 0 <= m <= 59:
+            return f"{h:02}:{m:02}"
+    raise ValueError(f"horário inválido: {texto!r}")
+
+
+def _normalizar_lancado(valor):
+    if isinstance(valor, bool):
+        return int(valor)
+    return 1 if _normalizar_chave(valor) in VERDADEIROS else 0
+
+
+def normalizar_linha(linha):
+    """dict lido do arquivo → (dia, hora_inicio, hora_fim, atividade, lancado); ValueError se inválida."""
+    campos = _mapear(linha)
+    atividade = str(campos.get("atividade") or "").strip()
+    if not atividade:
+        raise ValueError("atividade vazia")
+    dia = _normalizar_dia(campos.get("dia"))
+    hora_inicio = _normalizar_horario(campos.get("hora_inicio"))
+    hora_fim = _normalizar_horario(campos.get("hora_fim"))
+    if hora_fim < hora_inicio:
+        raise ValueError(f"hora final {hora_fim} antes da inicial {hora_inicio}")
+    return dia, hora_inicio, hora_fim, atividade, _normalizar_lancado(campos.get("lancado"))
+
+
+# 🔹 Importação
+
+@medido()
+def importar_arquivo(caminho, progresso=None, cancelado=None):
+    """Importa CSV/XLSX/JSON numa única transação e devolve um ResultadoImportacao.
+
+    Linhas inválidas são puladas e listadas em `invalidos` como (nº da linha, motivo);
+    `overlaps` traz os GrupoOverlap que passaram a existir com os registros importados.
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao not in LEITORES:
+        raise ValueError(f"Formato não suportado: {extensao or caminho} (use CSV, XLSX ou JSON)")
+
+    invalidos = []
+    lidos = 0
+
+    def registros_validos():
+        nonlocal lidos
+        for numero, linha in enumerate(LEITORES[extensao](caminho), start=2 if extensao in (".csv", ".xlsx") else 1):
+            lidos += 1
+            try:
+                yield normalizar_linha(linha)
+            except (ValueError, AttributeError) as e:
+                invalidos.append((numero, str(e)))
+
+    def ao_gravar_lote(inseridos):
+        if cancelado and cancelado():
+            raise ImportacaoCancelada()
+        if progresso:
+            progresso(lidos, 0)
+
+    maior_id, inseridos = inserir_registros_em_lote(registros_validos(), TAMANHO_LOTE, ao_gravar_lote)
+
+    overlaps = []
+    if inseridos:
+        for dia, do_dia in groupby(listar_intervalos_dias_com_novos(maior_id), key=lambda r: r[1]):
+            grupos = detectar_overlaps(((r[2], r[3], r[0]) for r in do_dia), dia)
+            overlaps.extend(g for g in grupos if any(i > maior_id for i in g.chaves))
+
+    duplicados = lidos - len(invalidos) - inseridos
+    return ResultadoImportacao(lidos, inseridos, duplicados, invalidos, overlaps)
+
+
+def resumo_importacao(resultado, max_detalhes=20):
+    """Texto para o usuário (mensagem da janela ou saída da linha de comando)."""
+    linhas = [
+        f"Linhas lidas: {resultado.lidos}",
+        f"Registros importados: {resultado.inseridos}",
+        f"Duplicados ignorados: {resultado.duplicados}",
+        f"Linhas inválidas: {len(resultado.invalidos)}",
+        f"Overlaps criados: {len(resultado.overlaps)}",
+    ]
+    for numero, motivo in resultado.invalidos[:max_detalhes]:
+        linhas.append(f"  linha {numero}: {motivo}")
+    for grupo in resultado.overlaps[:max_detalhes]:
+        linhas.append(f"  overlap em {grupo.dia}: {grupo.inicio // 60:02}:{grupo.inicio % 60:02}"
+                      f"–{grupo.fim // 60:02}:{grupo.fim % 60:02} ({len(grupo.chaves)} lançamentos)")
+    return "\n".join(linhas)
@@ -0,0 +1,197 @@
+"""Medição opcional de funções e de SQL, gravada em JSON Lines (sem dependência de Qt).
+
+Ligada por config.json → "instrumentacao": {"ativo": true} ou pela variável
+TIMESHEET_PROFILE ("1" liga; outro valor não vazio liga e define o arquivo).
+Desligada, medido() devolve a própria função e conectar() não muda nada —
+o custo é só o da decisão na importação.
+
+A cada `intervalo_s` (e ao encerrar) grava uma linha por função/comando SQL com
+contagem, total e percentis da janela; chamadas acima de `lento_ms` são gravadas
+na hora. O arquivo é rotacionado (.1) ao passar de `tamanho_max_mb`.
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from utils.config import carregar_config_instrumentacao
+
+AMOSTRAS_POR_NOME = 1000  # percentis calculados sobre as últimas N amostras da janela
+
+
+def _configuracao():
+    config = carregar_config_instrumentacao()
+    variavel = os.environ.get("TIMESHEET_PROFILE", "").strip()
+    if variavel and variavel != "0":
+        config["ativo"] = True
+        if variavel != "1":
+            config["arquivo"] = variavel
+    return config
+
+
+CONFIG = _configuracao()
+ATIVO = bool(CONFIG["ativo"])
+
+_lock = threading.Lock()
+_janela = {}  # (tipo, nome) → [contagem, total_ms, max_ms, deque de amostras]
+_ultima_gravacao = time.monotonic()
+
+
+def _percentil(ordenadas, fracao):
+    return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * fracao))]
+
+
+def _gravar_linhas(linhas):
+    arquivo = CONFIG["arquivo"]
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(arquivo)), exist_ok=True)
+        if os.path.exists(arquivo) and os.path.getsize(arquivo) > float(CONFIG["tamanho_max_mb"]) * 1024 * 1024:
+            os.replace(arquivo, arquivo + ".1")
+        with open(arquivo, "a", encoding="utf-8") as f:
+            for linha in linhas:
+                f.write(json.dumps(linha, ensure_ascii=False) + "\n")
+    except OSError:
+        pass  # medição nunca deve derrubar o app
+
+
+def gravar_estatisticas():
+    """Grava (e zera) as estatísticas da janela atual."""
+    global _janela, _ultima_gravacao
+    with _lock:
+        janela, _janela = _janela, {}
+        _ultima_gravacao = time.monotonic()
+    if not janela:
+        return
+    momento = datetime.now().isoformat(timespec="seconds")
+    linhas = []
+    for (tipo, nome), (contagem, total, maximo, amostras) in sorted(janela.items(), key=lambda i: -i[1][1]):
+        if tipo == "sql_rastro":  # o rastro do SQLite só dá o texto: vale a contagem
+            linhas.append({"ts": momento, "tipo": tipo, "nome": nome, "contagem": contagem})
+            continue
+        ordenadas = sorted(amostras)
+        linhas.append({
+            "ts": momento, "tipo": tipo, "nome": nome, "contagem": contagem,
+            "total_ms": round(total, 3), "p50_ms": round(_percentil(ordenadas, 0.50), 3),
+            "p90_ms": round(_percentil(ordenadas, 0.90), 3), "p99_ms": round(_percentil(ordenadas, 0.99), 3),
+            "max_ms": round(maximo, 3),
+        })
+    _gravar_linhas(linhas)
+
+
+def registrar(tipo, nome, duracao_ms):
+    """Soma uma amostra à janela; grava na hora se for lenta e a janela se o intervalo venceu."""
+    with _lock:
+        item = _janela.get((tipo, nome))
+        if item is None:
+            item = _janela[(tipo, nome)] = [0, 0.0, 0.0, deque(maxlen=AMOSTRAS_POR_NOME)]
+        item[0] += 1
+        item[1] += duracao_ms
+        item[2] = max(item[2], duracao_ms)
+        item[3].append(duracao_ms)
+        vencido = time.monotonic() - _ultima_gravacao >= float(CONFIG["intervalo_s"])
+
+    if duracao_ms >= float(CONFIG["lento_ms"]):
+        _gravar_linhas([{"ts": datetime.now().isoformat(timespec="seconds"), "tipo": "lento", "origem": tipo,
+                         "nome": nome, "duracao_ms": round(duracao_ms, 3),
+                         "thread": threading.current_thread().name}])
+    if vencido:
+        gravar_estatisticas()
+
+
+# 🔹 Funções
+
+def medido(nome=None):
+    """Decorador que mede cada chamada (geradores: do início ao fim da iteração)."""
+    def decorar(funcao):
+        if not ATIVO:
+            return funcao
+        rotulo = nome or f"{funcao.__module__}.{funcao.__qualname__}"
+
+        if inspect.isgeneratorfunction(funcao):
+            @functools.wraps(funcao)
+            def gerador_medido(*args, **kwargs):
+                inicio = time.perf_counter()
+                try:
+                    yield from funcao(*args, **kwargs)
+                finally:
+                    registrar("funcao", rotulo, (time.perf_counter() - inicio) * 1000)
+            return gerador_medido
+
+        @functools.wraps(funcao)
+        def funcao_medida(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                registrar("funcao", rotulo, (time.perf_counter() - inicio) * 1000)
+        return funcao_medida
+    return decorar
+
+
+def instrumentar_funcoes_publicas(namespace):
+    """Aplica medido() a todas as funções públicas definidas no módulo (chamar no fim dele)."""
+    if not ATIVO:
+        return
+    modulo = namespace["__name__"]
+    for nome, valor in list(namespace.items()):
+        if not nome.startswith("_") and inspect.isfunction(valor) and valor.__module__ == modulo:
+            namespace[nome] = medido(f"{modulo.rsplit('.', 1)[-1]}.{nome}")(valor)
+
+
+# 🔹 SQL
+
+_ESPACOS = re.compile(r"\s+")
+
+
+def _normalizar_sql(sql):
+    return _ESPACOS.sub(" ", sql).strip()[:300]
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão que mede execute/executemany/executescript por texto do comando.
+
+    O tempo cobre preparação e primeiro passo do comando; a leitura das linhas
+    (fetchall) entra no tempo da função do utils/db.py que a fez.
+    """
+
+    def _medir(self, metodo, sql, *args):
+        inicio = time.perf_counter()
+        try:
+            return metodo(sql, *args)
+        finally:
+            registrar("sql", _normalizar_sql(sql), (time.perf_counter() - inicio) * 1000)
+
+    def execute(self, sql, *args):
+        return self._medir(super().execute, sql, *args)
+
+    def executemany(self, sql, *args):
+        return self._medir(super().executemany, sql, *args)
+
+    def executescript(self, sql):
+        return self._medir(super().executescript, sql)
+
+
+def _rastrear(comando):
+    # Conta tudo o que o SQLite executa, inclusive COMMIT implícito e triggers ("-- TRIGGER ...")
+    registrar("sql_rastro", _normalizar_sql(comando), 0.0)
+
+
+def parametros_conexao():
+    """kwargs extras para sqlite3.connect (vazio quando desligado)."""
+    return {"factory": ConexaoInstrumentada} if ATIVO else {}
+
+
+def configurar_conexao(conn):
+    if ATIVO:
+        conn.set_trace_callback(_rastrear)
+
+
+if ATIVO:
+    atexit.register(gravar_estatisticas)
@@ -0,0 +1,119 @@
+"""Manutenção do banco: integridade, vacuum incremental e estatísticas (sem dependência de Qt).
+
+Roda numa conexão própria, em passos curtos (cada incremental_vacuum é uma
+transação), para que gravações do app possam entrar entre um passo e outro;
+cancelado() é consultado entre os passos e, por um progress handler, também
+durante um comando longo (integrity_check, ANALYZE), que é interrompido.
+O VACUUM completo só acontece uma vez, para ligar auto_vacuum = INCREMENTAL em
+bancos antigos, e apenas quando pedido (converter=True: no fechamento ou na CLI).
+"""
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+from utils.db import conectar
+from utils.instrumentacao import medido
+
+PAGINAS_POR_PASSO = 1000
+AUTO_VACUUM_INCREMENTAL = 2
+LIMITE_ANALISE = 400  # linhas amostradas por índice no ANALYZE (e no de PRAGMA optimize)
+INSTRUCOES_ENTRE_CONSULTAS = 100000  # instruções da VM do SQLite entre duas consultas a cancelado()
+
+# Tamanho do arquivo (com o WAL, se houver) e páginas em uso/livres num momento
+EstadoBanco = namedtuple("EstadoBanco", ["tamanho_bytes", "paginas", "paginas_livres"])
+ResultadoManutencao = namedtuple("ResultadoManutencao", ["antes", "depois", "integridade", "convertido", "duracao_s"])
+
+
+class ManutencaoCancelada(Exception):
+    pass
+
+
+def _caminho_do_arquivo(conn):
+    return next(linha[2] for linha in conn.execute("PRAGMA database_list") if linha[1] == "main")
+
+
+def _estado(conn, caminho):
+    tamanho = sum(os.path.getsize(caminho + sufixo) for sufixo in ("", "-wal") if os.path.exists(caminho + sufixo))
+    return EstadoBanco(tamanho, conn.execute("PRAGMA page_count").fetchone()[0],
+                       conn.execute("PRAGMA freelist_count").fetchone()[0])
+
+
+def _verificar_cancelamento(cancelado):
+    if cancelado and cancelado():
+        raise ManutencaoCancelada()
+
+
+@medido()
+def fazer_manutencao(caminho=None, converter=False, rapida=False, paginas_por_passo=PAGINAS_POR_PASSO,
+                     progresso=None, cancelado=None):
+    """integrity_check → vacuum incremental → estatísticas → checkpoint. Retorna ResultadoManutencao.
+
+    rapida=True usa quick_check (sem conferir os índices contra a tabela), bem mais
+    curto — é o da manutenção automática. Com integridade diferente de "ok" nada é
+    alterado: o resultado só relata o problema.
+    """
+    inicio = time.perf_counter()
+    conn = conectar(caminho)
+    if cancelado:
+        conn.set_progress_handler(lambda: 1 if cancelado() else 0, INSTRUCOES_ENTRE_CONSULTAS)
+    try:
+        caminho = _caminho_do_arquivo(conn)
+        antes = _estado(conn, caminho)
+        verificacao = "quick_check" if rapida else "integrity_check"
+        integridade = [linha[0] for linha in conn.execute(f"PRAGMA {verificacao}")]
+        if integridade != ["ok"]:
+            return ResultadoManutencao(antes, antes, integridade, False, time.perf_counter() - inicio)
+        _verificar_cancelamento(cancelado)
+
+        # 🔹 Bancos criados sem auto_vacuum incremental: um VACUUM completo liga o modo
+        convertido = False
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL and converter:
+            conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+            conn.execute("VACUUM")
+            convertido = True
+
+        # 🔹 Devolve as páginas livres ao sistema em passos curtos
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            livres = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while True:
+                restantes = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if not restantes:
+                    break
+                if progresso:
+                    progresso(livres - restantes, livres)
+                _verificar_cancelamento(cancelado)
+                conn.execute(f"PRAGMA incremental_vacuum({int(paginas_por_passo)})").fetchall()
+
+        # 🔹 Estatísticas do planejador, por amostragem: ANALYZE na primeira vez, depois só o necessário
+        _verificar_cancelamento(cancelado)
+        conn.execute(f"PRAGMA analysis_limit = {LIMITE_ANALISE}")
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone() is None:
+            conn.execute("ANALYZE")
+        else:
+            conn.execute("PRAGMA optimize")
+
+        # Com WAL: arquivo -wal de volta ao tamanho zero (falha em silêncio se houver leitores ativos)
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+        return ResultadoManutencao(antes, _estado(conn, caminho), integridade, convertido, time.perf_counter() - inicio)
+    except sqlite3.OperationalError:
+        # "interrupted": o progress handler parou um comando longo a pedido de cancelado()
+        _verificar_cancelamento(cancelado)
+        raise
+    finally:
+        conn.close()
+
+
+def _megabytes(tamanho):
+    return f"{tamanho / (1024 * 1024):.1f} MB"
+
+
+def resumo_manutencao(resultado):
+    """Texto de uma linha com tamanho e páginas livres antes → depois."""
+    if resultado.integridade != ["ok"]:
+        return "❌ Falha na verificação de integridade: " + "; ".join(resultado.integridade[:3])
+    antes, depois = resultado.antes, resultado.depois
+    return (f"🧹 Banco: {_megabytes(antes.tamanho_bytes)} → {_megabytes(depois.tamanho_bytes)}, "
+            f"páginas livres {antes.paginas_livres} → {depois.paginas_livres}, integridade ok"
+            + (", convertido para vacuum incremental" if resultado.convertido else "")
+            + f" ({resultado.duracao_s:.1f} s)")
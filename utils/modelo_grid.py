@@ -0,0 +1,413 @@
+from bisect import bisect_right
+from collections import OrderedDict
+
+from PyQt6.QtCore import QAbstractTableModel, QEvent, QModelIndex, QRect, Qt, pyqtSignal
+from PyQt6.QtGui import QBrush, QColor, QPen
+from PyQt6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from utils.db import listar_pagina_intervalo, listar_totais_intervalo
+from utils.tempo import calcular_duracao, duracao_em_minutos
+
+# Colunas da grid
+COL_HORA_INICIO, COL_HORA_FIM, COL_DURACAO, COL_ATIVIDADE, COL_ACOES, COL_LANCADO = range(6)
+CABECALHOS = ["Hora Inicial", "Hora Final", "Duração", "Atividade", "Ações", "Lançado"]
+COLUNAS_EDITAVEIS = (COL_HORA_INICIO, COL_HORA_FIM, COL_ATIVIDADE)
+
+# Posições dentro de cada registro (mesma ordem do SELECT em utils/db.py)
+ID, DIA, HORA_INICIO, HORA_FIM, ATIVIDADE, LANCADO = range(6)
+_CAMPO_DA_COLUNA = {COL_HORA_INICIO: HORA_INICIO, COL_HORA_FIM: HORA_FIM, COL_ATIVIDADE: ATIVIDADE}
+# Nome da coluna no banco para cada coluna editável da grid
+CAMPO_BD_DA_COLUNA = {COL_HORA_INICIO: "hora_inicio", COL_HORA_FIM: "hora_fim",
+                      COL_ATIVIDADE: "atividade", COL_LANCADO: "lancado"}
+
+COR_TEXTO = QColor("white")
+COR_OVERLAP = QColor("red")
+
+
+class RegistrosTableModel(QAbstractTableModel):
+    """Registros do dia para a QTableView; recarregar é um único reset, sem widgets por linha."""
+
+    # (id, campo no banco, novo valor) editado pelo usuário — não é emitido ao carregar dados
+    registroEditado = pyqtSignal(int, str, object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.registros = []
+        self.linhas_overlap = set()
+        self.total_minutos = 0
+        self._ordem = None  # (coluna, Qt.SortOrder) da última ordenação
+
+    # 🔹 Carga
+    def carregar(self, registros):
+        self.beginResetModel()
+        self.registros = [list(r) for r in registros]
+        self.linhas_overlap = set()
+        self.total_minutos = sum(duracao_em_minutos(r[HORA_INICIO], r[HORA_FIM]) for r in self.registros)
+        if self._ordem:
+            self._ordenar(*self._ordem)
+        self.endResetModel()
+
+    def marcar_overlaps(self, linhas):
+        """Define as linhas em conflito de horário (pintadas de vermelho)."""
+        linhas = set(linhas)
+        if linhas == self.linhas_overlap:
+            return
+        self.linhas_overlap = linhas
+        if self.registros:
+            self.dataChanged.emit(self.index(0, COL_HORA_INICIO),
+                                  self.index(len(self.registros) - 1, COL_HORA_FIM),
+                                  [Qt.ItemDataRole.ForegroundRole])
+
+    # 🔹 API do QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.registros)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(CABECALHOS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return CABECALHOS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        registro = self.registros[index.row()]
+        col = index.column()
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            if col in _CAMPO_DA_COLUNA:
+                return registro[_CAMPO_DA_COLUNA[col]]
+            if col == COL_DURACAO:
+                return calcular_duracao(registro[HORA_INICIO], registro[HORA_FIM])
+            return None
+        if role == Qt.ItemDataRole.CheckStateRole and col == COL_LANCADO:
+            return Qt.CheckState.Checked if registro[LANCADO] else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.ForegroundRole and col in (COL_HORA_INICIO, COL_HORA_FIM):
+            return QBrush(COR_OVERLAP if index.row() in self.linhas_overlap else COR_TEXTO)
+        if role == Qt.ItemDataRole.UserRole:
+            return registro[ID]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() in COLUNAS_EDITAVEIS:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid():
+            return False
+        row, col = index.row(), index.column()
+        registro = self.registros[row]
+
+        if role == Qt.ItemDataRole.EditRole and col in _CAMPO_DA_COLUNA:
+            novo_valor = str(value).strip()
+            if novo_valor == registro[_CAMPO_DA_COLUNA[col]]:
+                return False
+            # Total incremental: troca só a duração da linha alterada
+            antes = duracao_em_minutos(registro[HORA_INICIO], registro[HORA_FIM])
+            registro[_CAMPO_DA_COLUNA[col]] = novo_valor
+            self.total_minutos += duracao_em_minutos(registro[HORA_INICIO], registro[HORA_FIM]) - antes
+            # Alterar um horário também muda a Duração
+            fim = col if col == COL_ATIVIDADE else COL_DURACAO
+            self.dataChanged.emit(index, self.index(row, fim))
+            novo_valor_bd = novo_valor
+        elif role == Qt.ItemDataRole.CheckStateRole and col == COL_LANCADO:
+            registro[LANCADO] = novo_valor_bd = 1 if value == Qt.CheckState.Checked else 0
+            self.dataChanged.emit(index, index)
+        else:
+            return False
+
+        self.registroEditado.emit(registro[ID], CAMPO_BD_DA_COLUNA[col], novo_valor_bd)
+        return True
+
+    # 🔹 Ordenação (as linhas carregam o próprio ID, então ordenar é seguro)
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column == COL_ACOES:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._ordem = (column, order)
+        self._ordenar(column, order)
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def _chave(column):
+        if column == COL_DURACAO:
+            return lambda r: duracao_em_minutos(r[HORA_INICIO], r[HORA_FIM])
+        if column == COL_LANCADO:
+            return lambda r: r[LANCADO] or 0
+        campo = _CAMPO_DA_COLUNA[column]
+        return lambda r: (r[campo] or "").lower()
+
+    def _ordenar(self, column, order):
+        ids_overlap = {self.registros[i][ID] for i in self.linhas_overlap}
+        self.registros.sort(key=self._chave(column), reverse=order == Qt.SortOrder.DescendingOrder)
+        self.linhas_overlap = {i for i, r in enumerate(self.registros) if r[ID] in ids_overlap}
+
+    # 🔹 Mudanças vindas do banco, aplicadas linha a linha (sem reset do model)
+    def _linha_do_id(self, id_registro):
+        for row, registro in enumerate(self.registros):
+            if registro[ID] == id_registro:
+                return row
+        return None
+
+    def _posicao_ordenada(self, registro):
+        if not self._ordem:
+            return len(self.registros)
+        chave = self._chave(self._ordem[0])
+        valor = chave(registro)
+        decrescente = self._ordem[1] == Qt.SortOrder.DescendingOrder
+        for row, existente in enumerate(self.registros):
+            if (chave(existente) < valor) if decrescente else (chave(existente) > valor):
+                return row
+        return len(self.registros)
+
+    def inserir(self, registro):
+        """Insere a linha na posição da ordenação atual."""
+        row = self._posicao_ordenada(registro)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.registros.insert(row, list(registro))
+        self.linhas_overlap = {i + 1 if i >= row else i for i in self.linhas_overlap}
+        self.total_minutos += duracao_em_minutos(registro[HORA_INICIO], registro[HORA_FIM])
+        self.endInsertRows()
+
+    def remover(self, id_registro):
+        """Remove a linha do registro; False se ele não está na grid."""
+        row = self._linha_do_id(id_registro)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        registro = self.registros.pop(row)
+        self.linhas_overlap = {i - 1 if i > row else i for i in self.linhas_overlap if i != row}
+        self.total_minutos -= duracao_em_minutos(registro[HORA_INICIO], registro[HORA_FIM])
+        self.endRemoveRows()
+        return True
+
+    def atualizar(self, registro):
+        """Troca os valores da linha pelos do banco; False se nada mudou (ex.: edição feita na própria grid)."""
+        row = self._linha_do_id(registro[ID])
+        if row is None:
+            return False
+        atual = self.registros[row]
+        if atual == list(registro):
+            return False
+        self.total_minutos += (duracao_em_minutos(registro[HORA_INICIO], registro[HORA_FIM])
+                               - duracao_em_minutos(atual[HORA_INICIO], atual[HORA_FIM]))
+        self.registros[row] = list(registro)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(CABECALHOS) - 1))
+        return True
+
+
+# Visão de período (somente leitura): colunas e posição do dia_iso nas linhas de listar_pagina_intervalo
+CABECALHOS_INTERVALO = ["Dia", "Hora Inicial", "Hora Final", "Duração", "Atividade", "Lançado"]
+_CAMPO_DA_COLUNA_INTERVALO = {0: DIA, 1: HORA_INICIO, 2: HORA_FIM, 4: ATIVIDADE}
+COL_INTERVALO_DURACAO, COL_INTERVALO_LANCADO = 3, 5
+DIA_ISO = 6
+TAMANHO_BLOCO = 200
+MAX_BLOCOS = 25  # ~5.000 linhas em memória, qualquer que seja o período
+
+
+class RegistrosIntervaloModel(QAbstractTableModel):
+    """Registros de um período para a QTableView, lidos sob demanda em blocos.
+
+    rowCount vem de daily_totals (sem ler registros). Cada bloco de TAMANHO_BLOCO linhas
+    é buscado por chave a partir do fim do bloco anterior, ou — num salto da barra de
+    rolagem — a partir do início do dia que contém a linha (soma acumulada por dia).
+    Só os MAX_BLOCOS usados mais recentemente ficam em memória.
+
+    Com um ExecutorBanco, as leituras saem da thread da interface: linhas de um bloco
+    ainda não lido aparecem vazias e são preenchidas (dataChanged) quando ele chega.
+    """
+
+    carregado = pyqtSignal()
+
+    def __init__(self, parent=None, executor=None):
+        super().__init__(parent)
+        self.total_minutos = 0
+        self._executor = executor
+        self._geracao = 0  # descarta respostas de um período anterior
+        self._pedidos = set()
+        self._data_ate = None
+        self._dias_iso = []
+        self._primeira_linha_do_dia = []
+        self._total_linhas = 0
+        self._blocos = OrderedDict()
+
+    def carregar(self, data_de, data_ate):
+        self._geracao += 1
+        if self._executor is None:
+            self._aplicar_totais(self._geracao, data_ate, listar_totais_intervalo(data_de, data_ate))
+            return
+        geracao = self._geracao
+        self._executor.executar(listar_totais_intervalo, data_de, data_ate,
+                                ao_concluir=lambda totais: self._aplicar_totais(geracao, data_ate, totais))
+
+    def _aplicar_totais(self, geracao, data_ate, totais):
+        if geracao != self._geracao:
+            return
+        self.beginResetModel()
+        self._data_ate = data_ate
+        self._dias_iso = [t[0] for t in totais]
+        self._primeira_linha_do_dia = []
+        acumulado = 0
+        for _, _, qtd, _, _ in totais:
+            self._primeira_linha_do_dia.append(acumulado)
+            acumulado += qtd
+        self._total_linhas = acumulado
+        self.total_minutos = sum(t[1] for t in totais)
+        self._blocos.clear()
+        self._pedidos.clear()
+        self.endResetModel()
+        self.carregado.emit()
+
+    def registro(self, row):
+        bloco = row // TAMANHO_BLOCO
+        linhas = self._blocos.get(bloco)
+        if linhas is None:
+            if self._executor is not None:
+                self._pedir_bloco(bloco)
+                return None
+            apos, limite, pular = self._consulta_do_bloco(bloco)
+            linhas = self._guardar_bloco(bloco, listar_pagina_intervalo(self._data_ate, apos, limite)[pular:])
+        else:
+            self._blocos.move_to_end(bloco)
+        posicao = row % TAMANHO_BLOCO
+        return linhas[posicao] if posicao < len(linhas) else None
+
+    def _guardar_bloco(self, bloco, linhas):
+        self._blocos[bloco] = linhas
+        while len(self._blocos) > MAX_BLOCOS:
+            self._blocos.popitem(last=False)
+        return linhas
+
+    def _pedir_bloco(self, bloco):
+        if bloco in self._pedidos:
+            return
+        self._pedidos.add(bloco)
+        geracao = self._geracao
+        apos, limite, pular = self._consulta_do_bloco(bloco)
+        self._executor.executar(listar_pagina_intervalo, self._data_ate, apos, limite,
+                                ao_concluir=lambda linhas: self._bloco_lido(geracao, bloco, linhas[pular:]),
+                                ao_falhar=lambda erro: self._bloco_falhou(geracao, bloco, erro))
+
+    def _bloco_lido(self, geracao, bloco, linhas):
+        if geracao != self._geracao:
+            return
+        self._pedidos.discard(bloco)
+        self._guardar_bloco(bloco, linhas)
+        primeira = bloco * TAMANHO_BLOCO
+        ultima = min(primeira + TAMANHO_BLOCO, self._total_linhas) - 1
+        if ultima >= primeira:
+            self.dataChanged.emit(self.index(primeira, 0), self.index(ultima, len(CABECALHOS_INTERVALO) - 1))
+
+    def _bloco_falhou(self, geracao, bloco, erro):
+        # Sai dos pedidos: a próxima pintura das linhas tenta de novo (ex.: banco ocupado)
+        if geracao == self._geracao:
+            self._pedidos.discard(bloco)
+        self._executor.erroNaoTratado.emit(erro)
+
+    def _consulta_do_bloco(self, bloco):
+        """(apos, limite, linhas a pular) para ler o bloco com listar_pagina_intervalo."""
+        anterior = self._blocos.get(bloco - 1)
+        if anterior and len(anterior) == TAMANHO_BLOCO:
+            ultimo = anterior[-1]
+            return (ultimo[DIA_ISO], ultimo[HORA_INICIO], ultimo[ID]), TAMANHO_BLOCO, 0
+        primeira = bloco * TAMANHO_BLOCO
+        i = max(bisect_right(self._primeira_linha_do_dia, primeira) - 1, 0)
+        pular = primeira - self._primeira_linha_do_dia[i]
+        return (self._dias_iso[i], "", 0), pular + TAMANHO_BLOCO, pular
+
+    # 🔹 API do QAbstractTableModel
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._total_linhas
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(CABECALHOS_INTERVALO)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return CABECALHOS_INTERVALO[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole):
+            return None
+        registro = self.registro(index.row())
+        if registro is None:
+            return None
+        if role == Qt.ItemDataRole.UserRole:
+            return (registro[ID], registro[DIA])
+        col = index.column()
+        if col == COL_INTERVALO_DURACAO:
+            return calcular_duracao(registro[HORA_INICIO], registro[HORA_FIM])
+        if col == COL_INTERVALO_LANCADO:
+            return "✔" if registro[LANCADO] else ""
+        return registro[_CAMPO_DA_COLUNA_INTERVALO[col]]
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+class BotaoExcluirDelegate(QStyledItemDelegate):
+    """Pinta o botão de excluir na coluna Ações, sem criar um QPushButton por linha."""
+
+    excluirClicado = pyqtSignal(int)
+
+    TEXTO = "🗑️ Excluir"
+
+    def paint(self, painter, option, index):
+        botao = QStyleOptionButton()
+        botao.rect = option.rect.adjusted(2, 2, -2, -2)
+        botao.text = self.TEXTO
+        botao.state = QStyle.StateFlag.State_Enabled | QStyle.StateFlag.State_Raised
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            botao.state |= QStyle.StateFlag.State_MouseOver
+        QApplication.style().drawControl(QStyle.ControlElement.CE_PushButton, botao, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and option.rect.contains(event.position().toPoint())):
+            self.excluirClicado.emit(index.data(Qt.ItemDataRole.UserRole))
+            return True
+        return False
+
+
+class LancadoDelegate(QStyledItemDelegate):
+    """Checkbox 'Lançado' pintado e alternado pelo próprio delegate."""
+
+    TAMANHO = 18
+    COR_BORDA = QColor("#aaa")
+    COR_FUNDO = QColor("#444")
+    COR_MARCADO = QColor("#00cc66")
+    COR_CELULA_MARCADA = QColor(0, 255, 0, 50)
+
+    def _retangulo(self, option):
+        x = option.rect.x() + (option.rect.width() - self.TAMANHO) // 2
+        y = option.rect.y() + (option.rect.height() - self.TAMANHO) // 2
+        return QRect(x, y, self.TAMANHO, self.TAMANHO)
+
+    def paint(self, painter, option, index):
+        marcado = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+        painter.save()
+        if marcado:
+            painter.fillRect(option.rect, self.COR_CELULA_MARCADA)
+        painter.setPen(QPen(self.COR_MARCADO if marcado else self.COR_BORDA, 1))
+        painter.setBrush(self.COR_MARCADO if marcado else self.COR_FUNDO)
+        painter.drawRect(self._retangulo(option))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self._retangulo(option).contains(event.position().toPoint())):
+            marcado = index.data(Qt.ItemDataRole.CheckStateRole) == Qt.CheckState.Checked
+            novo = Qt.CheckState.Unchecked if marcado else Qt.CheckState.Checked
+            return model.setData(index, novo, Qt.ItemDataRole.CheckStateRole)
+        return False
@@ -0,0 +1,44 @@
+"""Detecção de conflitos de horário (overlaps) por varredura ordenada, O(n log n)."""
+from collections import namedtuple
+from itertools import groupby
+
+from utils.db import listar_intervalos_minutos
+
+# Um conjunto de lançamentos do mesmo dia ligados por sobreposição de horário
+GrupoOverlap = namedtuple("GrupoOverlap", ["dia", "inicio", "fim", "chaves"])
+
+
+def detectar_overlaps(intervalos, dia=None):
+    """Recebe (inicio, fim, chave) em minutos e devolve os GrupoOverlap com 2+ lançamentos.
+
+    Os intervalos são ordenados uma vez pelo início; um lançamento entra no grupo atual
+    se começa antes do maior fim visto até ali. Intervalos que só se encostam
+    (fim == início do próximo) não contam como conflito, e intervalos vazios ou
+    invertidos (fim <= início) são ignorados.
+    """
+    validos = sorted((i for i in intervalos if i[0] is not None and i[1] is not None and i[1] > i[0]),
+                     key=lambda i: i[0])
+    grupos = []
+    atual = []
+    fim_atual = None
+
+    for inicio, fim, chave in validos:
+        if atual and inicio < fim_atual:
+            atual.append(chave)
+            fim_atual = max(fim_atual, fim)
+            continue
+        if len(atual) > 1:
+            grupos.append(GrupoOverlap(dia, inicio_atual, fim_atual, atual))
+        atual, inicio_atual, fim_atual = [chave], inicio, fim
+
+    if len(atual) > 1:
+        grupos.append(GrupoOverlap(dia, inicio_atual, fim_atual, atual))
+    return grupos
+
+
+def listar_overlaps_intervalo(data_de, data_ate):
+    """Todos os overlaps entre duas datas dd/mm/yy, direto das colunas de minutos do banco."""
+    grupos = []
+    for dia, do_dia in groupby(listar_intervalos_minutos(data_de, data_ate), key=lambda r: r[1]):
+        grupos.extend(detectar_overlaps(((r[2], r[3], r[0]) for r in do_dia), dia))
+    return grupos
@@ -0,0 +1,29 @@
+"""Tempo de abertura do app por etapa (python main.py --profile-startup).
+
+Importado antes de tudo em main.py; com a opção desligada, marcar() não faz nada.
+"""
+import sys
+import time
+
+ATIVO = "--profile-startup" in sys.argv
+
+_inicio = time.perf_counter()
+_ultimo = _inicio
+_etapas = []
+
+
+def marcar(etapa):
+    """Registra o tempo gasto desde a marca anterior."""
+    global _ultimo
+    if not ATIVO:
+        return
+    agora = time.perf_counter()
+    _etapas.append((etapa, agora - _ultimo))
+    _ultimo = agora
+
+
+def relatorio():
+    linhas = ["⏱️ Perfil de inicialização"]
+    linhas += [f"  {etapa:<32}{segundos * 1000:9.1f} ms" for etapa, segundos in _etapas]
+    linhas.append(f"  {'total':<32}{(_ultimo - _inicio) * 1000:9.1f} ms")
+    return "\n".join(linhas)
@@ -0,0 +1,106 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, Qt, QThread, pyqtSignal
+
+from utils.db import fechar_conexao_da_thread
+
+
+class TarefaEmSegundoPlano(QThread):
+    """Executa funcao(*args, progresso=..., cancelado=...) fora da thread da interface.
+
+    A função recebe progresso(feitos, total) para reportar andamento e cancelado()
+    para consultar se o usuário pediu cancelamento; os resultados voltam por sinais.
+    """
+
+    progresso = pyqtSignal(int, int)
+    concluida = pyqtSignal(object)
+    falhou = pyqtSignal(str)
+    cancelada = pyqtSignal()
+
+    def __init__(self, funcao, *args, parent=None):
+        super().__init__(parent)
+        self._funcao = funcao
+        self._args = args
+        self._cancelar = threading.Event()
+
+    def cancelar(self):
+        self._cancelar.set()
+
+    def run(self):
+        try:
+            resultado = self._funcao(*self._args, progresso=self.progresso.emit, cancelado=self._cancelar.is_set)
+        except Exception as e:
+            if self._cancelar.is_set():
+                self.cancelada.emit()
+            else:
+                self.falhou.emit(str(e))
+        else:
+            self.concluida.emit(resultado)
+        finally:
+            fechar_conexao_da_thread()
+
+
+class NotificadorMudancas(QObject):
+    """Entrega à thread da interface as mudanças publicadas por utils/db.py.
+
+    Gravações feitas na própria thread da interface chegam na hora; as de uma
+    thread de trabalho (ex.: importação) chegam enfileiradas pelo sinal.
+    """
+
+    mudancas = pyqtSignal(object)
+
+
+class ExecutorBanco(QObject):
+    """Fila única de trabalho do banco numa thread dedicada, fora da thread da interface.
+
+    executar(funcao, *args, ao_concluir=..., ao_falhar=...) devolve um Future; os
+    callbacks rodam depois, na thread da interface. Uma só thread mantém a ordem
+    das operações (uma leitura enfileirada depois de uma gravação já a enxerga) e
+    reaproveita a mesma conexão do pool.
+    """
+
+    ocupadoAlterado = pyqtSignal(bool)
+    erroNaoTratado = pyqtSignal(str)
+    _terminou = pyqtSignal(object, object, object)  # future, ao_concluir, ao_falhar
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="banco")
+        self._pendentes = 0
+        # Sempre enfileirado: o callback nunca roda dentro da própria chamada a executar()
+        self._terminou.connect(self._entregar, Qt.ConnectionType.QueuedConnection)
+
+    @property
+    def pendentes(self):
+        """Tarefas na fila ou em execução (pode ser lido da thread do banco, ex.: pela manutenção)."""
+        return self._pendentes
+
+    def executar(self, funcao, *args, ao_concluir=None, ao_falhar=None, **kwargs):
+        future = self._pool.submit(funcao, *args, **kwargs)
+        self._pendentes += 1
+        if self._pendentes == 1:
+            self.ocupadoAlterado.emit(True)
+        future.add_done_callback(lambda f: self._terminou.emit(f, ao_concluir, ao_falhar))
+        return future
+
+    def _entregar(self, future, ao_concluir, ao_falhar):
+        self._pendentes -= 1
+        if self._pendentes == 0:
+            self.ocupadoAlterado.emit(False)
+        if future.cancelled():
+            return
+        erro = future.exception()
+        if erro is not None:
+            if ao_falhar:
+                ao_falhar(str(erro))
+            else:
+                self.erroNaoTratado.emit(str(erro))
+            return
+        if ao_concluir:
+            ao_concluir(future.result())
+
+    def encerrar(self):
+        """Espera a fila esvaziar (ex.: edições pendentes) e fecha a conexão da thread do banco."""
+        self._pool.submit(fechar_conexao_da_thread)
+        self._pool.shutdown(wait=True)
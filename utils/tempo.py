@@ -0,0 +1,42 @@
+"""Conversões de horário/duração compartilhadas pela grid, totais, overlaps e exportações."""
+import re
+
+# O mesmo critério de db._sql_minutos (colunas inicio_min/fim_min e daily_totals)
+_HORARIO = re.compile(r"([0-9]{1,2}):([0-9]{1,2})")
+
+
+def horario_para_minutos(hora_str):
+    """'HH:MM' → minutos desde 00:00; None se o texto não for um horário (00:00–23:59)."""
+    encontrado = _HORARIO.fullmatch(hora_str) if isinstance(hora_str, str) else None
+    if encontrado is None:
+        return None
+    h, m = int(encontrado.group(1)), int(encontrado.group(2))
+    if h <= 23 and m <= 59:
+        return h * 60 + m
+    return None
+
+
+def duracao_em_minutos(hora_inicio, hora_fim):
+    """Duração em minutos (0 quando algum horário é inválido)."""
+    inicio, fim = horario_para_minutos(hora_inicio), horario_para_minutos(hora_fim)
+    if inicio is None or fim is None:
+        return 0
+    return fim - inicio
+
+
+def formatar_minutos(total_minutos):
+    horas, minutos = divmod(int(total_minutos), 60)
+    return f"{horas}h {minutos}m"
+
+
+def calcular_duracao(hora_inicio, hora_fim, invalido="Erro"):
+    """Duração formatada ('1h 30m') entre Hora Inicial e Hora Final."""
+    inicio, fim = horario_para_minutos(hora_inicio), horario_para_minutos(hora_fim)
+    if inicio is None or fim is None:
+        return invalido
+    return formatar_minutos(fim - inicio)
+
+
+def calcular_tempo_total(registros):
+    """Tempo total formatado de registros (id, dia, hora_inicio, hora_fim, ...)."""
+    return formatar_minutos(sum(duracao_em_minutos(r[2], r[3]) for r in registros))